@@ -0,0 +1,43 @@
+# Backend/alert_broker.py
+# Minimal local stand-in for a pub/sub broker (e.g. Redis) so alert streams work
+# across several API workers on one host. Every newline-delimited JSON message a
+# worker sends is relayed to all connected workers, the sender included.
+#
+#   python alert_broker.py --port 8765
+#   ALERT_BROKER_URL=tcp://127.0.0.1:8765 uvicorn main:app --workers 4
+
+import argparse
+import asyncio
+
+clients = set()
+
+async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    clients.add(writer)
+    try:
+        while line := await reader.readline():
+            for client in list(clients):
+                client.write(line)
+    except OSError:
+        pass
+    finally:
+        clients.discard(writer)
+        writer.close()
+
+async def serve(host: str, port: int):
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Alert broker listening on tcp://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Local alert broker for multi-worker deployments")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
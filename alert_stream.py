@@ -0,0 +1,255 @@
+# Backend/alert_stream.py
+# Live alert feed behind GET /api/alerts/stream (Server-Sent Events).
+#
+# crud.create_alert / update_alert publish each change to an in-process hub that
+# fans it out to every connected stream. With several workers, set
+# ALERT_BROKER_URL to a running alert_broker.py: events then go through the
+# broker, which relays them to every worker, so each stream sees all of them.
+#
+# Event ids are the highest alert_id the stream has sent. A client that
+# reconnects with Last-Event-ID (EventSource does this itself) or
+# ?last_alert_id= first gets every alert created since then, then the live feed.
+# Updates made while a client was away are not replayed.
+
+import asyncio
+import json
+import logging
+import threading
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Dict, Optional
+
+import models, schemas
+import database
+
+logger = logging.getLogger("alert_stream")
+
+# Events buffered per client; a client that falls further behind is resynced from the database.
+QUEUE_SIZE = 1000
+# Alerts per catch-up query.
+REPLAY_BATCH = 500
+
+def alert_payload(db_alert: models.Alert) -> Dict[str, Any]:
+    return schemas.Alert.model_validate(db_alert).model_dump(mode="json")
+
+class Subscription:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+
+    def offer(self, event: Dict[str, Any]):
+        """Runs on the subscriber's loop. On overflow, drop the backlog and ask for a resync."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+class AlertHub:
+    """In-process fan-out. Safe to publish from any thread or event loop."""
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self.broker: Optional["BrokerClient"] = None
+        self.published = 0
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription()
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    @property
+    def listening(self) -> bool:
+        return self.broker is not None or bool(self._subscribers)
+
+    def publish(self, event: Dict[str, Any]):
+        self.published += 1
+        if self.broker is not None and self.broker.send(event):
+            return
+        self.fanout(event)
+
+    def fanout(self, event: Dict[str, Any]):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's loop is closed; it is going away.
+                self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "broker": self.broker.stats() if self.broker is not None else None,
+        }
+
+hub = AlertHub()
+
+def publish_alert(kind: str, db_alert: models.Alert):
+    """Announce a created or updated alert. Call after the commit."""
+    if hub.listening:
+        hub.publish({"type": kind, "alert": alert_payload(db_alert)})
+
+def publish_resync():
+    """Tell streams to catch up from the database, after alerts were inserted in bulk."""
+    if hub.listening:
+        hub.publish({"type": "resync"})
+
+# --- Broker client ---
+class BrokerClient:
+    """
+    Connection to alert_broker.py. Published events are sent to the broker and
+    fanned out locally only when they come back, so every worker sees each
+    event exactly once. While disconnected, events are fanned out locally.
+    """
+    def __init__(self, host: str, port: int, reconnect_delay: float = 1.0):
+        self.host = host
+        self.port = port
+        self.reconnect_delay = reconnect_delay
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.sent = 0
+        self.received = 0
+
+    @classmethod
+    def from_url(cls, url: str) -> "BrokerClient":
+        host, _, port = url.removeprefix("tcp://").rpartition(":")
+        return cls(host or "127.0.0.1", int(port))
+
+    def send(self, event: Dict[str, Any]) -> bool:
+        writer = self.writer
+        if writer is None:
+            return False
+        line = (json.dumps(event) + "\n").encode()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            writer.write(line)
+        else:
+            self.loop.call_soon_threadsafe(writer.write, line)
+        self.sent += 1
+        return True
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            except OSError as e:
+                logger.warning("alert broker %s:%s unavailable: %s", self.host, self.port, e)
+                await asyncio.sleep(self.reconnect_delay)
+                continue
+            self.writer = writer
+            # Anything published while disconnected may have been missed elsewhere.
+            hub.fanout({"type": "resync"})
+            try:
+                while line := await reader.readline():
+                    self.received += 1
+                    hub.fanout(json.loads(line))
+            except (OSError, ValueError) as e:
+                logger.warning("alert broker connection lost: %s", e)
+            finally:
+                self.writer = None
+                writer.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": f"tcp://{self.host}:{self.port}",
+            "connected": self.writer is not None,
+            "sent": self.sent,
+            "received": self.received,
+        }
+
+@asynccontextmanager
+async def running(broker_url: Optional[str]):
+    """App lifespan hook: connect to the broker, if one is configured, while the app runs."""
+    if not broker_url:
+        yield
+        return
+    hub.broker = BrokerClient.from_url(broker_url)
+    task = asyncio.create_task(hub.broker.run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        hub.broker = None
+
+# --- Server-Sent Events ---
+def _alerts_after(after_id: Optional[int], limit: int):
+    """Alerts created after `after_id`, oldest first. With no id, just the current high-water mark."""
+    db = database.SessionLocal()
+    try:
+        if after_id is None:
+            latest = db.query(models.Alert.alert_id).order_by(models.Alert.alert_id.desc()).limit(1).scalar()
+            return latest or 0, []
+        rows = (
+            db.query(models.Alert)
+            .filter(models.Alert.alert_id > after_id)
+            .order_by(models.Alert.alert_id)
+            .limit(limit)
+            .all()
+        )
+        return after_id, [alert_payload(row) for row in rows]
+    finally:
+        db.close()
+
+def _format(kind: str, event_id: int, data: Dict[str, Any]) -> str:
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(data)}\n\n"
+
+async def event_stream(request, last_alert_id: Optional[int], heartbeat: float) -> AsyncIterator[str]:
+    subscription = hub.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        # Subscribe first, then catch up, so nothing created in between is lost;
+        # live copies of replayed alerts are skipped.
+        if last_alert_id is None:
+            high, _ = await asyncio.to_thread(_alerts_after, None, 0)
+        else:
+            high = last_alert_id
+        replayed = set()
+
+        async def catch_up():
+            nonlocal high, replayed
+            replayed = set()
+            while True:
+                _, rows = await asyncio.to_thread(_alerts_after, high, REPLAY_BATCH)
+                for alert in rows:
+                    high = max(high, alert["alert_id"])
+                    replayed.add(alert["alert_id"])
+                    yield _format("created", high, alert)
+                if len(rows) < REPLAY_BATCH:
+                    return
+
+        async for chunk in catch_up():
+            yield chunk
+
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event["type"] == "resync":
+                async for chunk in catch_up():
+                    yield chunk
+                continue
+            alert = event["alert"]
+            if event["type"] == "created":
+                if alert["alert_id"] in replayed:
+                    continue
+                high = max(high, alert["alert_id"])
+            yield _format(event["type"], high, alert)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,349 @@
+# Backend/async_crud.py
+# Async counterparts of crud.py, used by async_main.py.
+
+import time
+from typing import Optional, Sequence
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import models, schemas, crud, kpi_engine, alert_stream, entity_cache, fast_json
+from pagination import paginate
+from database import replica_read
+from kpi_classifier import KPI_CLASSES
+from crud import (
+    kpi_classifier, build_kpi_features, filter_projects, filter_tasks, filter_alerts,
+    PROJECT_RELATIONSHIPS, project_load_options, project_field_options, row_columns
+)
+
+# --- Generic helpers ---
+async def _get_by(db: AsyncSession, model, column, value):
+    result = await db.execute(select(model).where(column == value))
+    return result.scalars().first()
+
+async def _get_list(db: AsyncSession, model, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                    stmt=None, order=None):
+    stmt = select(model) if stmt is None else stmt
+    result = await db.execute(paginate(stmt, model, skip, limit, cursor, order))
+    return result.scalars().all()
+
+@replica_read
+async def get_rows(db: AsyncSession, model, schema, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                   order=None, filters=None, apply_filters=None, fields=None):
+    """Async crud.get_rows."""
+    stmt = select(*row_columns(model, schema, fields, order))
+    if apply_filters is not None:
+        stmt = apply_filters(stmt, filters)
+    result = await db.execute(paginate(stmt, model, skip, limit, cursor, order))
+    return result.all()
+
+@replica_read
+async def get_row(db: AsyncSession, model, schema, key, fields=None):
+    stmt = select(*fast_json.serializer(model, schema, fields).columns).where(inspect(model).primary_key[0] == key)
+    result = await db.execute(stmt)
+    return result.first()
+
+def _after_write(model):
+    if model in crud.DASHBOARD_MODELS:
+        crud.invalidate_dashboard_summary()
+
+# model -> (entity_cache kind, attribute holding its key)
+CACHED_MODELS = {
+    models.Employee: ("employee", "employee_id"),
+    models.Customer: ("customer", "customer_id"),
+    models.Project: ("project", "project_id"),
+    models.Project_KPI: ("project_kpi", "project_id"),
+}
+
+def _invalidate(db: AsyncSession, db_obj):
+    cached = CACHED_MODELS.get(type(db_obj))
+    if cached is not None:
+        kind, key = cached
+        entity_cache.invalidate(db, kind, getattr(db_obj, key))
+
+async def _apply_kpi_change(db: AsyncSession, before, after):
+    """Flush, then apply the kpi_engine deltas for a tracked model in the same transaction."""
+    await db.flush()
+    if before != after:
+        await db.run_sync(kpi_engine.apply_change, before, after)
+
+async def _create(db: AsyncSession, db_obj):
+    db.add(db_obj)
+    await _apply_kpi_change(db, None, kpi_engine.snapshot(db_obj))
+    await db.commit()
+    _after_write(type(db_obj))
+    await db.refresh(db_obj)
+    return db_obj
+
+async def _update(db: AsyncSession, db_obj, update_model):
+    if not db_obj:
+        return None
+
+    before = kpi_engine.snapshot(db_obj)
+    _invalidate(db, db_obj)
+    update_data = update_model.model_dump(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(db_obj, field, value)
+
+    _invalidate(db, db_obj)
+    await _apply_kpi_change(db, before, kpi_engine.snapshot(db_obj))
+    await db.commit()
+    _after_write(type(db_obj))
+    await db.refresh(db_obj)
+    return db_obj
+
+async def _delete(db: AsyncSession, db_obj):
+    if db_obj:
+        before = kpi_engine.snapshot(db_obj)
+        _invalidate(db, db_obj)
+        if type(db_obj) is models.Project:
+            entity_cache.invalidate(db, "project_kpi", db_obj.project_id)
+        await db.delete(db_obj)
+        await _apply_kpi_change(db, before, None)
+        await db.commit()
+        _after_write(type(db_obj))
+        return True
+    return False
+
+# --- Employee CRUD ---
+@replica_read
+async def get_employee(db: AsyncSession, employee_id: int):
+    return await entity_cache.aread_through("employee", employee_id, schemas.Employee, lambda: _get_by(
+        db, models.Employee, models.Employee.employee_id, employee_id
+    ))
+
+async def get_employee_by_email(db: AsyncSession, email: str):
+    return await _get_by(db, models.Employee, models.Employee.email, email)
+
+@replica_read
+async def get_employees(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await _get_list(db, models.Employee, skip, limit, cursor)
+
+async def create_employee(db: AsyncSession, employee: schemas.EmployeeCreate):
+    return await _create(db, models.Employee(
+        name=employee.name,
+        email=employee.email,
+        password_hash=employee.password_hash
+    ))
+
+async def update_employee(db: AsyncSession, employee_id: int, employee_update: schemas.EmployeeUpdate):
+    return await _update(db, await _get_by(db, models.Employee, models.Employee.employee_id, employee_id), employee_update)
+
+async def delete_employee(db: AsyncSession, employee_id: int):
+    return await _delete(db, await _get_by(db, models.Employee, models.Employee.employee_id, employee_id))
+
+# --- Customer CRUD ---
+@replica_read
+async def get_customer(db: AsyncSession, customer_id: int):
+    return await entity_cache.aread_through("customer", customer_id, schemas.Customer, lambda: _get_by(
+        db, models.Customer, models.Customer.customer_id, customer_id
+    ))
+
+@replica_read
+async def get_customers(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await _get_list(db, models.Customer, skip, limit, cursor)
+
+async def create_customer(db: AsyncSession, customer: schemas.CustomerCreate):
+    return await _create(db, models.Customer(**customer.model_dump()))
+
+async def update_customer(db: AsyncSession, customer_id: int, customer_update: schemas.CustomerUpdate):
+    return await _update(db, await _get_by(db, models.Customer, models.Customer.customer_id, customer_id), customer_update)
+
+async def delete_customer(db: AsyncSession, customer_id: int):
+    return await _delete(db, await _get_by(db, models.Customer, models.Customer.customer_id, customer_id))
+
+# --- Project CRUD ---
+@replica_read
+async def get_project(db: AsyncSession, project_id: int):
+    return await entity_cache.aread_through("project", project_id, schemas.Project, lambda: _get_by(
+        db, models.Project, models.Project.project_id, project_id
+    ))
+
+@replica_read
+async def get_project_full(db: AsyncSession, project_id: int):
+    result = await db.execute(
+        select(models.Project)
+        .options(*project_load_options(PROJECT_RELATIONSHIPS))
+        .where(models.Project.project_id == project_id)
+    )
+    return result.scalars().first()
+
+@replica_read
+async def get_projects(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                       filters: Optional[schemas.ProjectFilter] = None, order=None, expand: Sequence[str] = (),
+                       fields: Optional[Sequence[str]] = None):
+    stmt = filter_projects(select(models.Project), filters).options(
+        *project_load_options(expand), *project_field_options(fields, order)
+    )
+    return await _get_list(db, models.Project, skip, limit, cursor, stmt, order)
+
+async def create_project(db: AsyncSession, project: schemas.ProjectCreate):
+    return await _create(db, models.Project(**project.model_dump()))
+
+async def update_project(db: AsyncSession, project_id: int, project_update: schemas.ProjectUpdate):
+    return await _update(db, await _get_by(db, models.Project, models.Project.project_id, project_id), project_update)
+
+async def delete_project(db: AsyncSession, project_id: int):
+    return await _delete(db, await _get_by(db, models.Project, models.Project.project_id, project_id))
+
+# --- Task CRUD ---
+@replica_read
+async def get_task(db: AsyncSession, task_id: int):
+    return await _get_by(db, models.Task, models.Task.task_id, task_id)
+
+@replica_read
+async def get_tasks(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                    filters: Optional[schemas.TaskFilter] = None, order=None):
+    stmt = filter_tasks(select(models.Task), filters)
+    return await _get_list(db, models.Task, skip, limit, cursor, stmt, order)
+
+async def create_task(db: AsyncSession, task: schemas.TaskCreate):
+    return await _create(db, models.Task(**task.model_dump()))
+
+async def update_task(db: AsyncSession, task_id: int, task_update: schemas.TaskUpdate):
+    return await _update(db, await _get_by(db, models.Task, models.Task.task_id, task_id), task_update)
+
+async def delete_task(db: AsyncSession, task_id: int):
+    return await _delete(db, await _get_by(db, models.Task, models.Task.task_id, task_id))
+
+# --- Project Phase CRUD ---
+@replica_read
+async def get_project_phase(db: AsyncSession, phase_id: int):
+    return await _get_by(db, models.Project_Phase, models.Project_Phase.phase_id, phase_id)
+
+@replica_read
+async def get_project_phases(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await _get_list(db, models.Project_Phase, skip, limit, cursor)
+
+@replica_read
+async def get_project_phases_by_project(db: AsyncSession, project_id: int):
+    result = await db.execute(select(models.Project_Phase).where(models.Project_Phase.project_id == project_id))
+    return result.scalars().all()
+
+async def create_project_phase(db: AsyncSession, phase: schemas.ProjectPhaseCreate):
+    return await _create(db, models.Project_Phase(**phase.model_dump()))
+
+async def update_project_phase(db: AsyncSession, phase_id: int, phase_update: schemas.ProjectPhaseUpdate):
+    return await _update(db, await _get_by(db, models.Project_Phase, models.Project_Phase.phase_id, phase_id), phase_update)
+
+async def delete_project_phase(db: AsyncSession, phase_id: int):
+    return await _delete(db, await _get_by(db, models.Project_Phase, models.Project_Phase.phase_id, phase_id))
+
+# --- Alert CRUD ---
+@replica_read
+async def get_alert(db: AsyncSession, alert_id: int):
+    return await _get_by(db, models.Alert, models.Alert.alert_id, alert_id)
+
+@replica_read
+async def get_alerts(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                     filters: Optional[schemas.AlertFilter] = None, order=None):
+    stmt = filter_alerts(select(models.Alert), filters)
+    return await _get_list(db, models.Alert, skip, limit, cursor, stmt, order)
+
+async def create_alert(db: AsyncSession, alert: schemas.AlertCreate):
+    db_alert = await _create(db, models.Alert(**alert.model_dump()))
+    alert_stream.publish_alert("created", db_alert)
+    return db_alert
+
+async def update_alert(db: AsyncSession, alert_id: int, alert_update: schemas.AlertUpdate):
+    db_alert = await _update(db, await _get_by(db, models.Alert, models.Alert.alert_id, alert_id), alert_update)
+    if db_alert:
+        alert_stream.publish_alert("updated", db_alert)
+    return db_alert
+
+async def delete_alert(db: AsyncSession, alert_id: int):
+    return await _delete(db, await _get_by(db, models.Alert, models.Alert.alert_id, alert_id))
+
+# --- Budget History CRUD ---
+@replica_read
+async def get_budget_history(db: AsyncSession, history_id: int):
+    return await _get_by(db, models.Budget_History, models.Budget_History.history_id, history_id)
+
+@replica_read
+async def get_budget_histories(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await _get_list(db, models.Budget_History, skip, limit, cursor)
+
+@replica_read
+async def get_budget_history_by_project(db: AsyncSession, project_id: int):
+    result = await db.execute(select(models.Budget_History).where(models.Budget_History.project_id == project_id))
+    return result.scalars().all()
+
+async def create_budget_history(db: AsyncSession, budget_history: schemas.BudgetHistoryCreate):
+    return await _create(db, models.Budget_History(**budget_history.model_dump()))
+
+async def update_budget_history(db: AsyncSession, history_id: int, budget_update: schemas.BudgetHistoryUpdate):
+    return await _update(db, await _get_by(db, models.Budget_History, models.Budget_History.history_id, history_id), budget_update)
+
+async def delete_budget_history(db: AsyncSession, history_id: int):
+    return await _delete(db, await _get_by(db, models.Budget_History, models.Budget_History.history_id, history_id))
+
+# --- Project KPI CRUD ---
+@replica_read
+async def get_project_kpi(db: AsyncSession, kpi_id: int):
+    return await _get_by(db, models.Project_KPI, models.Project_KPI.kpi_id, kpi_id)
+
+@replica_read
+async def get_project_kpis(db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return await _get_list(db, models.Project_KPI, skip, limit, cursor)
+
+@replica_read
+async def get_project_kpi_by_project(db: AsyncSession, project_id: int):
+    return await entity_cache.aread_through("project_kpi", project_id, schemas.ProjectKpi, lambda: _get_by(
+        db, models.Project_KPI, models.Project_KPI.project_id, project_id
+    ))
+
+async def create_project_kpi(db: AsyncSession, kpi: schemas.ProjectKpiCreate):
+    return await _create(db, models.Project_KPI(**kpi.model_dump()))
+
+async def update_project_kpi(db: AsyncSession, kpi_id: int, kpi_update: schemas.ProjectKpiUpdate):
+    return await _update(db, await _get_by(db, models.Project_KPI, models.Project_KPI.kpi_id, kpi_id), kpi_update)
+
+async def delete_project_kpi(db: AsyncSession, kpi_id: int):
+    return await _delete(db, await _get_by(db, models.Project_KPI, models.Project_KPI.kpi_id, kpi_id))
+
+# --- KPI Classification ---
+async def classify_all_project_kpis(db: AsyncSession, chunk_size: int = 5000, classifier=None) -> schemas.KpiBatchResult:
+    """
+    crud.classify_all_project_kpis for the async app. The database work runs
+    through run_sync, and the scoring through aclassify_matrix, so a remote
+    classifier never blocks the event loop.
+    """
+    classifier = classifier or kpi_classifier()
+    started = time.perf_counter()
+    processed = updated = 0
+    by_class = {kpi_class: 0 for kpi_class in KPI_CLASSES}
+    last_id = 0
+
+    while True:
+        rows, matrix = await db.run_sync(crud.kpi_feature_chunk, last_id, chunk_size)
+        if not rows:
+            break
+        last_id = rows[-1].kpi_id
+        predictions = await classifier.aclassify_matrix(matrix)
+        updated += await db.run_sync(crud.write_kpi_classes, rows, predictions, by_class)
+        processed += len(rows)
+
+    return schemas.KpiBatchResult(
+        processed=processed,
+        updated=updated,
+        by_class=by_class,
+        elapsed_seconds=round(time.perf_counter() - started, 3)
+    )
+
+async def classify_and_update_project_kpi_class(db: AsyncSession, project_id: int):
+    db_kpi = await _get_by(db, models.Project_KPI, models.Project_KPI.project_id, project_id)
+    if not db_kpi:
+        return None
+
+    kpi_data = build_kpi_features(db_kpi)
+
+    try:
+        kpi_class_prediction = await kpi_classifier().aclassify_kpi_class(**kpi_data)
+        if kpi_class_prediction not in KPI_CLASSES:
+            return None
+        db_kpi.kpi_class = kpi_class_prediction
+        entity_cache.invalidate(db, "project_kpi", project_id)
+        await db.commit()
+        await db.refresh(db_kpi)
+        return db_kpi
+    except Exception:
+        crud.logger.exception("Error classifying KPI for project %s", project_id)
+        return None
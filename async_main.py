@@ -0,0 +1,502 @@
+# Backend/async_main.py
+# Opt-in async variant of main.py: run with `uvicorn async_main:app`.
+
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Dict, List, Optional
+from fastapi.middleware.cors import CORSMiddleware
+
+import models, schemas, crud, async_crud, pagination, versioning, overdue_sweeper, alert_stream, entity_cache, export, bulk_import, fast_json, instrumentation
+import database, migrate
+from database import get_async_db
+from config import settings
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        await asyncio.to_thread(migrate.apply)
+    database.init_async_engine()
+    crud.kpi_classifier()
+    async with overdue_sweeper.background(settings.OVERDUE_SWEEP_INTERVAL), alert_stream.running(settings.ALERT_BROKER_URL):
+        yield
+    await asyncio.to_thread(crud.close_kpi_classifier)
+    await database.dispose_async_engines()
+
+app = FastAPI(
+    title="Project Management System Backend",
+    description="API for managing customers, projects, tasks, employees, phases, alerts, budget history, and KPIs.",
+    version="1.0.0",
+    docs_url="/api/docs",
+    redoc_url="/api/redoc",
+    lifespan=lifespan
+)
+
+origins = [
+    "http://localhost:3000",
+    "http://localhost:8000",
+    "http://127.0.0.1:8000",
+]
+
+# Added before CORS so 304s short-circuited here still get CORS headers.
+app.add_middleware(versioning.ConditionalGetMiddleware)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, *versioning.VALIDATOR_HEADERS],
+)
+
+# Added last so it times everything above, including 304s and CORS preflights.
+app.add_middleware(instrumentation.RequestMetricsMiddleware)
+
+CHUNK_SIZE_QUERY = Query(settings.BULK_CHUNK_SIZE, ge=1, le=settings.BULK_MAX_CHUNK_SIZE)
+
+@app.get("/")
+async def read_root():
+    return {"message": "Welcome to the Project Management Dashboard API!"}
+
+# --- Dashboard Endpoints ---
+@app.get("/api/dashboard/summary", response_model=schemas.DashboardSummary)
+async def read_dashboard_summary(db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.get_dashboard_summary)
+
+# --- Employee Endpoints ---
+@app.post("/api/employees/", response_model=schemas.Employee, status_code=status.HTTP_201_CREATED)
+async def create_employee(employee: schemas.EmployeeCreate, db: AsyncSession = Depends(get_async_db)):
+    db_employee = await async_crud.get_employee_by_email(db, email=employee.email)
+    if db_employee:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    return await async_crud.create_employee(db=db, employee=employee)
+
+@app.get("/api/employees/", response_model=List[schemas.Employee])
+async def read_employees(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Employee, fields)
+    employees = await async_crud.get_rows(db, models.Employee, schemas.Employee, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Employee, schemas.Employee, employees, limit, fields=selected)
+
+@app.get("/api/employees/{employee_id}", response_model=schemas.Employee)
+async def read_employee(employee_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Employee, fields)
+    employee = await async_crud.get_employee(db, employee_id=employee_id)
+    if employee is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return fast_json.object_response(schemas.Employee, employee, selected) if selected else employee
+
+@app.put("/api/employees/{employee_id}", response_model=schemas.Employee)
+async def update_employee(employee_id: int, employee_update: schemas.EmployeeUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_employee = await async_crud.update_employee(db, employee_id, employee_update)
+    if not updated_employee:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return updated_employee
+
+@app.delete("/api/employees/{employee_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_employee(employee_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_employee(db, employee_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Customer Endpoints ---
+@app.post("/api/customers/", response_model=schemas.Customer, status_code=status.HTTP_201_CREATED)
+async def create_customer(customer: schemas.CustomerCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_customer(db=db, customer=customer)
+
+@app.get("/api/customers/", response_model=List[schemas.Customer])
+async def read_customers(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Customer, fields)
+    customers = await async_crud.get_rows(db, models.Customer, schemas.Customer, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Customer, schemas.Customer, customers, limit, fields=selected)
+
+@app.get("/api/customers/{customer_id}", response_model=schemas.Customer)
+async def read_customer(customer_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Customer, fields)
+    customer = await async_crud.get_customer(db, customer_id=customer_id)
+    if customer is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return fast_json.object_response(schemas.Customer, customer, selected) if selected else customer
+
+@app.put("/api/customers/{customer_id}", response_model=schemas.Customer)
+async def update_customer(customer_id: int, customer_update: schemas.CustomerUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_customer = await async_crud.update_customer(db, customer_id=customer_id, customer_update=customer_update)
+    if db_customer is None:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return db_customer
+
+@app.delete("/api/customers/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_customer(customer_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_customer(db, customer_id=customer_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Customer not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Project Endpoints ---
+@app.post("/api/projects/", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
+async def create_project(project: schemas.ProjectCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_project(db=db, project=project)
+
+@app.get("/api/projects/", response_model=List[schemas.ProjectDetail], response_model_exclude_unset=True)
+async def read_projects(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: Optional[str] = None,
+                        expand: Optional[str] = None, filters: schemas.ProjectFilter = Depends(), fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Project, fields)
+    order = pagination.parse_sort(models.Project, sort, crud.PROJECT_SORT_FIELDS)
+    expand_fields = crud.parse_project_expand(expand)
+    if not expand_fields:
+        projects = await async_crud.get_rows(db, models.Project, schemas.Project, skip=skip, limit=limit, cursor=cursor, order=order,
+                                             filters=filters, apply_filters=crud.filter_projects, fields=selected)
+        return fast_json.page_response(models.Project, schemas.Project, projects, limit, order, fields=selected)
+    projects = await async_crud.get_projects(db, skip=skip, limit=limit, cursor=cursor, filters=filters, order=order,
+                                             expand=expand_fields, fields=selected)
+    if selected:
+        content = fast_json.expanded_dicts(models.Project, schemas.Project, schemas.ProjectDetail, projects,
+                                           selected, expand_fields)
+        sparse = fast_json.json_response(content)
+        pagination.set_next_cursor(sparse, projects, models.Project, limit, order)
+        return sparse
+    pagination.set_next_cursor(response, projects, models.Project, limit, order)
+    return [schemas.ProjectDetail.from_project(project, expand_fields) for project in projects]
+
+@app.get("/api/projects/{project_id}", response_model=schemas.Project)
+async def read_project(project_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Project, fields)
+    project = await async_crud.get_project(db, project_id=project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return fast_json.object_response(schemas.Project, project, selected) if selected else project
+
+@app.get("/api/projects/{project_id}/full", response_model=schemas.ProjectDetail)
+async def read_project_full(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    project = await async_crud.get_project_full(db, project_id=project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return project
+
+@app.put("/api/projects/{project_id}", response_model=schemas.Project)
+async def update_project(project_id: int, project_update: schemas.ProjectUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_project = await async_crud.update_project(db, project_id, project_update)
+    if not updated_project:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return updated_project
+
+@app.delete("/api/projects/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_project(db, project_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Task Endpoints ---
+@app.post("/api/tasks/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
+async def create_task(task: schemas.TaskCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_task(db=db, task=task)
+
+@app.get("/api/tasks/", response_model=List[schemas.Task])
+async def read_tasks(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: Optional[str] = None,
+                     filters: schemas.TaskFilter = Depends(), fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Task, fields)
+    order = pagination.parse_sort(models.Task, sort, crud.TASK_SORT_FIELDS)
+    tasks = await async_crud.get_rows(db, models.Task, schemas.Task, skip=skip, limit=limit, cursor=cursor, order=order,
+                                      filters=filters, apply_filters=crud.filter_tasks, fields=selected)
+    return fast_json.page_response(models.Task, schemas.Task, tasks, limit, order, fields=selected)
+
+# Bulk routes, here and for alerts and budget history below, are declared ahead
+# of the /{id} routes they would otherwise collide with.
+@app.post("/api/tasks/bulk", response_model=schemas.BulkResult)
+async def bulk_create_tasks(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_create_tasks, rows, chunk_size)
+
+@app.patch("/api/tasks/bulk", response_model=schemas.BulkResult)
+async def bulk_update_tasks(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_update_tasks, rows, chunk_size)
+
+@app.delete("/api/tasks/bulk", response_model=schemas.BulkResult)
+async def bulk_delete_tasks(body: schemas.BulkDelete, chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_delete_tasks, body.ids, chunk_size)
+
+@app.get("/api/tasks/{task_id}", response_model=schemas.Task)
+async def read_task(task_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Task, fields)
+    if selected:
+        task = await async_crud.get_row(db, models.Task, schemas.Task, task_id, selected)
+    else:
+        task = await async_crud.get_task(db, task_id=task_id)
+    if task is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return fast_json.row_response(models.Task, schemas.Task, task, selected) if selected else task
+
+@app.put("/api/tasks/{task_id}", response_model=schemas.Task)
+async def update_task(task_id: int, task_update: schemas.TaskUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_task = await async_crud.update_task(db, task_id, task_update)
+    if not updated_task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return updated_task
+
+@app.delete("/api/tasks/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_task(db, task_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Project Phase Endpoints ---
+@app.post("/api/project-phases/", response_model=schemas.ProjectPhase, status_code=status.HTTP_201_CREATED)
+async def create_project_phase(phase: schemas.ProjectPhaseCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_project_phase(db=db, phase=phase)
+
+@app.get("/api/project-phases/", response_model=List[schemas.ProjectPhase])
+async def read_project_phases(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.ProjectPhase, fields)
+    phases = await async_crud.get_rows(db, models.Project_Phase, schemas.ProjectPhase, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Project_Phase, schemas.ProjectPhase, phases, limit, fields=selected)
+
+@app.get("/api/project-phases/{phase_id}", response_model=schemas.ProjectPhase)
+async def read_project_phase(phase_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.ProjectPhase, fields)
+    if selected:
+        phase = await async_crud.get_row(db, models.Project_Phase, schemas.ProjectPhase, phase_id, selected)
+    else:
+        phase = await async_crud.get_project_phase(db, phase_id=phase_id)
+    if phase is None:
+        raise HTTPException(status_code=404, detail="Project phase not found")
+    return fast_json.row_response(models.Project_Phase, schemas.ProjectPhase, phase, selected) if selected else phase
+
+@app.get("/api/projects/{project_id}/phases", response_model=List[schemas.ProjectPhase])
+async def read_project_phases_by_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    phases = await async_crud.get_project_phases_by_project(db, project_id=project_id)
+    return phases
+
+@app.put("/api/project-phases/{phase_id}", response_model=schemas.ProjectPhase)
+async def update_project_phase(phase_id: int, phase_update: schemas.ProjectPhaseUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_phase = await async_crud.update_project_phase(db, phase_id, phase_update)
+    if not updated_phase:
+        raise HTTPException(status_code=404, detail="Project phase not found")
+    return updated_phase
+
+@app.delete("/api/project-phases/{phase_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project_phase(phase_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_project_phase(db, phase_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Project phase not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Alert Endpoints ---
+@app.post("/api/alerts/", response_model=schemas.Alert, status_code=status.HTTP_201_CREATED)
+async def create_alert(alert: schemas.AlertCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_alert(db=db, alert=alert)
+
+@app.get("/api/alerts/", response_model=List[schemas.Alert])
+async def read_alerts(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: Optional[str] = None,
+                      filters: schemas.AlertFilter = Depends(), fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Alert, fields)
+    order = pagination.parse_sort(models.Alert, sort, crud.ALERT_SORT_FIELDS)
+    alerts = await async_crud.get_rows(db, models.Alert, schemas.Alert, skip=skip, limit=limit, cursor=cursor, order=order,
+                                       filters=filters, apply_filters=crud.filter_alerts, fields=selected)
+    return fast_json.page_response(models.Alert, schemas.Alert, alerts, limit, order, fields=selected)
+
+@app.get("/api/alerts/stream")
+async def stream_alerts(request: Request, last_alert_id: Optional[int] = None, last_event_id: Optional[int] = Header(None)):
+    """Server-Sent Events feed of created and updated alerts; see alert_stream.py."""
+    resume_from = last_event_id if last_event_id is not None else last_alert_id
+    return StreamingResponse(
+        alert_stream.event_stream(request, resume_from, settings.ALERT_STREAM_HEARTBEAT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/alerts/bulk", response_model=schemas.BulkResult)
+async def bulk_create_alerts(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_create_alerts, rows, chunk_size)
+
+@app.patch("/api/alerts/bulk", response_model=schemas.BulkResult)
+async def bulk_update_alerts(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_update_alerts, rows, chunk_size)
+
+@app.delete("/api/alerts/bulk", response_model=schemas.BulkResult)
+async def bulk_delete_alerts(body: schemas.BulkDelete, chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_delete_alerts, body.ids, chunk_size)
+
+@app.get("/api/alerts/{alert_id}", response_model=schemas.Alert)
+async def read_alert(alert_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.Alert, fields)
+    if selected:
+        alert = await async_crud.get_row(db, models.Alert, schemas.Alert, alert_id, selected)
+    else:
+        alert = await async_crud.get_alert(db, alert_id=alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return fast_json.row_response(models.Alert, schemas.Alert, alert, selected) if selected else alert
+
+@app.put("/api/alerts/{alert_id}", response_model=schemas.Alert)
+async def update_alert(alert_id: int, alert_update: schemas.AlertUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_alert = await async_crud.update_alert(db, alert_id, alert_update)
+    if not updated_alert:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return updated_alert
+
+@app.delete("/api/alerts/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_alert(alert_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_alert(db, alert_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Alert not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Budget History Endpoints ---
+@app.post("/api/budget-history/", response_model=schemas.BudgetHistory, status_code=status.HTTP_201_CREATED)
+async def create_budget_history(budget_history: schemas.BudgetHistoryCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_budget_history(db=db, budget_history=budget_history)
+
+@app.get("/api/budget-history/", response_model=List[schemas.BudgetHistory])
+async def read_budget_history(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.BudgetHistory, fields)
+    history = await async_crud.get_rows(db, models.Budget_History, schemas.BudgetHistory, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Budget_History, schemas.BudgetHistory, history, limit, fields=selected)
+
+@app.post("/api/budget-history/bulk", response_model=schemas.BulkResult)
+async def bulk_create_budget_histories(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_create_budget_histories, rows, chunk_size)
+
+@app.patch("/api/budget-history/bulk", response_model=schemas.BulkResult)
+async def bulk_update_budget_histories(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_update_budget_histories, rows, chunk_size)
+
+@app.delete("/api/budget-history/bulk", response_model=schemas.BulkResult)
+async def bulk_delete_budget_histories(body: schemas.BulkDelete, chunk_size: int = CHUNK_SIZE_QUERY, db: AsyncSession = Depends(get_async_db)):
+    return await db.run_sync(crud.bulk_delete_budget_histories, body.ids, chunk_size)
+
+@app.get("/api/budget-history/{history_id}", response_model=schemas.BudgetHistory)
+async def read_budget_history_item(history_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.BudgetHistory, fields)
+    if selected:
+        history_item = await async_crud.get_row(db, models.Budget_History, schemas.BudgetHistory, history_id, selected)
+    else:
+        history_item = await async_crud.get_budget_history(db, history_id=history_id)
+    if history_item is None:
+        raise HTTPException(status_code=404, detail="Budget history not found")
+    return fast_json.row_response(models.Budget_History, schemas.BudgetHistory, history_item, selected) if selected else history_item
+
+@app.get("/api/projects/{project_id}/budget-history", response_model=List[schemas.BudgetHistory])
+async def read_budget_history_by_project(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    history = await async_crud.get_budget_history_by_project(db, project_id=project_id)
+    return history
+
+@app.put("/api/budget-history/{history_id}", response_model=schemas.BudgetHistory)
+async def update_budget_history(history_id: int, budget_update: schemas.BudgetHistoryUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_history = await async_crud.update_budget_history(db, history_id, budget_update)
+    if not updated_history:
+        raise HTTPException(status_code=404, detail="Budget history not found")
+    return updated_history
+
+@app.delete("/api/budget-history/{history_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_budget_history(history_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_budget_history(db, history_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Budget history not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Project KPI Endpoints ---
+@app.post("/api/project-kpis/", response_model=schemas.ProjectKpi, status_code=status.HTTP_201_CREATED)
+async def create_project_kpi(kpi: schemas.ProjectKpiCreate, db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.create_project_kpi(db=db, kpi=kpi)
+
+@app.get("/api/project-kpis/", response_model=List[schemas.ProjectKpi])
+async def read_project_kpis(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.ProjectKpi, fields)
+    kpis = await async_crud.get_rows(db, models.Project_KPI, schemas.ProjectKpi, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Project_KPI, schemas.ProjectKpi, kpis, limit, fields=selected)
+
+@app.get("/api/project-kpis/{kpi_id}", response_model=schemas.ProjectKpi)
+async def read_project_kpi(kpi_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.ProjectKpi, fields)
+    if selected:
+        kpi = await async_crud.get_row(db, models.Project_KPI, schemas.ProjectKpi, kpi_id, selected)
+    else:
+        kpi = await async_crud.get_project_kpi(db, kpi_id=kpi_id)
+    if kpi is None:
+        raise HTTPException(status_code=404, detail="Project KPI not found")
+    return fast_json.row_response(models.Project_KPI, schemas.ProjectKpi, kpi, selected) if selected else kpi
+
+@app.get("/api/projects/{project_id}/kpi", response_model=schemas.ProjectKpi)
+async def read_project_kpi_by_project(project_id: int, fields: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    selected = fast_json.parse_fields(schemas.ProjectKpi, fields)
+    kpi = await async_crud.get_project_kpi_by_project(db, project_id=project_id)
+    if kpi is None:
+        raise HTTPException(status_code=404, detail="Project KPI not found")
+    return fast_json.object_response(schemas.ProjectKpi, kpi, selected) if selected else kpi
+
+@app.put("/api/project-kpis/{kpi_id}", response_model=schemas.ProjectKpi)
+async def update_project_kpi(kpi_id: int, kpi_update: schemas.ProjectKpiUpdate, db: AsyncSession = Depends(get_async_db)):
+    updated_kpi = await async_crud.update_project_kpi(db, kpi_id, kpi_update)
+    if not updated_kpi:
+        raise HTTPException(status_code=404, detail="Project KPI not found")
+    return updated_kpi
+
+@app.delete("/api/project-kpis/{kpi_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_project_kpi(kpi_id: int, db: AsyncSession = Depends(get_async_db)):
+    success = await async_crud.delete_project_kpi(db, kpi_id)
+    if not success:
+        raise HTTPException(status_code=404, detail="Project KPI not found")
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Export Endpoints ---
+@app.get("/api/export/{table}")
+async def export_table(table: str, request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every row of `table` as NDJSON or CSV; accepts the filters of the table's list endpoint."""
+    return export.response(table, format, request.query_params, asynchronous=True)
+
+# --- Import Endpoints ---
+@app.post("/api/import/{table}", response_model=schemas.ImportResult)
+async def import_table(table: str, request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+                       chunk_size: int = CHUNK_SIZE_QUERY):
+    """Load customers, projects or tasks from a CSV or NDJSON request body; see bulk_import.py."""
+    return await bulk_import.import_request(table, request, format, chunk_size)
+
+# --- Background Job Endpoints ---
+@app.get("/api/jobs/overdue-sweep", response_model=Dict[str, Any])
+async def read_overdue_sweep_stats():
+    return overdue_sweeper.stats()
+
+@app.post("/api/jobs/overdue-sweep", response_model=schemas.SweepResult)
+async def run_overdue_sweep():
+    # The sweep uses the sync engine and a cross-process lock; keep it off the event loop.
+    return await asyncio.to_thread(overdue_sweeper.run_once)
+
+# --- Metrics Endpoints ---
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """Request latency, per-request SQL and query timings in the Prometheus text format; see instrumentation.py."""
+    return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --- Cache Endpoints ---
+@app.get("/api/cache/stats", response_model=Dict[str, Any])
+async def read_entity_cache_stats():
+    return entity_cache.stats()
+
+# --- Connection Pool Endpoints ---
+@app.get("/api/db/pool/stats", response_model=Dict[str, Any])
+async def read_pool_stats():
+    return database.pool_stats()
+
+@app.get("/api/db/replicas", response_model=Dict[str, Any])
+async def read_replica_stats():
+    return database.replica_stats()
+
+# --- KPI Classification Endpoints ---
+@app.get("/api/kpi-classifier/stats", response_model=Dict[str, Any])
+async def read_kpi_classifier_stats():
+    return crud.kpi_classifier().stats()
+
+@app.post("/api/project-kpis/classify", response_model=schemas.KpiBatchResult)
+async def classify_all_project_kpis(chunk_size: int = Query(5000, ge=1, le=100000), db: AsyncSession = Depends(get_async_db)):
+    return await async_crud.classify_all_project_kpis(db, chunk_size=chunk_size)
+
+@app.post("/api/projects/{project_id}/classify-kpi", response_model=schemas.ProjectKpi)
+async def trigger_kpi_classification(project_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_kpi = await async_crud.classify_and_update_project_kpi_class(db, project_id=project_id)
+    if db_kpi is None:
+        raise HTTPException(status_code=404, detail="Project KPI not found or classification failed")
+    return db_kpi
\ No newline at end of file
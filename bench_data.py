@@ -0,0 +1,192 @@
+# Backend/bench_data.py
+# Synthetic data for the benchmarks: fills Customers, Employees, Projects,
+# Project_Phases, Tasks, Alerts, Budget_History and Project_KPIs at a given scale.
+#
+#   python bench_data.py --scale 100000                      # DATABASE_URL
+#   python bench_data.py --scale 1000000 --database-url sqlite:////tmp/bench.db --reset
+#
+# --scale is the number of tasks (1k to 10M); the other tables follow
+# TABLE_RATIOS. The same --scale and --seed always produce the same rows.
+# Primary keys are assigned here, so the target tables must be empty (or
+# dropped with --reset). Rows are written CHUNK_SIZE at a time with one
+# executemany each; KPI counters are then derived with kpi_engine's rebuild.
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, Iterator, List
+
+CHUNK_SIZE = 10_000
+
+# Rows per task, by table.
+TABLE_RATIOS = {
+    "customers": 1 / 100,
+    "employees": 1 / 50,
+    "projects": 1 / 20,
+    "project_phases": 3 / 20,
+    "tasks": 1,
+    "alerts": 1 / 2,
+    "budget_history": 6 / 20,
+}
+
+PROJECT_STATUSES = ("Not Started", "In Progress", "In Progress", "In Progress", "Completed", "On Hold")
+TASK_STATUSES = ("Pending", "In Progress", "Completed", "Completed", "Overdue")
+PHASE_NAMES = ("Design", "Build", "Launch")
+ALERT_TYPES = ("Urgent", "Warning", "Info", "Info")
+ALERT_SOURCES = ("Project", "Task", "System")
+PRIORITIES = ("Low", "Medium", "High")
+START = date(2024, 1, 1)
+NOW = datetime(2025, 6, 30, 18, 0)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate benchmark data")
+    parser.add_argument("--scale", type=int, default=10_000, help="Number of tasks; other tables scale with it")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--database-url", default=None, help="Target database (defaults to DATABASE_URL)")
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate all tables first")
+    return parser.parse_args()
+
+def table_sizes(scale: int) -> Dict[str, int]:
+    return {table: max(1, int(scale * ratio)) for table, ratio in TABLE_RATIOS.items()}
+
+# --- Row generators: rows [start, stop) of a table, 1-based ids ---
+def customers(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    return [{"customer_id": i, "name": f"Customer {i}", "company": None if i % 7 == 0 else f"Company {i % 997}",
+             "email": f"customer{i}@example.com", "phone": None if i % 3 else f"+1-555-{i % 10000:04d}"}
+            for i in range(start, stop)]
+
+def employees(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    return [{"employee_id": i, "name": f"Employee {i}", "email": f"employee{i}@example.com",
+             "password_hash": f"bench-hash-{i}"} for i in range(start, stop)]
+
+def projects(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    rows = []
+    for i in range(start, stop):
+        budget_total = rng.randint(10, 5000) * 100
+        budget_used = round(budget_total * rng.uniform(0, 1.3), 2)
+        started = START + timedelta(days=rng.randint(0, 540))
+        rows.append({
+            "project_id": i, "project_name": f"Project {i}", "customer_id": rng.randint(1, sizes["customers"]),
+            "status": rng.choice(PROJECT_STATUSES), "completion_percentage": round(rng.uniform(0, 100), 2),
+            "budget_total": budget_total, "budget_used": budget_used,
+            "budget_status": "Over Budget" if budget_used > budget_total else rng.choice(("Under Budget", "On Budget")),
+            "start_date": started, "launch_date": started + timedelta(days=rng.randint(30, 365)),
+        })
+    return rows
+
+def project_phases(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    per_project = len(PHASE_NAMES)
+    return [{"phase_id": i, "project_id": (i - 1) // per_project % sizes["projects"] + 1,
+             "phase_name": PHASE_NAMES[(i - 1) % per_project],
+             "status": rng.choice(("Completed", "In Progress", "Waiting"))} for i in range(start, stop)]
+
+def tasks(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    return [{"task_id": i, "project_id": rng.randint(1, sizes["projects"]), "task_name": f"Task {i}",
+             "employee_id": None if i % 11 == 0 else rng.randint(1, sizes["employees"]),
+             "deadline": START + timedelta(days=rng.randint(0, 720)), "status": rng.choice(TASK_STATUSES)}
+            for i in range(start, stop)]
+
+def alerts(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    rows = []
+    for i in range(start, stop):
+        source = rng.choice(ALERT_SOURCES)
+        rows.append({
+            "alert_id": i, "alert_type": rng.choice(ALERT_TYPES), "alert_source": source,
+            "project_id": rng.randint(1, sizes["projects"]),
+            "task_id": rng.randint(1, sizes["tasks"]) if source == "Task" else None,
+            "message": f"Alert {i}: check progress", "status": "Unread" if rng.random() < 0.3 else "Read",
+            "created_at": NOW - timedelta(seconds=rng.randint(0, 90 * 86400)),
+        })
+    return rows
+
+def budget_history(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    months = 6
+    return [{"history_id": i, "project_id": (i - 1) // months % sizes["projects"] + 1,
+             "month": f"2025-{(i - 1) % months + 1:02d}", "amount_used": round(rng.uniform(0, 20000), 2)}
+            for i in range(start, stop)]
+
+def project_kpis(rng: random.Random, start: int, stop: int, sizes) -> List[dict]:
+    # The counters (tasks, alerts, budget) are filled in by kpi_engine afterwards.
+    return [{"kpi_id": i, "project_id": i, "milestone_completion": round(rng.uniform(0, 100), 2),
+             "schedule_variance": round(rng.uniform(-30, 30), 2),
+             "avg_task_completion_time": round(rng.uniform(1, 40), 2),
+             "employee_workload_index": round(rng.uniform(0, 2), 2),
+             "customer_priority_level": rng.choice(PRIORITIES), "kpi_class": "Medium",
+             "reopened_tasks": rng.randint(0, 5), "risk_flag": rng.random() < 0.1}
+            for i in range(start, stop)]
+
+GENERATORS: Dict[str, Callable] = {
+    "customers": customers,
+    "employees": employees,
+    "projects": projects,
+    "project_phases": project_phases,
+    "tasks": tasks,
+    "alerts": alerts,
+    "budget_history": budget_history,
+    "project_kpis": project_kpis,
+}
+
+def chunks(table: str, count: int, sizes, seed: int) -> Iterator[List[dict]]:
+    """Rows of `table` CHUNK_SIZE at a time, each chunk seeded on its own so output is independent of batching."""
+    for start in range(1, count + 1, CHUNK_SIZE):
+        rng = random.Random(f"{seed}:{table}:{start}")
+        yield GENERATORS[table](rng, start, min(start + CHUNK_SIZE, count + 1), sizes)
+
+def generate(db, scale: int, seed: int = 42, progress: Callable[[str, int, int], None] = None) -> Dict[str, int]:
+    """Fill every table for `scale` tasks and commit; returns the rows written per table."""
+    import models, kpi_engine
+    from sqlalchemy import insert
+
+    targets = {
+        "customers": models.Customer, "employees": models.Employee, "projects": models.Project,
+        "project_phases": models.Project_Phase, "tasks": models.Task, "alerts": models.Alert,
+        "budget_history": models.Budget_History, "project_kpis": models.Project_KPI,
+    }
+    sizes = table_sizes(scale)
+    sizes["project_kpis"] = sizes["projects"]
+    for table, model in targets.items():
+        if db.query(model).first() is not None:
+            raise RuntimeError(f"{model.__tablename__} is not empty; use an empty database or --reset")
+
+    for table, model in targets.items():
+        written = 0
+        for rows in chunks(table, sizes[table], sizes, seed):
+            db.execute(insert(model), rows)
+            written += len(rows)
+            if progress is not None:
+                progress(table, written, sizes[table])
+        db.commit()
+    kpi_engine.rebuild_project_kpis(db)
+    db.commit()
+    return sizes
+
+def main():
+    args = parse_args()
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    import database, models
+
+    if args.reset:
+        models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+
+    def progress(table, written, total):
+        print(f"\r{table}: {written:,}/{total:,}", end="" if written < total else "\n", file=sys.stderr, flush=True)
+
+    start = time.perf_counter()
+    with database.SessionLocal() as db:
+        try:
+            sizes = generate(db, args.scale, args.seed, progress)
+        except RuntimeError as e:
+            sys.exit(str(e))
+    elapsed = time.perf_counter() - start
+    total = sum(sizes.values())
+    print(f"Wrote {total:,} rows to {database.engine.url.render_as_string(hide_password=True)} "
+          f"in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s): "
+          + ", ".join(f"{table} {count:,}" for table, count in sizes.items()))
+
+if __name__ == "__main__":
+    main()
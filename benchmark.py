@@ -0,0 +1,110 @@
+# Backend/benchmark.py
+# Compares sync (main.py) and async (async_main.py) request throughput.
+#
+#   python benchmark.py                                   # local SQLite stand-in
+#   python benchmark.py --database-url mysql+mysqlconnector://user:pw@localhost/ProjectManagementSystem
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+DEFAULT_CONCURRENCY = [10, 100, 1000]
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync vs async API throughput benchmark")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to benchmark against (defaults to a temporary SQLite file)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY,
+                        help="Concurrent client counts to test")
+    parser.add_argument("--requests", type=int, default=2000,
+                        help="Total requests per mode and concurrency level")
+    parser.add_argument("--projects", type=int, default=200,
+                        help="Number of projects to seed")
+    return parser.parse_args()
+
+def seed(db, n_projects: int):
+    import models
+    if db.query(models.Project).first():
+        return
+    customer = models.Customer(name="Bench Customer", company="Bench Co", email="bench@example.com")
+    db.add(customer)
+    db.flush()
+    db.add_all([
+        models.Project(project_name=f"Project {i}", customer_id=customer.customer_id, status="In Progress")
+        for i in range(n_projects)
+    ])
+    db.commit()
+
+def percentile(samples, pct):
+    samples = sorted(samples)
+    index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+    return samples[index]
+
+async def run_load(app, concurrency: int, total: int, n_projects: int):
+    import httpx
+
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int):
+            nonlocal errors
+            async with semaphore:
+                path = f"/api/projects/{i % n_projects + 1}" if i % 2 else "/api/projects/?limit=20"
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                    ok = response.status_code == 200
+                except Exception:
+                    ok = False
+                latencies.append(time.perf_counter() - start)
+                if not ok:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "rps": total / elapsed,
+        "p50": percentile(latencies, 50) * 1000,
+        "p99": percentile(latencies, 99) * 1000,
+        "mean": statistics.fmean(latencies) * 1000,
+        "errors": errors,
+    }
+
+async def main():
+    args = parse_args()
+    if args.database_url is None:
+        db_file = os.path.join(tempfile.mkdtemp(prefix="pm-bench-"), "bench.db")
+        args.database_url = f"sqlite:///{db_file}"
+    os.environ["DATABASE_URL"] = args.database_url
+
+    import database, models
+    import main as sync_main
+    import async_main
+
+    models.Base.metadata.create_all(bind=database.engine)
+    with database.SessionLocal() as db:
+        seed(db, args.projects)
+    database.init_async_engine()
+
+    print(f"Database: {database.engine.url.render_as_string(hide_password=True)}")
+    print(f"{'mode':<6} {'clients':>7} {'req/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'mean ms':>9} {'errors':>7}")
+    for concurrency in args.concurrency:
+        for mode, app in (("sync", sync_main.app), ("async", async_main.app)):
+            result = await run_load(app, concurrency, args.requests, args.projects)
+            print(f"{mode:<6} {concurrency:>7} {result['rps']:>10.1f} {result['p50']:>9.2f} "
+                  f"{result['p99']:>9.2f} {result['mean']:>9.2f} {result['errors']:>7}")
+            sys.stdout.flush()
+
+    await database.async_engine.dispose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,274 @@
+# Backend/bulk_import.py
+# Loads customers, projects and tasks from CSV or NDJSON files, for onboarding:
+#
+#   python bulk_import.py customers customers.csv
+#   python bulk_import.py projects projects.ndjson --chunk-size 5000
+#
+# or POST the file as the request body to /api/import/{table}?format=csv|ndjson.
+#
+# The file is parsed as a stream, BULK_CHUNK_SIZE rows at a time. Per batch:
+# foreign keys are resolved with one query per referenced table, the batch is
+# validated in one pass against the table's Create schema, and the valid rows
+# are written with one executemany (see crud.bulk_create). Everything runs in
+# one transaction; bad rows are reported with their position and skipped.
+#
+# Instead of an id, a row may name its parent by a natural key: customer_email
+# for projects, project_name and employee_email for tasks.
+
+import argparse
+import asyncio
+import csv
+import io
+import json
+import sys
+import tempfile
+import time
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+import models, schemas, crud, kpi_engine
+import database
+from config import settings
+
+FORMATS = ("csv", "ndjson")
+# Request bodies larger than this are spooled to a temporary file before importing.
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+class Reference(NamedTuple):
+    field: str          # foreign key column in the imported table
+    id_column: Any      # primary key it points to
+    natural_key: str    # alternative field in the file naming the parent
+    natural_column: Any
+
+class ImportSpec(NamedTuple):
+    model: Any
+    create_schema: Any
+    references: Tuple[Reference, ...] = ()
+
+IMPORTS: Dict[str, ImportSpec] = {
+    "customers": ImportSpec(models.Customer, schemas.CustomerCreate),
+    "projects": ImportSpec(models.Project, schemas.ProjectCreate, (
+        Reference("customer_id", models.Customer.customer_id, "customer_email", models.Customer.email),
+    )),
+    "tasks": ImportSpec(models.Task, schemas.TaskCreate, (
+        Reference("project_id", models.Project.project_id, "project_name", models.Project.project_name),
+        Reference("employee_id", models.Employee.employee_id, "employee_email", models.Employee.email),
+    )),
+}
+
+# --- Parsing ---
+def iter_csv(stream: BinaryIO) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """(row, None) per data row, empty cells dropped so schema defaults apply."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        for row in csv.DictReader(text):
+            if None in row:
+                yield None, "row has more cells than the header"
+                continue
+            yield {key: value for key, value in row.items() if value != ""}, None
+    finally:
+        text.detach()
+
+def iter_ndjson(stream: BinaryIO) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    """(row, None) per non-blank line, or (None, error) for a line that is not a JSON object."""
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield None, f"invalid JSON: {e}"
+            continue
+        if isinstance(row, dict):
+            yield row, None
+        else:
+            yield None, "expected a JSON object"
+
+def iter_rows(stream: BinaryIO, fmt: str):
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format '{fmt}'. Use {' or '.join(FORMATS)}.")
+    return iter_csv(stream) if fmt == "csv" else iter_ndjson(stream)
+
+# --- One batch ---
+def _as_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def resolve_references(db: Session, reference: Reference, batch: List[Tuple[int, Dict[str, Any]]],
+                       errors: Dict[int, str]):
+    """Check ids and map natural keys to ids for one foreign key, with a single query for the batch."""
+    ids, names = set(), set()
+    for index, row in batch:
+        if index in errors:
+            continue
+        if row.get(reference.field) is not None:
+            row_id = _as_int(row[reference.field])
+            if row_id is not None:
+                ids.add(row_id)
+        elif row.get(reference.natural_key) is not None:
+            names.add(row[reference.natural_key])
+    if not ids and not names:
+        return
+
+    criteria = []
+    if ids:
+        criteria.append(reference.id_column.in_(ids))
+    if names:
+        criteria.append(reference.natural_column.in_(names))
+    found_ids, by_name = set(), {}
+    for row_id, name in db.execute(select(reference.id_column, reference.natural_column).where(or_(*criteria))):
+        found_ids.add(row_id)
+        by_name.setdefault(name, []).append(row_id)
+
+    for index, row in batch:
+        if index in errors:
+            continue
+        if row.get(reference.field) is not None:
+            row_id = _as_int(row[reference.field])
+            # Malformed ids are left for schema validation to report.
+            if row_id is not None and row_id not in found_ids:
+                errors[index] = f"{reference.field}: {row_id} does not exist"
+        elif row.get(reference.natural_key) is not None:
+            matches = by_name.get(row[reference.natural_key], [])
+            if len(matches) == 1:
+                row[reference.field] = matches[0]
+            else:
+                errors[index] = (f"{reference.natural_key}: "
+                                 f"{'no match' if not matches else f'{len(matches)} matches'} for {row[reference.natural_key]!r}")
+
+def validate_batch(adapter: TypeAdapter, batch: List[Tuple[int, Dict[str, Any]]],
+                   errors: Dict[int, str]) -> List[Tuple[int, Dict[str, Any]]]:
+    """Validate the rows not already rejected in one call; returns (index, payload) for the valid ones."""
+    pending = [(index, row) for index, row in batch if index not in errors]
+    try:
+        payloads = adapter.dump_python(adapter.validate_python([row for _, row in pending]))
+    except ValidationError as e:
+        messages: Dict[int, List[str]] = {}
+        for error in e.errors(include_url=False):
+            position, *loc = error["loc"]
+            messages.setdefault(position, []).append(f"{'.'.join(str(part) for part in loc) or 'row'}: {error['msg']}")
+        for position, parts in messages.items():
+            errors[pending[position][0]] = "; ".join(parts)
+        pending = [(index, row) for index, row in pending if index not in errors]
+        payloads = adapter.dump_python(adapter.validate_python([row for _, row in pending]))
+    return [(index, payload) for (index, _), payload in zip(pending, payloads)]
+
+# --- Whole file ---
+def import_rows(db: Session, table: str, rows, chunk_size: Optional[int] = None,
+                progress: Optional[Callable[[int, int, int], None]] = None) -> schemas.ImportResult:
+    """
+    Import the (row, parse error) pairs from iter_rows into `table` and commit.
+    `progress(rows_read, succeeded, failed)` is called after every batch.
+    """
+    spec = IMPORTS[table]
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    adapter = TypeAdapter(List[spec.create_schema])
+    start = time.perf_counter()
+    all_errors: List[schemas.BulkRowError] = []
+    kpi_projects = set()
+    read = succeeded = 0
+
+    def flush(batch, errors):
+        nonlocal succeeded
+        for reference in spec.references:
+            resolve_references(db, reference, batch, errors)
+        valid = validate_batch(adapter, batch, errors)
+        all_errors.extend(schemas.BulkRowError(index=index, error=error) for index, error in errors.items())
+        succeeded += crud.write_chunk(db, valid, lambda payloads: db.execute(insert(spec.model), payloads), all_errors)
+        if spec.model in kpi_engine.SOURCE_MODELS:
+            kpi_projects.update(payload.get("project_id") for _, payload in valid)
+        if progress is not None:
+            progress(read, succeeded, len(all_errors))
+
+    batch, errors = [], {}
+    for row, error in rows:
+        if error is not None:
+            errors[read] = error
+        batch.append((read, row or {}))
+        read += 1
+        if len(batch) >= chunk_size:
+            flush(batch, errors)
+            batch, errors = [], {}
+    if batch:
+        flush(batch, errors)
+
+    result = crud.finish_bulk(db, spec.model, succeeded, all_errors, kpi_projects - {None})
+    elapsed = time.perf_counter() - start
+    return schemas.ImportResult(
+        **result.model_dump(),
+        rows=read,
+        elapsed_seconds=round(elapsed, 3),
+        rows_per_second=round(read / elapsed, 1) if elapsed else 0.0,
+    )
+
+def import_file(table: str, stream: BinaryIO, fmt: str, chunk_size: Optional[int] = None,
+                progress: Optional[Callable[[int, int, int], None]] = None) -> schemas.ImportResult:
+    """Import a CSV/NDJSON byte stream with a session of its own."""
+    db = database.SessionLocal()
+    try:
+        return import_rows(db, table, iter_rows(stream, fmt), chunk_size, progress)
+    finally:
+        db.close()
+
+def format_for(filename: str, content_type: Optional[str] = None) -> Optional[str]:
+    """Guess the format from a file extension or Content-Type."""
+    if filename.endswith((".ndjson", ".jsonl")) or (content_type or "").startswith(("application/x-ndjson", "application/jsonl")):
+        return "ndjson"
+    if filename.endswith(".csv") or (content_type or "").startswith("text/csv"):
+        return "csv"
+    return None
+
+async def import_request(table: str, request, fmt: Optional[str], chunk_size: int) -> schemas.ImportResult:
+    """POST /api/import/{table}: spool the body, then import it off the event loop."""
+    if table not in IMPORTS:
+        raise HTTPException(status_code=404, detail=f"Cannot import '{table}'. Available: {', '.join(IMPORTS)}")
+    fmt = fmt or format_for("", request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=400, detail="Pass format=csv or format=ndjson, or a text/csv or application/x-ndjson body")
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as body:
+        async for chunk in request.stream():
+            body.write(chunk)
+        body.seek(0)
+        return await asyncio.to_thread(import_file, table, body, fmt, chunk_size)
+
+def main():
+    parser = argparse.ArgumentParser(description="Import customers, projects or tasks from CSV or NDJSON")
+    parser.add_argument("table", choices=sorted(IMPORTS))
+    parser.add_argument("path", help="File to import, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, default=None,
+                        help="File format (default: from the file extension)")
+    parser.add_argument("--chunk-size", type=int, default=settings.BULK_CHUNK_SIZE,
+                        help="Rows per batch (default: %(default)s)")
+    parser.add_argument("--max-errors", type=int, default=20,
+                        help="Row errors to print (default: %(default)s)")
+    args = parser.parse_args()
+
+    fmt = args.format or format_for(args.path)
+    if fmt is None:
+        parser.error("cannot tell the format from the file name; pass --format")
+
+    def progress(read, succeeded, failed):
+        print(f"\r{read} rows read, {succeeded} imported, {failed} failed", end="", file=sys.stderr, flush=True)
+
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        result = import_file(args.table, stream, fmt, args.chunk_size, progress)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    print(file=sys.stderr)
+    for error in result.errors[:args.max_errors]:
+        print(f"row {error.index}: {error.error}", file=sys.stderr)
+    if result.failed > args.max_errors:
+        print(f"... and {result.failed - args.max_errors} more", file=sys.stderr)
+    print(result.model_dump_json(exclude={"errors"}))
+    sys.exit(1 if result.failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# Backend/classify_kpis.py
+# Reclassify every Project_KPIs row in one batch, e.g. from a nightly cron job:
+#
+#   python classify_kpis.py --chunk-size 5000
+#   python classify_kpis.py --backend llama
+
+import argparse
+
+import crud
+from database import SessionLocal
+from kpi_classifier import get_kpi_classifier
+
+def main():
+    parser = argparse.ArgumentParser(description="Reclassify all Project_KPIs rows")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows scored and updated per batch")
+    parser.add_argument("--backend", default=None, help="Classifier backend (defaults to KPI_CLASSIFIER)")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = crud.classify_all_project_kpis(db, chunk_size=args.chunk_size, classifier=get_kpi_classifier(args.backend))
+    finally:
+        db.close()
+    print(f"Processed {result.processed} KPI rows in {result.elapsed_seconds}s, "
+          f"{result.updated} changed class: {result.by_class}")
+
+if __name__ == "__main__":
+    main()
@@ -5,5 +5,79 @@ load_dotenv()
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
+    # Async mode is opt-in: serve `async_main:app` instead of `main:app`.
+    # Defaults to DATABASE_URL with the driver swapped for its async counterpart.
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL")
+    # Seconds a cached /api/dashboard/summary may be served before it is recomputed.
+    DASHBOARD_CACHE_TTL: float = float(os.getenv("DASHBOARD_CACHE_TTL", "30"))
+    # Optional SQLite file holding the per-table versions behind ETag/Last-Modified,
+    # shared by all workers on the host. Required when running more than one worker.
+    VERSION_STORE_PATH: str = os.getenv("VERSION_STORE_PATH")
+    # Read-through cache for single employee/customer/project/KPI lookups (see
+    # entity_cache.py): maximum entries (0 disables it) and seconds an entry lives.
+    ENTITY_CACHE_SIZE: int = int(os.getenv("ENTITY_CACHE_SIZE", "5000"))
+    ENTITY_CACHE_TTL: float = float(os.getenv("ENTITY_CACHE_TTL", "60"))
+    # Optional SQLite file holding the entries instead, shared by all workers on the
+    # host so invalidations reach every worker.
+    ENTITY_CACHE_PATH: str = os.getenv("ENTITY_CACHE_PATH")
+    # Connection pool per engine (see database.py): connections kept open, extra
+    # connections allowed under load, seconds after which a connection is replaced
+    # (-1 never), and seconds a checkout waits for a free connection before failing.
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "-1"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Liveness check on checkout: "always" (a round trip per checkout), "idle" (only
+    # for connections unused for DB_POOL_PING_IDLE seconds) or "never".
+    DB_POOL_PRE_PING: str = os.getenv("DB_POOL_PRE_PING", "always")
+    DB_POOL_PING_IDLE: float = float(os.getenv("DB_POOL_PING_IDLE", "30"))
+    # Optional read replicas, comma-separated. Read-only crud lookups (get_*) go to
+    # them unless the session has already written; see database.RoutingSession.
+    # Replicas are picked "round-robin" or "least-loaded" (fewest connections in
+    # use), and one that fails is skipped for DB_REPLICA_RETRY seconds.
+    DB_REPLICA_URLS: list = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+    DB_REPLICA_STRATEGY: str = os.getenv("DB_REPLICA_STRATEGY", "round-robin")
+    DB_REPLICA_RETRY: float = float(os.getenv("DB_REPLICA_RETRY", "30"))
+    # The schema is migrated by `python migrate.py`, not by the apps. "true" makes
+    # each app run the migration at startup instead, for local development.
+    DB_CREATE_TABLES_ON_STARTUP: bool = os.getenv("DB_CREATE_TABLES_ON_STARTUP", "false").lower() in ("1", "true", "yes")
+    # Queries and requests slower than these (milliseconds) are logged with their SQL;
+    # see instrumentation.py and GET /metrics.
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))
+    SLOW_REQUEST_MS: float = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+    # Rows fetched and encoded per batch by the streaming /api/export/{table} endpoints.
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    # Default and maximum rows per executemany for the /bulk endpoints.
+    BULK_CHUNK_SIZE: int = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+    BULK_MAX_CHUNK_SIZE: int = int(os.getenv("BULK_MAX_CHUNK_SIZE", "10000"))
+    # Seconds between in-process overdue-task sweeps (see overdue_sweeper.py). Off by
+    # default so workers boot without one; set it in one process, or schedule
+    # `python overdue_sweeper.py --interval N` instead.
+    OVERDUE_SWEEP_INTERVAL: float = float(os.getenv("OVERDUE_SWEEP_INTERVAL", "0"))
+    # Optional alert_broker.py address (tcp://host:port) so /api/alerts/stream sees
+    # alerts written by every worker, and the stream's keep-alive interval in seconds.
+    ALERT_BROKER_URL: str = os.getenv("ALERT_BROKER_URL")
+    ALERT_STREAM_HEARTBEAT: float = float(os.getenv("ALERT_STREAM_HEARTBEAT", "15"))
+    # KPI classification backend: "scoring" (in-process, default), "llama" or "llama-async".
+    KPI_CLASSIFIER: str = os.getenv("KPI_CLASSIFIER", "scoring")
+    # Optional JSON parameters for the scoring classifier (see ScoringKpiClassifier.save).
+    KPI_MODEL_PATH: str = os.getenv("KPI_MODEL_PATH")
+    LLAMA_API_URL: str = os.getenv("LLAMA_API_URL", "http://localhost:11434/api/generate")
+    LLAMA_MODEL: str = os.getenv("LLAMA_MODEL", "llama3")
+    # Cache of Llama3 answers keyed on the feature vector; 0 disables it.
+    LLAMA_CACHE_SIZE: int = int(os.getenv("LLAMA_CACHE_SIZE", "10000"))
+    LLAMA_CACHE_TTL: float = float(os.getenv("LLAMA_CACHE_TTL", "86400"))
+    # Optional SQLite file so cached answers survive restarts.
+    LLAMA_CACHE_PATH: str = os.getenv("LLAMA_CACHE_PATH")
+    # "llama-async" client: per-call timeout (seconds), concurrent model calls,
+    # retries with exponential backoff, and the circuit breaker that switches to
+    # the scoring classifier after LLAMA_BREAKER_THRESHOLD consecutive failures
+    # for LLAMA_BREAKER_RESET seconds.
+    LLAMA_TIMEOUT: float = float(os.getenv("LLAMA_TIMEOUT", "10"))
+    LLAMA_MAX_CONCURRENCY: int = int(os.getenv("LLAMA_MAX_CONCURRENCY", "8"))
+    LLAMA_RETRIES: int = int(os.getenv("LLAMA_RETRIES", "2"))
+    LLAMA_RETRY_BACKOFF: float = float(os.getenv("LLAMA_RETRY_BACKOFF", "0.25"))
+    LLAMA_BREAKER_THRESHOLD: int = int(os.getenv("LLAMA_BREAKER_THRESHOLD", "5"))
+    LLAMA_BREAKER_RESET: float = float(os.getenv("LLAMA_BREAKER_RESET", "30"))
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
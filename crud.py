@@ -1,22 +1,63 @@
 # Backend/crud.py
 
-from sqlalchemy.orm import Session
-from typing import List, Optional
+import logging
+import os
+import threading
+import time
+from sqlalchemy import func, insert, update, delete, inspect
+from sqlalchemy.exc import SQLAlchemyError
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
+from typing import Any, Dict, List, Optional, Sequence
 from fastapi import HTTPException
-import models, schemas
-from llama_kpi_agent import Llama3Client
-
-llama_client = Llama3Client()
-
-# --- Employee CRUD ---
+import models, schemas, kpi_engine, alert_stream, versioning, entity_cache, fast_json
+from pagination import paginate, keyset_columns
+from database import replica_read
+from kpi_classifier import KPI_CLASSES, KpiClassifier, get_kpi_classifier
+from config import settings
+
+logger = logging.getLogger("crud")
+
+# The configured classifier is built on first use (the app lifespans build it
+# at startup), so importing crud neither loads a model nor opens a client.
+_kpi_classifier: Optional[KpiClassifier] = None
+_kpi_classifier_lock = threading.Lock()
+
+def kpi_classifier() -> KpiClassifier:
+    global _kpi_classifier
+    if _kpi_classifier is None:
+        with _kpi_classifier_lock:
+            if _kpi_classifier is None:
+                _kpi_classifier = get_kpi_classifier()
+    return _kpi_classifier
+
+def close_kpi_classifier():
+    global _kpi_classifier
+    with _kpi_classifier_lock:
+        classifier, _kpi_classifier = _kpi_classifier, None
+    if classifier is not None:
+        classifier.close()
+
+def _classifier_after_fork():
+    # A classifier built before fork (see serve.py) is shared with the parent copy-on-write.
+    if _kpi_classifier is not None:
+        _kpi_classifier.after_fork()
+
+os.register_at_fork(after_in_child=_classifier_after_fork)
+
+# --- Employee CRUD ---
+@replica_read
 def get_employee(db: Session, employee_id: int):
-    return db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
+    return entity_cache.read_through("employee", employee_id, schemas.Employee, lambda: db.query(models.Employee).filter(
+        models.Employee.employee_id == employee_id
+    ).first())
 
 def get_employee_by_email(db: Session, email: str):
     return db.query(models.Employee).filter(models.Employee.email == email).first()
-
-def get_employees(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Employee).offset(skip).limit(limit).all()
+
+@replica_read
+def get_employees(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(models.Employee), models.Employee, skip, limit, cursor).all()
 
 def create_employee(db: Session, employee: schemas.EmployeeCreate):
     db_employee = models.Employee(
@@ -38,6 +79,7 @@ def update_employee(db: Session, employee_id: int, employee_update: schemas.Empl
     for field, value in update_data.items():
         setattr(db_employee, field, value)
     
+    entity_cache.invalidate(db, "employee", employee_id)
     db.commit()
     db.refresh(db_employee)
     return db_employee
@@ -46,16 +88,21 @@ def delete_employee(db: Session, employee_id: int):
     db_employee = db.query(models.Employee).filter(models.Employee.employee_id == employee_id).first()
     if db_employee:
         db.delete(db_employee)
+        entity_cache.invalidate(db, "employee", employee_id)
         db.commit()
         return True
     return False
 
-# --- Customer CRUD ---
+# --- Customer CRUD ---
+@replica_read
 def get_customer(db: Session, customer_id: int):
-    return db.query(models.Customer).filter(models.Customer.customer_id == customer_id).first()
-
-def get_customers(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Customer).offset(skip).limit(limit).all()
+    return entity_cache.read_through("customer", customer_id, schemas.Customer, lambda: db.query(models.Customer).filter(
+        models.Customer.customer_id == customer_id
+    ).first())
+
+@replica_read
+def get_customers(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(models.Customer), models.Customer, skip, limit, cursor).all()
 
 def create_customer(db: Session, customer: schemas.CustomerCreate):
     db_customer = models.Customer(**customer.model_dump())
@@ -73,6 +120,7 @@ def update_customer(db: Session, customer_id: int, customer_update: schemas.Cust
     for field, value in update_data.items():
         setattr(db_customer, field, value)
     
+    entity_cache.invalidate(db, "customer", customer_id)
     db.commit()
     db.refresh(db_customer)
     return db_customer
@@ -81,21 +129,85 @@ def delete_customer(db: Session, customer_id: int):
     db_customer = db.query(models.Customer).filter(models.Customer.customer_id == customer_id).first()
     if db_customer:
         db.delete(db_customer)
+        entity_cache.invalidate(db, "customer", customer_id)
         db.commit()
         return True
     return False
 
-# --- Project CRUD ---
+# --- Project CRUD ---
+@replica_read
 def get_project(db: Session, project_id: int):
-    return db.query(models.Project).filter(models.Project.project_id == project_id).first()
-
-def get_projects(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Project).offset(skip).limit(limit).all()
+    return entity_cache.read_through("project", project_id, schemas.Project, lambda: db.query(models.Project).filter(
+        models.Project.project_id == project_id
+    ).first())
+
+PROJECT_RELATIONSHIPS = ("customer", "tasks", "phases", "alerts", "budget_history", "kpis")
+
+def parse_project_expand(expand: Optional[str]) -> List[str]:
+    if not expand:
+        return []
+    fields = [field.strip() for field in expand.split(",") if field.strip()]
+    unknown = [field for field in fields if field not in PROJECT_RELATIONSHIPS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot expand {', '.join(unknown)}. Allowed: {', '.join(PROJECT_RELATIONSHIPS)}"
+        )
+    return list(dict.fromkeys(fields))
+
+def project_load_options(expand: Sequence[str]):
+    # One extra SELECT ... WHERE project_id IN (...) per collection, whatever the page size;
+    # the many-to-one customer rides along in the main query.
+    return [
+        joinedload(models.Project.customer) if field == "customer" else selectinload(getattr(models.Project, field))
+        for field in expand
+    ]
+
+def project_field_options(fields: Optional[Sequence[str]], order=None):
+    """
+    load_only() for a `fields=` selection: the requested columns plus the
+    keyset, which the next cursor is read from.
+    """
+    if not fields:
+        return []
+    keys = [field for field in fields if field != "id"] + [column.key for column in keyset_columns(models.Project, order)]
+    return [load_only(*(getattr(models.Project, key) for key in dict.fromkeys(keys)))]
+
+@replica_read
+def get_project_full(db: Session, project_id: int):
+    return db.query(models.Project).options(*project_load_options(PROJECT_RELATIONSHIPS)).filter(
+        models.Project.project_id == project_id
+    ).first()
+
+PROJECT_SORT_FIELDS = ("project_name", "status", "customer_id", "completion_percentage", "budget_total", "start_date", "launch_date")
+
+def filter_projects(query, filters: Optional[schemas.ProjectFilter]):
+    if filters is None:
+        return query
+    if filters.status is not None:
+        query = query.where(models.Project.status == filters.status)
+    if filters.customer_id is not None:
+        query = query.where(models.Project.customer_id == filters.customer_id)
+    if filters.budget_status is not None:
+        query = query.where(models.Project.budget_status == filters.budget_status)
+    if filters.name:
+        query = query.where(models.Project.project_name.ilike(f"%{filters.name}%"))
+    return query
+
+@replica_read
+def get_projects(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+                 filters: Optional[schemas.ProjectFilter] = None, order=None, expand: Sequence[str] = (),
+                 fields: Optional[Sequence[str]] = None):
+    query = filter_projects(db.query(models.Project), filters).options(
+        *project_load_options(expand), *project_field_options(fields, order)
+    )
+    return paginate(query, models.Project, skip, limit, cursor, order).all()
 
 def create_project(db: Session, project: schemas.ProjectCreate):
     db_project = models.Project(**project.model_dump())
     db.add(db_project)
     db.commit()
+    invalidate_dashboard_summary()
     db.refresh(db_project)
     return db_project
 
@@ -104,11 +216,16 @@ def update_project(db: Session, project_id: int, project_update: schemas.Project
     if not db_project:
         return None
     
+    before = kpi_engine.snapshot(db_project)
     update_data = project_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_project, field, value)
     
+    db.flush()
+    kpi_engine.apply_change(db, before, kpi_engine.snapshot(db_project))
+    entity_cache.invalidate(db, "project", project_id)
     db.commit()
+    invalidate_dashboard_summary()
     db.refresh(db_project)
     return db_project
 
@@ -116,21 +233,48 @@ def delete_project(db: Session, project_id: int):
     db_project = db.query(models.Project).filter(models.Project.project_id == project_id).first()
     if db_project:
         db.delete(db_project)
+        entity_cache.invalidate(db, "project", project_id)
+        entity_cache.invalidate(db, "project_kpi", project_id)
         db.commit()
+        invalidate_dashboard_summary()
         return True
     return False
 
-# --- Task CRUD ---
+# --- Task CRUD ---
+@replica_read
 def get_task(db: Session, task_id: int):
     return db.query(models.Task).filter(models.Task.task_id == task_id).first()
 
-def get_tasks(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Task).offset(skip).limit(limit).all()
+TASK_SORT_FIELDS = ("task_name", "deadline", "status", "project_id", "employee_id")
+
+def filter_tasks(query, filters: Optional[schemas.TaskFilter]):
+    if filters is None:
+        return query
+    if filters.project_id is not None:
+        query = query.where(models.Task.project_id == filters.project_id)
+    if filters.employee_id is not None:
+        query = query.where(models.Task.employee_id == filters.employee_id)
+    if filters.status is not None:
+        query = query.where(models.Task.status == filters.status)
+    if filters.deadline_from is not None:
+        query = query.where(models.Task.deadline >= filters.deadline_from)
+    if filters.deadline_to is not None:
+        query = query.where(models.Task.deadline <= filters.deadline_to)
+    return query
+
+@replica_read
+def get_tasks(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+              filters: Optional[schemas.TaskFilter] = None, order=None):
+    query = filter_tasks(db.query(models.Task), filters)
+    return paginate(query, models.Task, skip, limit, cursor, order).all()
 
 def create_task(db: Session, task: schemas.TaskCreate):
     db_task = models.Task(**task.model_dump())
     db.add(db_task)
+    db.flush()
+    kpi_engine.apply_change(db, None, kpi_engine.snapshot(db_task))
     db.commit()
+    invalidate_dashboard_summary()
     db.refresh(db_task)
     return db_task
 
@@ -139,29 +283,40 @@ def update_task(db: Session, task_id: int, task_update: schemas.TaskUpdate):
     if not db_task:
         return None
     
+    before = kpi_engine.snapshot(db_task)
     update_data = task_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_task, field, value)
     
+    db.flush()
+    kpi_engine.apply_change(db, before, kpi_engine.snapshot(db_task))
     db.commit()
+    invalidate_dashboard_summary()
     db.refresh(db_task)
     return db_task
 
 def delete_task(db: Session, task_id: int):
     db_task = db.query(models.Task).filter(models.Task.task_id == task_id).first()
     if db_task:
+        before = kpi_engine.snapshot(db_task)
         db.delete(db_task)
+        db.flush()
+        kpi_engine.apply_change(db, before, None)
         db.commit()
+        invalidate_dashboard_summary()
         return True
     return False
 
-# --- Project Phase CRUD ---
+# --- Project Phase CRUD ---
+@replica_read
 def get_project_phase(db: Session, phase_id: int):
     return db.query(models.Project_Phase).filter(models.Project_Phase.phase_id == phase_id).first()
-
-def get_project_phases(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Project_Phase).offset(skip).limit(limit).all()
-
+
+@replica_read
+def get_project_phases(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(models.Project_Phase), models.Project_Phase, skip, limit, cursor).all()
+
+@replica_read
 def get_project_phases_by_project(db: Session, project_id: int):
     return db.query(models.Project_Phase).filter(models.Project_Phase.project_id == project_id).all()
 
@@ -193,18 +348,47 @@ def delete_project_phase(db: Session, phase_id: int):
         return True
     return False
 
-# --- Alert CRUD ---
+# --- Alert CRUD ---
+@replica_read
 def get_alert(db: Session, alert_id: int):
     return db.query(models.Alert).filter(models.Alert.alert_id == alert_id).first()
 
-def get_alerts(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Alert).offset(skip).limit(limit).all()
+ALERT_SORT_FIELDS = ("created_at", "alert_type", "status", "project_id")
+
+def filter_alerts(query, filters: Optional[schemas.AlertFilter]):
+    if filters is None:
+        return query
+    if filters.status is not None:
+        query = query.where(models.Alert.status == filters.status)
+    if filters.alert_type is not None:
+        query = query.where(models.Alert.alert_type == filters.alert_type)
+    if filters.alert_source is not None:
+        query = query.where(models.Alert.alert_source == filters.alert_source)
+    if filters.project_id is not None:
+        query = query.where(models.Alert.project_id == filters.project_id)
+    if filters.task_id is not None:
+        query = query.where(models.Alert.task_id == filters.task_id)
+    if filters.created_from is not None:
+        query = query.where(models.Alert.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.where(models.Alert.created_at <= filters.created_to)
+    return query
+
+@replica_read
+def get_alerts(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+               filters: Optional[schemas.AlertFilter] = None, order=None):
+    query = filter_alerts(db.query(models.Alert), filters)
+    return paginate(query, models.Alert, skip, limit, cursor, order).all()
 
 def create_alert(db: Session, alert: schemas.AlertCreate):
     db_alert = models.Alert(**alert.model_dump())
     db.add(db_alert)
+    db.flush()
+    kpi_engine.apply_change(db, None, kpi_engine.snapshot(db_alert))
     db.commit()
+    invalidate_dashboard_summary()
     db.refresh(db_alert)
+    alert_stream.publish_alert("created", db_alert)
     return db_alert
 
 def update_alert(db: Session, alert_id: int, alert_update: schemas.AlertUpdate):
@@ -212,35 +396,49 @@ def update_alert(db: Session, alert_id: int, alert_update: schemas.AlertUpdate):
     if not db_alert:
         return None
     
+    before = kpi_engine.snapshot(db_alert)
     update_data = alert_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_alert, field, value)
     
+    db.flush()
+    kpi_engine.apply_change(db, before, kpi_engine.snapshot(db_alert))
     db.commit()
+    invalidate_dashboard_summary()
     db.refresh(db_alert)
+    alert_stream.publish_alert("updated", db_alert)
     return db_alert
 
 def delete_alert(db: Session, alert_id: int):
     db_alert = db.query(models.Alert).filter(models.Alert.alert_id == alert_id).first()
     if db_alert:
+        before = kpi_engine.snapshot(db_alert)
         db.delete(db_alert)
+        db.flush()
+        kpi_engine.apply_change(db, before, None)
         db.commit()
+        invalidate_dashboard_summary()
         return True
     return False
 
-# --- Budget History CRUD ---
+# --- Budget History CRUD ---
+@replica_read
 def get_budget_history(db: Session, history_id: int):
     return db.query(models.Budget_History).filter(models.Budget_History.history_id == history_id).first()
-
-def get_budget_histories(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Budget_History).offset(skip).limit(limit).all()
-
+
+@replica_read
+def get_budget_histories(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(models.Budget_History), models.Budget_History, skip, limit, cursor).all()
+
+@replica_read
 def get_budget_history_by_project(db: Session, project_id: int):
     return db.query(models.Budget_History).filter(models.Budget_History.project_id == project_id).all()
 
 def create_budget_history(db: Session, budget_history: schemas.BudgetHistoryCreate):
     db_budget_history = models.Budget_History(**budget_history.model_dump())
     db.add(db_budget_history)
+    db.flush()
+    kpi_engine.apply_change(db, None, kpi_engine.snapshot(db_budget_history))
     db.commit()
     db.refresh(db_budget_history)
     return db_budget_history
@@ -250,10 +448,13 @@ def update_budget_history(db: Session, history_id: int, budget_update: schemas.B
     if not db_budget_history:
         return None
     
+    before = kpi_engine.snapshot(db_budget_history)
     update_data = budget_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(db_budget_history, field, value)
     
+    db.flush()
+    kpi_engine.apply_change(db, before, kpi_engine.snapshot(db_budget_history))
     db.commit()
     db.refresh(db_budget_history)
     return db_budget_history
@@ -261,20 +462,28 @@ def update_budget_history(db: Session, history_id: int, budget_update: schemas.B
 def delete_budget_history(db: Session, history_id: int):
     db_budget_history = db.query(models.Budget_History).filter(models.Budget_History.history_id == history_id).first()
     if db_budget_history:
+        before = kpi_engine.snapshot(db_budget_history)
         db.delete(db_budget_history)
+        db.flush()
+        kpi_engine.apply_change(db, before, None)
         db.commit()
         return True
     return False
 
-# --- Project KPI CRUD ---
+# --- Project KPI CRUD ---
+@replica_read
 def get_project_kpi(db: Session, kpi_id: int):
     return db.query(models.Project_KPI).filter(models.Project_KPI.kpi_id == kpi_id).first()
-
-def get_project_kpis(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Project_KPI).offset(skip).limit(limit).all()
-
+
+@replica_read
+def get_project_kpis(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+    return paginate(db.query(models.Project_KPI), models.Project_KPI, skip, limit, cursor).all()
+
+@replica_read
 def get_project_kpi_by_project(db: Session, project_id: int):
-    return db.query(models.Project_KPI).filter(models.Project_KPI.project_id == project_id).first()
+    return entity_cache.read_through("project_kpi", project_id, schemas.ProjectKpi, lambda: db.query(models.Project_KPI).filter(
+        models.Project_KPI.project_id == project_id
+    ).first())
 
 def create_project_kpi(db: Session, kpi: schemas.ProjectKpiCreate):
     db_kpi = models.Project_KPI(**kpi.model_dump())
@@ -292,6 +501,7 @@ def update_project_kpi(db: Session, kpi_id: int, kpi_update: schemas.ProjectKpiU
     for field, value in update_data.items():
         setattr(db_kpi, field, value)
     
+    entity_cache.invalidate(db, "project_kpi", db_kpi.project_id)
     db.commit()
     db.refresh(db_kpi)
     return db_kpi
@@ -300,17 +510,268 @@ def delete_project_kpi(db: Session, kpi_id: int):
     db_kpi = db.query(models.Project_KPI).filter(models.Project_KPI.kpi_id == kpi_id).first()
     if db_kpi:
         db.delete(db_kpi)
+        entity_cache.invalidate(db, "project_kpi", db_kpi.project_id)
         db.commit()
         return True
     return False
 
-# --- Llama3 Integration for KPI Classification ---
-def classify_and_update_project_kpi_class(db: Session, project_id: int):
-    db_kpi = db.query(models.Project_KPI).filter(models.Project_KPI.project_id == project_id).first()
-    if not db_kpi:
-        return None
-
-    kpi_data = {
+# --- List pages as result tuples ---
+def row_columns(model, schema, fields=None, order=None) -> list:
+    """
+    The columns to select for `schema` (or just its `fields`), plus any keyset
+    column not among them so the next cursor can still be read off the last row.
+    """
+    row_serializer = fast_json.serializer(model, schema, fields)
+    return row_serializer.columns + row_serializer.missing(keyset_columns(model, order))
+
+@replica_read
+def get_rows(db: Session, model, schema, skip: int = 0, limit: int = 100, cursor: Optional[str] = None,
+             order=None, filters=None, apply_filters=None, fields=None):
+    """
+    A page of `model` as plain tuples of `schema`'s columns, for
+    fast_json.page_response: no ORM objects, no identity map. `fields`
+    (from fast_json.parse_fields) narrows the SELECT to those columns.
+    """
+    query = db.query(*row_columns(model, schema, fields, order))
+    if apply_filters is not None:
+        query = apply_filters(query, filters)
+    return paginate(query, model, skip, limit, cursor, order).all()
+
+@replica_read
+def get_row(db: Session, model, schema, key, fields=None):
+    """One row of `model` by primary key, as a tuple of `schema`'s (or just `fields`') columns."""
+    columns = fast_json.serializer(model, schema, fields).columns
+    return db.query(*columns).filter(inspect(model).primary_key[0] == key).first()
+
+# --- Bulk Operations ---
+# Rows are validated one by one so bad input is reported per row, then written
+# chunk by chunk with a single executemany per chunk, all in one transaction.
+# Each chunk runs in a SAVEPOINT; if it fails, that chunk alone is retried row by
+# row to pinpoint the offending rows and the rest of the batch still commits.
+# write_chunk and finish_bulk are shared with bulk_import.py.
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in error.errors())
+
+def _db_error_message(error: SQLAlchemyError) -> str:
+    return str(getattr(error, "orig", None) or error)
+
+def write_chunk(db: Session, chunk, execute, errors: List[schemas.BulkRowError]) -> int:
+    """`chunk` is a list of (row index, payload); `execute` writes a list of payloads."""
+    try:
+        with db.begin_nested():
+            execute([payload for _, payload in chunk])
+        return len(chunk)
+    except SQLAlchemyError:
+        written = 0
+        for index, payload in chunk:
+            try:
+                with db.begin_nested():
+                    execute([payload])
+                written += 1
+            except SQLAlchemyError as e:
+                errors.append(schemas.BulkRowError(index=index, error=_db_error_message(e)))
+        return written
+
+def finish_bulk(db: Session, model, succeeded: int, errors: List[schemas.BulkRowError],
+                kpi_projects: Optional[set] = None) -> schemas.BulkResult:
+    """Rebuild the KPIs of `kpi_projects`, commit, and report the batch."""
+    if kpi_projects and succeeded:
+        kpi_engine.rebuild_project_kpis(db, kpi_projects)
+    db.commit()
+    if model in DASHBOARD_MODELS and succeeded:
+        invalidate_dashboard_summary()
+    errors.sort(key=lambda error: error.index)
+    return schemas.BulkResult(succeeded=succeeded, failed=len(errors), errors=errors)
+
+def bulk_create(db: Session, model, create_schema, rows: List[Dict[str, Any]], chunk_size: int) -> schemas.BulkResult:
+    errors = []
+    valid = []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, create_schema.model_validate(row).model_dump()))
+        except ValidationError as e:
+            errors.append(schemas.BulkRowError(index=index, error=_validation_message(e)))
+
+    succeeded = 0
+    for chunk in _chunks(valid, chunk_size):
+        succeeded += write_chunk(db, chunk, lambda payloads: db.execute(insert(model), payloads), errors)
+    kpi_projects = None
+    if model in kpi_engine.SOURCE_MODELS:
+        kpi_projects = {payload.get("project_id") for _, payload in valid} - {None}
+    return finish_bulk(db, model, succeeded, errors, kpi_projects)
+
+def _existing_ids(db: Session, pk, ids) -> set:
+    return {row_id for (row_id,) in db.query(pk).filter(pk.in_(set(ids))).all()}
+
+def bulk_update(db: Session, model, update_schema, rows: List[Dict[str, Any]], chunk_size: int) -> schemas.BulkResult:
+    pk = inspect(model).primary_key[0]
+    errors = []
+    valid = []
+    for index, row in enumerate(rows):
+        row_id = row.get(pk.key)
+        if not isinstance(row_id, int):
+            errors.append(schemas.BulkRowError(index=index, error=f"{pk.key}: an integer id is required"))
+            continue
+        try:
+            changes = update_schema.model_validate({k: v for k, v in row.items() if k != pk.key}).model_dump(exclude_unset=True)
+        except ValidationError as e:
+            errors.append(schemas.BulkRowError(index=index, error=_validation_message(e)))
+            continue
+        if changes:
+            valid.append((index, {pk.key: row_id, **changes}))
+
+    succeeded = 0
+    kpi_projects = set()
+    for chunk in _chunks(valid, chunk_size):
+        existing = _existing_ids(db, pk, (payload[pk.key] for _, payload in chunk))
+        found = []
+        for index, payload in chunk:
+            if payload[pk.key] in existing:
+                found.append((index, payload))
+            else:
+                errors.append(schemas.BulkRowError(index=index, error=f"{model.__name__} {payload[pk.key]} not found"))
+        # Projects the rows belong to before and after the update.
+        kpi_projects |= kpi_engine.affected_projects(db, model, (payload[pk.key] for _, payload in found))
+        kpi_projects |= {payload.get("project_id") for _, payload in found} - {None}
+        # ORM bulk UPDATE by primary key: one executemany per distinct set of changed columns.
+        succeeded += write_chunk(db, found, lambda payloads: db.execute(update(model), payloads), errors)
+    return finish_bulk(db, model, succeeded, errors, kpi_projects)
+
+def bulk_delete(db: Session, model, ids: List[int], chunk_size: int) -> schemas.BulkResult:
+    pk = inspect(model).primary_key[0]
+    errors = []
+    succeeded = 0
+    kpi_projects = set()
+    for chunk in _chunks(list(enumerate(ids)), chunk_size):
+        existing = _existing_ids(db, pk, (row_id for _, row_id in chunk))
+        found = []
+        for index, row_id in chunk:
+            if row_id in existing:
+                found.append((index, row_id))
+            else:
+                errors.append(schemas.BulkRowError(index=index, error=f"{model.__name__} {row_id} not found"))
+        kpi_projects |= kpi_engine.affected_projects(db, model, (row_id for _, row_id in found))
+        succeeded += write_chunk(
+            db, found, lambda row_ids: db.execute(delete(model).where(pk.in_(row_ids)), execution_options={"synchronize_session": False}), errors
+        )
+    return finish_bulk(db, model, succeeded, errors, kpi_projects)
+
+def bulk_create_tasks(db: Session, rows: List[Dict[str, Any]], chunk_size: int):
+    return bulk_create(db, models.Task, schemas.TaskCreate, rows, chunk_size)
+
+def bulk_update_tasks(db: Session, rows: List[Dict[str, Any]], chunk_size: int):
+    return bulk_update(db, models.Task, schemas.TaskUpdate, rows, chunk_size)
+
+def bulk_delete_tasks(db: Session, ids: List[int], chunk_size: int):
+    return bulk_delete(db, models.Task, ids, chunk_size)
+
+def bulk_create_alerts(db: Session, rows: List[Dict[str, Any]], chunk_size: int):
+    result = bulk_create(db, models.Alert, schemas.AlertCreate, rows, chunk_size)
+    if result.succeeded:
+        # executemany returns no ids; streams pick the new alerts up from the database.
+        alert_stream.publish_resync()
+    return result
+
+def bulk_update_alerts(db: Session, rows: List[Dict[str, Any]], chunk_size: int):
+    result = bulk_update(db, models.Alert, schemas.AlertUpdate, rows, chunk_size)
+    if result.succeeded and alert_stream.hub.listening:
+        failed = {error.index for error in result.errors}
+        ids = [row.get("alert_id") for index, row in enumerate(rows) if index not in failed]
+        for chunk in _chunks(ids, chunk_size):
+            for db_alert in db.query(models.Alert).filter(models.Alert.alert_id.in_(chunk)).all():
+                alert_stream.publish_alert("updated", db_alert)
+    return result
+
+def bulk_delete_alerts(db: Session, ids: List[int], chunk_size: int):
+    return bulk_delete(db, models.Alert, ids, chunk_size)
+
+def bulk_create_budget_histories(db: Session, rows: List[Dict[str, Any]], chunk_size: int):
+    return bulk_create(db, models.Budget_History, schemas.BudgetHistoryCreate, rows, chunk_size)
+
+def bulk_update_budget_histories(db: Session, rows: List[Dict[str, Any]], chunk_size: int):
+    return bulk_update(db, models.Budget_History, schemas.BudgetHistoryUpdate, rows, chunk_size)
+
+def bulk_delete_budget_histories(db: Session, ids: List[int], chunk_size: int):
+    return bulk_delete(db, models.Budget_History, ids, chunk_size)
+
+# --- Dashboard Summary ---
+# Aggregates are cached in-process. Writes through this module invalidate the
+# cache immediately. Entries also remember the table versions they were computed
+# at, so writes made by other workers invalidate them too when versions are
+# shared (VERSION_STORE_PATH); otherwise the TTL bounds that staleness.
+DASHBOARD_MODELS = (models.Project, models.Task, models.Alert)
+DASHBOARD_TABLES = tuple(model.__table__.name for model in DASHBOARD_MODELS)
+_dashboard_cache = {"summary": None, "expires_at": 0.0, "generation": 0, "versions": None}
+_dashboard_lock = threading.Lock()
+
+def invalidate_dashboard_summary():
+    with _dashboard_lock:
+        _dashboard_cache["summary"] = None
+        _dashboard_cache["generation"] += 1
+
+def _count_by(db: Session, column):
+    return {key: count for key, count in db.query(column, func.count()).group_by(column).all()}
+
+def compute_dashboard_summary(db: Session) -> schemas.DashboardSummary:
+    projects_by_status = {}
+    total_budget = total_budget_used = 0.0
+    project_rows = db.query(
+        models.Project.status,
+        func.count(),
+        func.sum(models.Project.budget_total),
+        func.sum(models.Project.budget_used)
+    ).group_by(models.Project.status).all()
+    for status, count, budget_total, budget_used in project_rows:
+        projects_by_status[status] = count
+        total_budget += float(budget_total or 0)
+        total_budget_used += float(budget_used or 0)
+
+    tasks_by_status = _count_by(db, models.Task.status)
+    alerts_by_status = _count_by(db, models.Alert.status)
+    alerts_by_type = _count_by(db, models.Alert.alert_type)
+
+    return schemas.DashboardSummary(
+        total_projects=sum(projects_by_status.values()),
+        total_tasks=sum(tasks_by_status.values()),
+        total_budget=total_budget,
+        total_budget_used=total_budget_used,
+        total_alerts=sum(alerts_by_status.values()),
+        unread_alerts=alerts_by_status.get("Unread", 0),
+        projects_by_status=projects_by_status,
+        tasks_by_status=tasks_by_status,
+        alerts_by_status=alerts_by_status,
+        alerts_by_type=alerts_by_type
+    )
+
+@replica_read
+def get_dashboard_summary(db: Session) -> schemas.DashboardSummary:
+    versions = versioning.store.read(DASHBOARD_TABLES)
+    with _dashboard_lock:
+        summary = _dashboard_cache["summary"]
+        if (summary is not None and time.monotonic() < _dashboard_cache["expires_at"]
+                and _dashboard_cache["versions"] == versions):
+            return summary
+        generation = _dashboard_cache["generation"]
+
+    with versioning.watch_replica_reads() as replica_reads:
+        summary = compute_dashboard_summary(db)
+
+    with _dashboard_lock:
+        # Don't cache a result that a concurrent write has already made stale,
+        # or one read from a replica that may be behind `versions`.
+        if _dashboard_cache["generation"] == generation and not replica_reads:
+            _dashboard_cache["summary"] = summary
+            _dashboard_cache["expires_at"] = time.monotonic() + settings.DASHBOARD_CACHE_TTL
+            _dashboard_cache["versions"] = versions
+    return summary
+
+# --- KPI Classification ---
+def build_kpi_features(db_kpi: models.Project_KPI) -> dict:
+    return {
         "completion_percentage": float(db_kpi.completion_percentage or 0),
         "milestone_completion": float(db_kpi.milestone_completion or 0),
         "budget_utilization": float(db_kpi.budget_utilization or 0),
@@ -324,12 +785,93 @@ def classify_and_update_project_kpi_class(db: Session, project_id: int):
         "risk_flag": bool(db_kpi.risk_flag or False)
     }
 
+def classify_and_update_project_kpi_class(db: Session, project_id: int):
+    db_kpi = db.query(models.Project_KPI).filter(models.Project_KPI.project_id == project_id).first()
+    if not db_kpi:
+        return None
+
+    kpi_data = build_kpi_features(db_kpi)
+
     try:
-        kpi_class_prediction = llama_client.classify_kpi_class(**kpi_data)
+        kpi_class_prediction = kpi_classifier().classify_kpi_class(**kpi_data)
+        if kpi_class_prediction not in KPI_CLASSES:
+            return None
         db_kpi.kpi_class = kpi_class_prediction
+        entity_cache.invalidate(db, "project_kpi", project_id)
         db.commit()
         db.refresh(db_kpi)
         return db_kpi
-    except Exception as e:
-        print(f"Error classifying KPI for project {project_id}: {e}")
-        return None
\ No newline at end of file
+    except Exception:
+        logger.exception("Error classifying KPI for project %s", project_id)
+        return None
+
+KPI_FEATURE_COLUMNS = (
+    models.Project_KPI.completion_percentage,
+    models.Project_KPI.milestone_completion,
+    models.Project_KPI.budget_utilization,
+    models.Project_KPI.schedule_variance,
+    models.Project_KPI.overdue_tasks,
+    models.Project_KPI.alert_count,
+    models.Project_KPI.avg_task_completion_time,
+    models.Project_KPI.employee_workload_index,
+    models.Project_KPI.customer_priority_level,
+    models.Project_KPI.reopened_tasks,
+    models.Project_KPI.risk_flag,
+)
+
+def kpi_feature_chunk(db: Session, last_id: int, chunk_size: int):
+    """The next `chunk_size` Project_KPIs rows after `last_id`, and their feature matrix."""
+    rows = db.query(models.Project_KPI.kpi_id, models.Project_KPI.kpi_class, *KPI_FEATURE_COLUMNS).filter(
+        models.Project_KPI.kpi_id > last_id
+    ).order_by(models.Project_KPI.kpi_id).limit(chunk_size).all()
+    return rows, [tuple(build_kpi_features(row).values()) for row in rows]
+
+def write_kpi_classes(db: Session, rows, predictions: Sequence[str], by_class: Dict[str, int]) -> int:
+    """Store the predicted classes of a chunk that changed and commit; returns how many did."""
+    changed = {kpi_class: [] for kpi_class in KPI_CLASSES}
+    for row, prediction in zip(rows, predictions):
+        if prediction not in KPI_CLASSES:
+            continue
+        by_class[prediction] += 1
+        if prediction != row.kpi_class:
+            changed[prediction].append(row.kpi_id)
+
+    updated = 0
+    for kpi_class, kpi_ids in changed.items():
+        if kpi_ids:
+            db.execute(
+                update(models.Project_KPI).where(models.Project_KPI.kpi_id.in_(kpi_ids)).values(kpi_class=kpi_class),
+                execution_options={"synchronize_session": False}
+            )
+            updated += len(kpi_ids)
+    if updated:
+        entity_cache.invalidate(db, "project_kpi")
+    db.commit()
+    return updated
+
+def classify_all_project_kpis(db: Session, chunk_size: int = 5000, classifier=None) -> schemas.KpiBatchResult:
+    """
+    Reclassify every Project_KPIs row. Rows are streamed in primary-key order
+    `chunk_size` at a time, each chunk is scored as one feature matrix, and only
+    rows whose class changed are written back with one UPDATE per class.
+    """
+    classifier = classifier or kpi_classifier()
+    started = time.perf_counter()
+    processed = updated = 0
+    by_class = {kpi_class: 0 for kpi_class in KPI_CLASSES}
+    last_id = 0
+
+    while True:
+        rows, matrix = kpi_feature_chunk(db, last_id, chunk_size)
+        if not rows:
+            break
+        last_id = rows[-1].kpi_id
+        updated += write_kpi_classes(db, rows, classifier.classify_matrix(matrix), by_class)
+        processed += len(rows)
+
+    return schemas.KpiBatchResult(
+        processed=processed,
+        updated=updated,
+        by_class=by_class,
+        elapsed_seconds=round(time.perf_counter() - started, 3)
+    )
\ No newline at end of file
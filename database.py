@@ -1,21 +1,492 @@
-from sqlalchemy import create_engine
+import functools
+import inspect
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+from sqlalchemy import create_engine, event, exc, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from config import settings
+import versioning, entity_cache, instrumentation
+
+logger = logging.getLogger("database")
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, pool_pre_ping=True
+# --- Connection pool ---
+# Sized and checked per DB_POOL_* in config.py. Checkout latency, timeouts and
+# moments the pool ran dry are recorded for /metrics and /api/db/pool/stats.
+PRE_PING_STRATEGIES = ("always", "idle", "never")
+# Seconds between "pool exhausted" warnings per pool, so a saturated pool does not flood the log.
+EXHAUSTED_LOG_INTERVAL = 10.0
+
+POOL_CHECKOUT_SECONDS = instrumentation.Histogram(
+    "db_pool_checkout_seconds", "Time to get a connection from the pool.",
+    (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+)
+POOL_EXHAUSTED = instrumentation.Counter(
+    "db_pool_exhausted_total", "Checkouts that found no idle connection and no overflow left, and had to wait."
+)
+POOL_TIMEOUTS = instrumentation.Counter(
+    "db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT seconds."
 )
+instrumentation.METRICS.extend([POOL_CHECKOUT_SECONDS, POOL_EXHAUSTED, POOL_TIMEOUTS])
+
+class _InstrumentedPool:
+    """QueuePool mixin timing every checkout and reporting when the pool runs dry."""
+    label = "sync"
+
+    def _do_get(self):
+        if self.checkedin() == 0 and self._max_overflow > -1 and self.overflow() >= self._max_overflow:
+            self._exhausted()
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(engine=self.label)
+            logger.error("%s connection pool timed out after %ss: %s", self.label, self._timeout, self.status())
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, engine=self.label)
+
+    def _exhausted(self):
+        POOL_EXHAUSTED.inc(engine=self.label)
+        now = time.monotonic()
+        with _exhausted_lock:
+            if now - _exhausted_logged_at.get(self.label, float("-inf")) < EXHAUSTED_LOG_INTERVAL:
+                return
+            _exhausted_logged_at[self.label] = now
+        logger.warning("%s connection pool exhausted, checkouts are waiting (%d times so far): %s",
+                       self.label, POOL_EXHAUSTED.value(engine=self.label), self.status())
+
+_exhausted_lock = threading.Lock()
+_exhausted_logged_at: Dict[str, float] = {}
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    label = "async"
+
+@functools.lru_cache(maxsize=None)
+def _pool_class(base, label: str):
+    # A class rather than an attribute, so the label survives pool.recreate() on dispose().
+    return base if label == base.label else type(base.__name__, (base,), {"label": label})
+
+def _uses_queue_pool(url: str) -> bool:
+    # In-memory SQLite keeps one connection per thread, not a sized pool.
+    parsed = make_url(url)
+    return not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"))
+
+def engine_options(url: str, asynchronous: bool = False, label: Optional[str] = None) -> Dict[str, Any]:
+    """
+    create_engine / create_async_engine keyword arguments for the configured
+    pool. `label` names the pool in metrics (default "sync" or "async").
+    """
+    if settings.DB_POOL_PRE_PING not in PRE_PING_STRATEGIES:
+        raise ValueError(f"DB_POOL_PRE_PING must be one of {', '.join(PRE_PING_STRATEGIES)}, "
+                         f"not '{settings.DB_POOL_PRE_PING}'")
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING == "always"}
+    if _uses_queue_pool(url):
+        options.update(
+            poolclass=_pool_class(InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+                                  label or ("async" if asynchronous else "sync")),
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return options
+
+def _mark_checkin(dbapi_connection, connection_record):
+    connection_record.info["checked_in_at"] = time.monotonic()
+
+def _ping_if_idle(dbapi_connection, connection_record, connection_proxy):
+    # Raising DisconnectionError makes the pool drop this connection and retry with a fresh one.
+    checked_in_at = connection_record.info.get("checked_in_at")
+    if checked_in_at is None or time.monotonic() - checked_in_at < settings.DB_POOL_PING_IDLE:
+        return
+    try:
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT 1")
+        finally:
+            cursor.close()
+    except Exception as e:
+        raise exc.DisconnectionError(f"idle connection failed its ping: {e}") from e
+
+def configure_pool(bind):
+    """Install the "idle" pre-ping strategy on an engine's pool (sync engines; pass async_engine.sync_engine)."""
+    if settings.DB_POOL_PRE_PING == "idle" and not event.contains(bind.pool, "checkout", _ping_if_idle):
+        event.listen(bind.pool, "checkin", _mark_checkin)
+        event.listen(bind.pool, "checkout", _ping_if_idle)
+    return bind
+
+def _pools():
+    engines = [engine, *replicas.engines]
+    if async_engine is not None:
+        engines += [async_engine.sync_engine, *async_replicas.engines]
+    return [bind.pool for bind in engines if isinstance(bind.pool, _InstrumentedPool)]
+
+def pool_stats() -> Dict[str, Any]:
+    """Live state and checkout totals of each engine's pool."""
+    stats = {}
+    for pool in _pools():
+        checkouts, wait_seconds = POOL_CHECKOUT_SECONDS.totals(engine=pool.label)
+        stats[pool.label] = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": max(0, pool.overflow()),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool._timeout,
+            "recycle": pool._recycle,
+            "pre_ping": settings.DB_POOL_PRE_PING,
+            "checkouts": checkouts,
+            "wait_seconds": round(wait_seconds, 6),
+            "mean_wait_ms": round(wait_seconds / checkouts * 1000, 3) if checkouts else 0.0,
+            "exhausted": int(POOL_EXHAUSTED.value(engine=pool.label)),
+            "timeouts": int(POOL_TIMEOUTS.value(engine=pool.label)),
+        }
+    return stats
+
+def _pool_gauges():
+    gauges = (
+        ("db_pool_size", "Connections the pool keeps open.", lambda pool: pool.size()),
+        ("db_pool_checked_out", "Connections currently in use.", lambda pool: pool.checkedout()),
+        ("db_pool_checked_in", "Idle connections in the pool.", lambda pool: pool.checkedin()),
+        ("db_pool_overflow", "Connections open beyond the pool size.", lambda pool: max(0, pool.overflow())),
+    )
+    pools = _pools()
+    for name, help, read in gauges:
+        yield f"# HELP {name} {help}"
+        yield f"# TYPE {name} gauge"
+        for pool in pools:
+            yield f'{name}{{engine="{pool.label}"}} {read(pool)}'
+
+instrumentation.register_collector(_pool_gauges)
+
+# --- Read replicas ---
+# RoutingSession sends the queries of read-only crud lookups (functions wrapped
+# in replica_read) to a replica, and everything else to the primary. Once a
+# session has written anything (a flush, pending objects, or any INSERT/UPDATE/
+# DELETE) it stays on the primary, so a request reads its own writes.
+#
+# Replicas lag behind the primary: a read from one may miss a write another
+# request has just committed. Reads from a replica are reported to
+# versioning.watch_replica_reads, so such responses carry no ETag, and
+# entity_cache and the dashboard cache do not store what they read there.
+# Lookups that guard a write (get_employee_by_email before a create, the row
+# fetched by an update) are left on the primary.
+REPLICA_STRATEGIES = ("round-robin", "least-loaded")
+
+class ReplicaSet:
+    """The replica engines of one kind (sync or async), with selection and down-marking."""
+    def __init__(self, engines: List[Engine], strategy: str = "round-robin", retry_seconds: float = 30.0):
+        if strategy not in REPLICA_STRATEGIES:
+            raise ValueError(f"DB_REPLICA_STRATEGY must be one of {', '.join(REPLICA_STRATEGIES)}, not '{strategy}'")
+        self.engines = engines  # sync Engines; for async replicas, their .sync_engine
+        self.strategy = strategy
+        self.retry_seconds = retry_seconds
+        self._down_until: Dict[Engine, float] = {}
+        self._turn = 0
+        self._lock = threading.Lock()
+
+    def choose(self) -> Optional[Engine]:
+        """A replica to read from, or None if there is none up."""
+        now = time.monotonic()
+        with self._lock:
+            up = [bind for bind in self.engines if self._down_until.get(bind, 0) <= now]
+            if not up:
+                return None
+            self._turn += 1
+            start = self._turn % len(up)
+            rotated = up[start:] + up[:start]
+        if self.strategy == "least-loaded":
+            # Ties go round robin.
+            return min(rotated, key=lambda bind: getattr(bind.pool, "checkedout", lambda: 0)())
+        return rotated[0]
+
+    def mark_down(self, bind: Engine, error: Exception):
+        with self._lock:
+            self._down_until[bind] = time.monotonic() + self.retry_seconds
+        logger.warning("read replica %s failed, skipping it for %ss: %s",
+                       bind.url.render_as_string(hide_password=True), self.retry_seconds, error)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            down_until = dict(self._down_until)
+        return [{
+            "url": bind.url.render_as_string(hide_password=True),
+            "up": down_until.get(bind, 0) <= now,
+            "retry_in": round(max(0.0, down_until.get(bind, 0) - now), 1),
+        } for bind in self.engines]
+
+_READS = "replica_reads"    # depth of replica_read calls in progress
+_REPLICA = "replica"        # replica the current read went to
+_WROTE = "wrote"
+
+class RoutingSession(Session):
+    """Session reading from `replicas` inside replica_read calls, until it writes."""
+    def __init__(self, *args, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replicas = replicas
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self._writing(clause) and self.info.get(_READS) and self.replicas is not None:
+            replica = self.replicas.choose()
+            if replica is not None:
+                self.info[_REPLICA] = replica
+                versioning.note_replica_read(replica)
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+    def _writing(self, clause) -> bool:
+        if self.info.get(_WROTE):
+            return True
+        if getattr(clause, "is_dml", False) or self.new or self.dirty or self.deleted:
+            self.info[_WROTE] = True
+            return True
+        return False
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    session.info[_WROTE] = True
+
+def _routing_session(db) -> Optional[RoutingSession]:
+    session = getattr(db, "sync_session", db)
+    if isinstance(session, RoutingSession) and session.replicas is not None:
+        return session
+    return None
+
+@contextmanager
+def replica_reads(db):
+    """Let the queries `db` (a Session or AsyncSession) runs in this block go to a replica."""
+    session = _routing_session(db)
+    if session is None:
+        yield
+        return
+    session.info[_READS] = session.info.get(_READS, 0) + 1
+    try:
+        yield
+    finally:
+        session.info[_READS] -= 1
+
+def _failed_replica(db, error: exc.DBAPIError) -> bool:
+    """Mark the replica behind `error` down; False if the error did not come from one."""
+    session = _routing_session(db)
+    replica = session.info.pop(_REPLICA, None) if session is not None else None
+    if replica is None or session.info.get(_WROTE):
+        return False
+    # Unreachable, gone, or not a database at all, rather than a bad statement.
+    if not (error.connection_invalidated or isinstance(error, (exc.OperationalError, exc.InterfaceError))
+            or type(error) is exc.DatabaseError):
+        return False
+    session.replicas.mark_down(replica, error)
+    return True
+
+def _replica_count(db) -> int:
+    session = _routing_session(db)
+    return len(session.replicas.engines) if session is not None else 0
+
+def replica_read(fn):
+    """
+    Decorator for read-only crud functions taking the session first. Their
+    queries may go to a replica; if it fails, the call is retried on the other
+    replicas, then on the primary.
+    """
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(db, *args, **kwargs):
+            with replica_reads(db):
+                for _ in range(_replica_count(db)):
+                    try:
+                        with versioning.watch_replica_reads():
+                            return await fn(db, *args, **kwargs)
+                    except exc.DBAPIError as e:
+                        if not _failed_replica(db, e):
+                            raise
+                        await db.rollback()
+            # No replica, or every one tried failed.
+            return await fn(db, *args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(db, *args, **kwargs):
+        with replica_reads(db):
+            for _ in range(_replica_count(db)):
+                try:
+                    with versioning.watch_replica_reads():
+                        return fn(db, *args, **kwargs)
+                except exc.DBAPIError as e:
+                    if not _failed_replica(db, e):
+                        raise
+                    db.rollback()
+        # No replica, or every one tried failed.
+        return fn(db, *args, **kwargs)
+    return wrapper
+
+def _after_fork():
+    # Pooled connections belong to the parent. Forget them without closing them,
+    # which would hang up the parent's sockets; the child opens its own.
+    binds = [engine, *replicas.engines]
+    if async_engine is not None:
+        binds += [async_engine.sync_engine, *async_replicas.engines]
+    for bind in binds:
+        bind.dispose(close=False)
+
+def replica_stats() -> Dict[str, Any]:
+    stats = {"strategy": settings.DB_REPLICA_STRATEGY, "sync": replicas.stats()}
+    if async_engine is not None:
+        stats["async"] = async_replicas.stats()
+    return stats
+
+engine = configure_pool(create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)))
+replicas = ReplicaSet([
+    configure_pool(create_engine(url, **engine_options(url, label=f"replica-{i}")))
+    for i, url in enumerate(settings.DB_REPLICA_URLS, 1)
+], settings.DB_REPLICA_STRATEGY, settings.DB_REPLICA_RETRY)
+# Forked workers (serve.py, gunicorn --preload) start with empty pools.
+os.register_at_fork(after_in_child=_after_fork)
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession,
+                            replicas=replicas if replicas.engines else None)
 
 Base = declarative_base()
 
+# Committed writes from any session (sync or async) bump the ETag versions.
+versioning.track_writes(Session)
+# ...and drop the entity_cache entries their mutators invalidated.
+entity_cache.track_commits(Session)
+# Every statement, from either engine, is timed for /metrics.
+instrumentation.track_queries()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# --- Cross-process job lock ---
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+@contextmanager
+def _file_lock(name: str):
+    path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+    with open(path, "a+") as f:
+        try:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def advisory_lock(name: str, bind=None):
+    """
+    Non-blocking named lock shared by every process using the database: yields
+    True if this caller holds it, False if someone else does. Uses MySQL
+    GET_LOCK or a PostgreSQL advisory lock on a dedicated connection, and a
+    lock file for SQLite (whose users are all on one host).
+    """
+    bind = bind or engine
+    backend = bind.dialect.name
+    if backend not in ("mysql", "postgresql"):
+        with _file_lock(name) as acquired:
+            yield acquired
+        return
+
+    if backend == "mysql":
+        acquire, release = "SELECT GET_LOCK(:name, 0)", "SELECT RELEASE_LOCK(:name)"
+    else:
+        acquire, release = "SELECT pg_try_advisory_lock(hashtext(:name))", "SELECT pg_advisory_unlock(hashtext(:name))"
+    with bind.connect() as conn:
+        acquired = bool(conn.execute(text(acquire), {"name": name}).scalar())
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                conn.execute(text(release), {"name": name})
+
+# --- Async engine (opt-in, used by async_main.py) ---
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver in `url` for its async counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+def async_database_url() -> str:
+    """ASYNC_DATABASE_URL, or DATABASE_URL with its async driver."""
+    return settings.ASYNC_DATABASE_URL or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# Created lazily so the sync app never needs greenlet or an async driver
+# installed, nor a DATABASE_URL backend listed in ASYNC_DRIVERS.
+async_engine = None
+async_replica_engines = []
+async_replicas = ReplicaSet([])
+AsyncSessionLocal = None
+
+def init_async_engine():
+    global async_engine, async_replica_engines, async_replicas, AsyncSessionLocal
+    if async_engine is None:
+        from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+        url = async_database_url()
+        async_engine = create_async_engine(url, **engine_options(url, asynchronous=True))
+        configure_pool(async_engine.sync_engine)
+        async_replica_engines = []
+        for i, url in enumerate(settings.DB_REPLICA_URLS, 1):
+            url = to_async_url(url)
+            replica = create_async_engine(url, **engine_options(url, asynchronous=True, label=f"async-replica-{i}"))
+            configure_pool(replica.sync_engine)
+            async_replica_engines.append(replica)
+        async_replicas = ReplicaSet([replica.sync_engine for replica in async_replica_engines],
+                                    settings.DB_REPLICA_STRATEGY, settings.DB_REPLICA_RETRY)
+        # expire_on_commit=False so committed objects can be serialized without lazy IO.
+        AsyncSessionLocal = async_sessionmaker(
+            bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False,
+            sync_session_class=RoutingSession, replicas=async_replicas if async_replicas.engines else None
+        )
+    return async_engine
+
+async def dispose_async_engines():
+    for bind in [async_engine, *async_replica_engines]:
+        if bind is not None:
+            await bind.dispose()
+
+async def get_async_db():
+    if AsyncSessionLocal is None:
+        init_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -31,7 +31,9 @@ CREATE TABLE IF NOT EXISTS Projects (
     budget_status ENUM('Under Budget', 'On Budget', 'Over Budget'),
     start_date DATE,
     launch_date DATE,
-    FOREIGN KEY (customer_id) REFERENCES Customers(customer_id)
+    FOREIGN KEY (customer_id) REFERENCES Customers(customer_id),
+    INDEX ix_projects_status (status),
+    INDEX ix_projects_customer_status (customer_id, status)
 );
 
 -- Create Tasks table
@@ -43,7 +45,10 @@ CREATE TABLE IF NOT EXISTS Tasks (
     deadline DATE,
     status ENUM('Pending', 'In Progress', 'Completed', 'Overdue') NOT NULL,
     FOREIGN KEY (project_id) REFERENCES Projects(project_id),
-    FOREIGN KEY (employee_id) REFERENCES Employees(employee_id)
+    FOREIGN KEY (employee_id) REFERENCES Employees(employee_id),
+    INDEX ix_tasks_project_status (project_id, status),
+    INDEX ix_tasks_employee_status (employee_id, status),
+    INDEX ix_tasks_status_deadline (status, deadline)
 );
 
 -- Create Project_Phases table
@@ -66,7 +71,10 @@ CREATE TABLE IF NOT EXISTS Alerts (
     status ENUM('Read', 'Unread') DEFAULT 'Unread',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (project_id) REFERENCES Projects(project_id),
-    FOREIGN KEY (task_id) REFERENCES Tasks(task_id)
+    FOREIGN KEY (task_id) REFERENCES Tasks(task_id),
+    INDEX ix_alerts_status_created (status, created_at),
+    INDEX ix_alerts_type_created (alert_type, created_at),
+    INDEX ix_alerts_project_created (project_id, created_at)
 );
 
 -- Create Budget_History table
@@ -99,8 +107,26 @@ CREATE TABLE IF NOT EXISTS Project_KPIs (
     reopened_tasks INT DEFAULT 0,
     risk_flag BOOLEAN DEFAULT FALSE,
 
+    -- Running counters maintained by kpi_engine.py
+    task_count INT NOT NULL DEFAULT 0,
+    completed_tasks INT NOT NULL DEFAULT 0,
+    budget_spent DECIMAL(12,2) NOT NULL DEFAULT 0,
+
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     
-    FOREIGN KEY (project_id) REFERENCES Projects(project_id)
+    FOREIGN KEY (project_id) REFERENCES Projects(project_id),
+    UNIQUE INDEX ux_project_kpis_project (project_id)
 );
 
+-- Upgrading a database created before the kpi_engine.py counters (python
+-- migrate.py does the same). Run once; projects with several Project_KPIs rows
+-- must be reduced to one first or the unique index fails. Then recount the
+-- counters from the existing data with `python rebuild_kpis.py`.
+--
+-- ALTER TABLE Project_KPIs
+--     ADD COLUMN task_count INT NOT NULL DEFAULT 0,
+--     ADD COLUMN completed_tasks INT NOT NULL DEFAULT 0,
+--     ADD COLUMN budget_spent DECIMAL(12,2) NOT NULL DEFAULT 0;
+-- CREATE UNIQUE INDEX ux_project_kpis_project ON Project_KPIs (project_id);
+-- DROP INDEX ix_project_kpis_project ON Project_KPIs;
+
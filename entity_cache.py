@@ -0,0 +1,332 @@
+# Backend/entity_cache.py
+# Read-through cache for the hot single-row lookups in crud.py / async_crud.py:
+# get_employee, get_customer, get_project and get_project_kpi_by_project.
+#
+# Entries are the response schema serialized to JSON, keyed "<kind>:<id>",
+# bounded by ENTITY_CACHE_SIZE (least recently used go first) and
+# ENTITY_CACHE_TTL seconds. Only rows that exist are cached.
+#
+# Mutators load the rows they change straight from the database, not through
+# the cache: they need the ORM instance in their own session, and a cached copy
+# would only add a lookup in front of that query. They call invalidate() for the
+# rows they write; the keys are dropped when the session commits. A lookup that
+# raced a write does not store what it read: every invalidation bumps a
+# generation counter and a fill only lands if the counter has not moved since
+# the lookup missed. Rows read from a lagging replica are not stored either.
+#
+# Entries live in process memory by default. With several workers, set
+# ENTITY_CACHE_PATH so they share one SQLite file and see each other's
+# invalidations; otherwise a worker may serve a row another worker changed for
+# up to ENTITY_CACHE_TTL seconds.
+
+import asyncio
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import versioning
+from config import settings
+
+KINDS = ("employee", "customer", "project", "project_kpi")
+
+class MemoryEntityCache:
+    """Per-process LRU with a per-entry TTL."""
+    # Blocking backends are called through asyncio.to_thread from async code.
+    blocking = False
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (payload, expires_at)
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._counts = {kind: {"hits": 0, "misses": 0} for kind in KINDS}
+        self.evictions = 0
+        self.invalidations = 0
+
+    def after_fork(self):
+        """Called in a forked child; backends holding connections reopen them."""
+
+    # --- Storage, overridden by SqliteEntityCache ---
+    @staticmethod
+    def _size(key: str, payload: bytes) -> int:
+        return sys.getsizeof(key) + sys.getsizeof(payload)
+
+    def _drop(self, key: str):
+        payload, _ = self._entries.pop(key)
+        self._bytes -= self._size(key, payload)
+
+    def get(self, key: str) -> Tuple[Optional[bytes], int]:
+        """The cached payload (None on a miss) and the generation to pass to set()."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._entries.move_to_end(key)
+                    return entry[0], self._generation
+                self._drop(key)
+            return None, self._generation
+
+    def set(self, key: str, payload: bytes, generation: int):
+        with self._lock:
+            if generation != self._generation:
+                return
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (payload, time.time() + self.ttl_seconds)
+            self._bytes += self._size(key, payload)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, keys: Iterable[str]):
+        """Drop `keys`; a key "<kind>:*" drops every entry of that kind."""
+        keys = list(keys)
+        with self._lock:
+            self._generation += 1
+            self.invalidations += len(keys)
+            for key in keys:
+                if key.endswith(":*"):
+                    prefix = key[:-1]
+                    for cached in [cached for cached in self._entries if cached.startswith(prefix)]:
+                        self._drop(cached)
+                elif key in self._entries:
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def usage(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"backend": "memory", "entries": len(self._entries), "bytes": self._bytes}
+
+    # --- Lookups ---
+    def _count(self, kind: str, hit: bool):
+        with self._lock:
+            self._counts[kind]["hits" if hit else "misses"] += 1
+
+    def read_through(self, kind: str, key: Any, schema, load: Callable[[], Any]):
+        """`schema` instance for row `key` of `kind`, calling `load()` for the ORM row on a miss."""
+        cache_key = f"{kind}:{key}"
+        payload, generation = self.get(cache_key)
+        self._count(kind, payload is not None)
+        if payload is not None:
+            return schema.model_validate_json(payload)
+        with versioning.watch_replica_reads() as replica_reads:
+            row = load()
+        if row is None:
+            return None
+        value = schema.model_validate(row)
+        if not replica_reads:
+            self.set(cache_key, value.model_dump_json().encode(), generation)
+        return value
+
+    async def aread_through(self, kind: str, key: Any, schema, load: Callable[[], Awaitable[Any]]):
+        cache_key = f"{kind}:{key}"
+        if self.blocking:
+            payload, generation = await asyncio.to_thread(self.get, cache_key)
+        else:
+            payload, generation = self.get(cache_key)
+        self._count(kind, payload is not None)
+        if payload is not None:
+            return schema.model_validate_json(payload)
+        with versioning.watch_replica_reads() as replica_reads:
+            row = await load()
+        if row is None:
+            return None
+        value = schema.model_validate(row)
+        if replica_reads:
+            return value
+        if self.blocking:
+            await asyncio.to_thread(self.set, cache_key, value.model_dump_json().encode(), generation)
+        else:
+            self.set(cache_key, value.model_dump_json().encode(), generation)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {kind: dict(values) for kind, values in self._counts.items()}
+        for values in counts.values():
+            lookups = values["hits"] + values["misses"]
+            values["hit_ratio"] = values["hits"] / lookups if lookups else 0.0
+        hits = sum(values["hits"] for values in counts.values())
+        lookups = hits + sum(values["misses"] for values in counts.values())
+        return {
+            **self.usage(),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "kinds": counts,
+        }
+
+class SqliteEntityCache(MemoryEntityCache):
+    """
+    Entries in a SQLite file shared by every worker process on the host. Hit
+    counters stay per process. Recency is refreshed at most once a second per
+    entry, so hot reads do not turn into writes.
+    """
+    blocking = True
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: float):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = path
+        self._db = self._connect()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entity_cache "
+            "(cache_key TEXT PRIMARY KEY, payload BLOB NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_entity_cache_used_at ON entity_cache (used_at)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS entity_cache_generation (generation INTEGER NOT NULL)")
+        self._db.execute(
+            "INSERT INTO entity_cache_generation SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM entity_cache_generation)"
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def after_fork(self):
+        # A SQLite handle must not be used by two processes; the parent keeps its own.
+        self._db = self._connect()
+
+    def get(self, key: str) -> Tuple[Optional[bytes], int]:
+        now = time.time()
+        with self._lock:
+            (generation,) = self._db.execute("SELECT generation FROM entity_cache_generation").fetchone()
+            row = self._db.execute(
+                "SELECT payload, expires_at, used_at FROM entity_cache WHERE cache_key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None, generation
+            if now - row[2] >= 1.0:
+                self._db.execute("UPDATE entity_cache SET used_at = ? WHERE cache_key = ?", (now, key))
+            return row[0], generation
+
+    def set(self, key: str, payload: bytes, generation: int):
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                stored = self._db.execute(
+                    "INSERT OR REPLACE INTO entity_cache "
+                    "SELECT ?, ?, ?, ? WHERE (SELECT generation FROM entity_cache_generation) = ?",
+                    (key, payload, now + self.ttl_seconds, now, generation)
+                ).rowcount
+                if stored:
+                    (entries,) = self._db.execute("SELECT count(*) FROM entity_cache").fetchone()
+                    if entries > self.max_entries:
+                        self.evictions += self._db.execute(
+                            "DELETE FROM entity_cache WHERE cache_key IN "
+                            "(SELECT cache_key FROM entity_cache ORDER BY used_at LIMIT ?)",
+                            (entries - self.max_entries,)
+                        ).rowcount
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def delete(self, keys: Iterable[str]):
+        keys = list(keys)
+        exact = [(key,) for key in keys if not key.endswith(":*")]
+        prefixes = [(key[:-1] + "%",) for key in keys if key.endswith(":*")]
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute("UPDATE entity_cache_generation SET generation = generation + 1")
+                self._db.executemany("DELETE FROM entity_cache WHERE cache_key = ?", exact)
+                self._db.executemany("DELETE FROM entity_cache WHERE cache_key LIKE ?", prefixes)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self.invalidations += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            self._db.execute("UPDATE entity_cache_generation SET generation = generation + 1")
+            self._db.execute("DELETE FROM entity_cache")
+            self._db.execute("COMMIT")
+
+    def usage(self) -> Dict[str, Any]:
+        with self._lock:
+            entries, payload_bytes = self._db.execute(
+                "SELECT count(*), coalesce(sum(length(cache_key) + length(payload)), 0) FROM entity_cache"
+            ).fetchone()
+            (page_count,) = self._db.execute("PRAGMA page_count").fetchone()
+            (page_size,) = self._db.execute("PRAGMA page_size").fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.path,
+            "entries": entries,
+            "bytes": payload_bytes,
+            "file_bytes": page_count * page_size,
+        }
+
+def build_cache() -> Optional[MemoryEntityCache]:
+    if settings.ENTITY_CACHE_SIZE <= 0:
+        return None
+    if settings.ENTITY_CACHE_PATH:
+        return SqliteEntityCache(settings.ENTITY_CACHE_PATH, settings.ENTITY_CACHE_SIZE, settings.ENTITY_CACHE_TTL)
+    return MemoryEntityCache(settings.ENTITY_CACHE_SIZE, settings.ENTITY_CACHE_TTL)
+
+cache = build_cache()
+
+if cache is not None:
+    os.register_at_fork(after_in_child=cache.after_fork)
+
+def read_through(kind: str, key: Any, schema, load: Callable[[], Any]):
+    """Cached lookup; with the cache disabled, just `load()`."""
+    if cache is None:
+        return load()
+    return cache.read_through(kind, key, schema, load)
+
+async def aread_through(kind: str, key: Any, schema, load: Callable[[], Awaitable[Any]]):
+    if cache is None:
+        return await load()
+    return await cache.aread_through(kind, key, schema, load)
+
+def stats() -> Dict[str, Any]:
+    if cache is None:
+        return {"backend": None}
+    return cache.stats()
+
+# --- Invalidation on commit ---
+_PENDING = "entity_cache_pending"
+
+def invalidate(db, kind: str, key: Any = None):
+    """
+    Drop row `key` of `kind` (every row of `kind` if `key` is None) once `db`
+    commits. `db` may be a Session or an AsyncSession.
+    """
+    if cache is None:
+        return
+    session = getattr(db, "sync_session", db)
+    session.info.setdefault(_PENDING, set()).add(f"{kind}:{'*' if key is None else key}")
+
+def _after_commit(session: Session):
+    # As in versioning.py, keys from a rolled-back transaction wait for the next commit.
+    keys = session.info.pop(_PENDING, None)
+    if keys:
+        cache.delete(keys)
+
+def track_commits(session_class=Session):
+    if cache is not None and not event.contains(session_class, "after_commit", _after_commit):
+        event.listen(session_class, "after_commit", _after_commit)
@@ -0,0 +1,121 @@
+# Backend/export.py
+# Full-table dumps behind GET /api/export/{table}?format=ndjson|csv.
+#
+# Rows are read with a server-side cursor (yield_per, which turns on
+# stream_results) as plain column tuples, EXPORT_BATCH_SIZE at a time, and
+# encoded batch by batch into the streamed response, so memory stays flat
+# whatever the table size. No ORM objects or Pydantic models are built.
+#
+# Each row carries the same fields, in the same order, as the table's list
+# endpoint (fast_json.RowSerializer), and the list endpoint's filters apply.
+
+import csv
+import io
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, NamedTuple, Optional
+
+from fastapi import HTTPException
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import inspect, select
+
+import models, schemas, crud, fast_json
+import database
+from config import settings
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+class ExportSpec(NamedTuple):
+    model: Any
+    schema: Any
+    filter_schema: Optional[type] = None
+    apply_filters: Optional[Callable] = None
+
+# Keyed like the list routes: /api/export/tasks mirrors /api/tasks/.
+EXPORTS: Dict[str, ExportSpec] = {
+    "employees": ExportSpec(models.Employee, schemas.Employee),
+    "customers": ExportSpec(models.Customer, schemas.Customer),
+    "projects": ExportSpec(models.Project, schemas.Project, schemas.ProjectFilter, crud.filter_projects),
+    "tasks": ExportSpec(models.Task, schemas.Task, schemas.TaskFilter, crud.filter_tasks),
+    "project-phases": ExportSpec(models.Project_Phase, schemas.ProjectPhase),
+    "alerts": ExportSpec(models.Alert, schemas.Alert, schemas.AlertFilter, crud.filter_alerts),
+    "budget-history": ExportSpec(models.Budget_History, schemas.BudgetHistory),
+    "project-kpis": ExportSpec(models.Project_KPI, schemas.ProjectKpi),
+}
+
+def get_spec(table: str) -> ExportSpec:
+    spec = EXPORTS.get(table)
+    if spec is None:
+        raise HTTPException(status_code=404, detail=f"Cannot export '{table}'. Available: {', '.join(EXPORTS)}")
+    return spec
+
+def parse_filters(spec: ExportSpec, query_params) -> Optional[BaseModel]:
+    """The table's list filters from the query string, validated the same way (422 on bad values)."""
+    if spec.filter_schema is None:
+        return None
+    values = {name: query_params[name] for name in spec.filter_schema.model_fields if name in query_params}
+    try:
+        return spec.filter_schema.model_validate(values)
+    except ValidationError as e:
+        raise RequestValidationError([{**error, "loc": ("query",) + tuple(error["loc"])} for error in e.errors(include_url=False)])
+
+# --- Row encoding ---
+def build_query(spec: ExportSpec, filters: Optional[BaseModel], serializer: fast_json.RowSerializer):
+    stmt = select(*serializer.columns)
+    if spec.apply_filters is not None:
+        stmt = spec.apply_filters(stmt, filters)
+    return stmt.order_by(*inspect(spec.model).primary_key)
+
+def encode_ndjson(serializer: fast_json.RowSerializer, rows) -> bytes:
+    return b"".join(fast_json.dumps(row) + b"\n" for row in serializer.dicts(rows))
+
+def encode_csv(rows: List[list]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(rows)
+    return buffer.getvalue().encode()
+
+def _encoder(fmt: str, serializer: fast_json.RowSerializer):
+    if fmt == "csv":
+        return lambda rows: encode_csv(serializer.values(rows))
+    return lambda rows: encode_ndjson(serializer, rows)
+
+# --- Streaming ---
+def iter_export(spec: ExportSpec, filters: Optional[BaseModel], fmt: str, batch_size: int) -> Iterator[bytes]:
+    """Sync app: runs in Starlette's threadpool with a session of its own, closed when the stream ends."""
+    serializer = fast_json.serializer(spec.model, spec.schema)
+    encode = _encoder(fmt, serializer)
+    db = database.SessionLocal()
+    try:
+        if fmt == "csv":
+            yield encode_csv([serializer.names])
+        result = db.execute(build_query(spec, filters, serializer), execution_options={"yield_per": batch_size})
+        for rows in result.partitions():
+            yield encode(rows)
+    finally:
+        db.close()
+
+async def aiter_export(spec: ExportSpec, filters: Optional[BaseModel], fmt: str, batch_size: int) -> AsyncIterator[bytes]:
+    serializer = fast_json.serializer(spec.model, spec.schema)
+    encode = _encoder(fmt, serializer)
+    if database.AsyncSessionLocal is None:
+        database.init_async_engine()
+    async with database.AsyncSessionLocal() as db:
+        if fmt == "csv":
+            yield encode_csv([serializer.names])
+        result = await db.stream(build_query(spec, filters, serializer).execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield encode(rows)
+
+def response(table: str, fmt: str, query_params, asynchronous: bool = False) -> StreamingResponse:
+    spec = get_spec(table)
+    filters = parse_filters(spec, query_params)
+    batch_size = settings.EXPORT_BATCH_SIZE
+    stream = (aiter_export if asynchronous else iter_export)(spec, filters, fmt, batch_size)
+    return StreamingResponse(
+        stream,
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{fmt}"'}
+    )
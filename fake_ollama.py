@@ -0,0 +1,66 @@
+# Backend/fake_ollama.py
+# Stand-in for Ollama's /api/generate, for exercising the Llama3 clients
+# without a model. Latency and failures can be injected.
+#
+#   python fake_ollama.py --port 11434 --latency 0.5 --jitter 0.2 --error-rate 0.1
+
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Fake Ollama /api/generate server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11434)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before answering")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--answer", default=None,
+                        help="Fixed answer; by default one of Low/Medium/High derived from the prompt")
+    return parser.parse_args()
+
+def make_handler(args):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            time.sleep(args.latency + random.uniform(0, args.jitter))
+            if self.path != "/api/generate":
+                return self.reply(404, {"error": "not found"})
+            if random.random() < args.error_rate:
+                return self.reply(500, {"error": "injected failure"})
+            prompt = json.loads(body or b"{}").get("prompt", "")
+            answer = args.answer or ("Low", "Medium", "High")[sum(prompt.encode()) % 3]
+            self.reply(200, {"model": "fake", "response": answer, "done": True})
+
+        def reply(self, status, payload):
+            data = json.dumps(payload).encode()
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+            except (BrokenPipeError, ConnectionResetError):
+                # The client gave up (e.g. timed out) before the injected latency passed.
+                self.close_connection = True
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def main():
+    args = parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args))
+    print(f"Fake Ollama listening on http://{args.host}:{args.port}/api/generate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
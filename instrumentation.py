@@ -0,0 +1,286 @@
+# Backend/instrumentation.py
+# Request and SQL instrumentation, exposed at GET /metrics in the Prometheus
+# text format.
+#
+# RequestMetricsMiddleware times every HTTP request into a latency histogram
+# per route template (/api/tasks/{task_id}, not /api/tasks/7) and also
+# records how many queries each request ran and how long they took. Responses
+# sent before routing (304s from versioning.ConditionalGetMiddleware, CORS
+# preflights) get their template from the router too. Streams (the alert feed,
+# exports) stay open for as long as the client reads, so they are counted
+# apart and kept out of the latency histogram and the slow-request log. The
+# engine hooks installed by track_queries() count every statement, with or
+# without a request around it, by operation (SELECT, INSERT, ...).
+#
+# Queries slower than SLOW_QUERY_MS are logged with their SQL as they finish.
+# Requests slower than SLOW_REQUEST_MS are logged with their query count and
+# the statements that took the most time. A statement that shows up with a
+# high count there is usually an N+1.
+#
+# Metrics are kept per process. With several workers, scrape each of them.
+
+import contextvars
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+import versioning
+from config import settings
+
+logger = logging.getLogger("instrumentation")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+# Statements listed in a slow-request log line.
+SLOW_REQUEST_STATEMENTS = 5
+# SQL longer than this is cut short in log lines.
+MAX_SQL_LENGTH = 2000
+# Requests that matched no route share one label, so probes for random URLs
+# do not create a series each.
+UNMATCHED_ROUTE = "<unmatched>"
+# Long-lived streaming responses, whose duration is not request latency.
+STREAMING_PATHS = (*versioning.UNVERSIONED_PATHS, "/api/export/")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, as Prometheus expects it."""
+    def __init__(self, name: str, help: str, buckets: Sequence[float]):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self._series: Dict[Labels, List] = {}  # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def totals(self, **labels: str) -> Tuple[int, float]:
+        """(count, sum) of the observations with exactly these labels."""
+        with self._lock:
+            series = self._series.get(tuple(sorted(labels.items())))
+            return (series[-1], series[-2]) if series else (0, 0.0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(values)) for key, values in self._series.items())
+        for key, values in series:
+            for bound, count in zip(self.buckets, values):
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', _number(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_labels(key)} {_number(values[-2])}")
+            lines.append(f"{self.name}_count{_labels(key)} {values[-1]}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._series: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._series.get(tuple(sorted(labels.items())), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            series = sorted(self._series.items())
+        lines.extend(f"{self.name}{_labels(key)} {_number(value)}" for key, value in series)
+        return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _labels(key: Labels) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+REQUEST_SECONDS = Histogram("http_request_duration_seconds", "HTTP request latency by route.", LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram("http_request_db_queries", "SQL statements run per HTTP request, by route.",
+                            QUERY_COUNT_BUCKETS)
+REQUEST_DB_SECONDS = Histogram("http_request_db_seconds", "Time spent in SQL per HTTP request, by route.",
+                               LATENCY_BUCKETS)
+SLOW_REQUESTS = Counter("http_slow_requests_total", "HTTP requests slower than SLOW_REQUEST_MS, by route.")
+STREAMED_REQUESTS = Counter("http_streamed_requests_total",
+                            "Streaming HTTP requests (alert feed, exports), by route; not timed.")
+QUERY_SECONDS = Histogram("db_query_duration_seconds", "SQL statement latency by operation.", LATENCY_BUCKETS)
+SLOW_QUERIES = Counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_MS, by operation.")
+
+METRICS = [REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_DB_SECONDS, SLOW_REQUESTS, STREAMED_REQUESTS,
+           QUERY_SECONDS, SLOW_QUERIES]
+# Extra sources of exposition lines, e.g. connection pool gauges.
+_collectors: List[Callable[[], Iterable[str]]] = []
+
+def register_collector(collect: Callable[[], Iterable[str]]):
+    if collect not in _collectors:
+        _collectors.append(collect)
+
+def render() -> str:
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    for collect in _collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+# --- Per-request SQL accounting ---
+class RequestStats:
+    """What one request did in SQL: totals and time per distinct statement."""
+    __slots__ = ("queries", "seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.statements: Dict[str, List] = {}  # sql -> [count, seconds]
+
+    def add(self, statement: str, seconds: float):
+        self.queries += 1
+        self.seconds += seconds
+        entry = self.statements.get(statement)
+        if entry is None:
+            self.statements[statement] = [1, seconds]
+        else:
+            entry[0] += 1
+            entry[1] += seconds
+
+    def slowest(self, n: int) -> List[Tuple[str, int, float]]:
+        ranked = sorted(self.statements.items(), key=lambda item: item[1][1], reverse=True)[:n]
+        return [(statement, count, seconds) for statement, (count, seconds) in ranked]
+
+# The stats object of the request being served. Sync routes and dependencies run
+# in a threadpool with a copy of the request's context, which still points at
+# the same object.
+current_request: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "instrumentation_request", default=None
+)
+
+def _operation(statement: str) -> str:
+    word = statement.lstrip().split(None, 1)[:1]
+    return word[0].upper() if word else "OTHER"
+
+def _sql(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= MAX_SQL_LENGTH else statement[:MAX_SQL_LENGTH] + "..."
+
+_START = "instrumentation_query_start"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START, []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get(_START)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    operation = _operation(statement)
+    QUERY_SECONDS.observe(elapsed, operation=operation)
+    stats = current_request.get()
+    if stats is not None:
+        stats.add(statement, elapsed)
+    if elapsed * 1000 >= settings.SLOW_QUERY_MS:
+        SLOW_QUERIES.inc(operation=operation)
+        logger.warning("slow query: %.1f ms%s: %s", elapsed * 1000, " (executemany)" if executemany else "",
+                       _sql(statement))
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time.
+    conn = exception_context.connection
+    starts = conn.info.get(_START) if conn is not None else None
+    if starts:
+        starts.pop()
+
+def track_queries(engine_class=Engine):
+    """Time every statement run by any engine, sync or async."""
+    if not event.contains(engine_class, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine_class, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine_class, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine_class, "handle_error", _handle_error)
+
+# --- HTTP ---
+def route_label(scope) -> str:
+    """The route template of a request, looked up in the router if the request never reached it."""
+    route = scope.get("route")
+    if route is None:
+        partial = None
+        for candidate in getattr(getattr(scope.get("app"), "router", None), "routes", ()):
+            match, _ = candidate.matches(scope)
+            if match is Match.FULL:
+                route = candidate
+                break
+            if match is Match.PARTIAL and partial is None:
+                # Path matches, method does not: a CORS preflight or a 405.
+                partial = candidate
+        route = route or partial
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording latency and SQL per request; add it last so it wraps everything."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            self._record(scope, status, elapsed, stats)
+
+    @staticmethod
+    def _record(scope, status: int, elapsed: float, stats: RequestStats):
+        route = route_label(scope)
+        method = scope["method"]
+        REQUEST_QUERIES.observe(stats.queries, method=method, route=route)
+        REQUEST_DB_SECONDS.observe(stats.seconds, method=method, route=route)
+        if scope["path"].startswith(STREAMING_PATHS):
+            STREAMED_REQUESTS.inc(method=method, route=route, status=str(status))
+            return
+        REQUEST_SECONDS.observe(elapsed, method=method, route=route, status=str(status))
+        if elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+            SLOW_REQUESTS.inc(method=method, route=route)
+            statements = "".join(
+                f"\n  {count}x {seconds * 1000:.1f} ms: {_sql(statement)}"
+                for statement, count, seconds in stats.slowest(SLOW_REQUEST_STATEMENTS)
+            )
+            logger.warning("slow request: %s %s -> %s in %.1f ms, %d queries (%.1f ms in SQL)%s",
+                           method, scope["path"], status, elapsed * 1000, stats.queries, stats.seconds * 1000,
+                           statements)
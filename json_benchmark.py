@@ -0,0 +1,141 @@
+# Backend/json_benchmark.py
+# Microbenchmark of list-response serialization per entity: the ORM + Pydantic
+# path FastAPI takes for `response_model=List[schemas.X]` against the
+# result-tuple path in fast_json.py. Also checks that both produce the same bytes.
+# Each path runs once untimed before the timed runs, so the first, cold query
+# does not count against whichever path happens to run it.
+#
+#   python json_benchmark.py                    # 10k rows per entity, temporary SQLite file
+#   python json_benchmark.py --rows 50000 --repeat 10
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="List-response serialization benchmark")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to benchmark against (defaults to a temporary SQLite file)")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows per entity, serialized as one page")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per path; the median is reported")
+    return parser.parse_args()
+
+def seed(db, n: int):
+    """n rows in every table, with the awkward values (NULLs, non-ASCII, fractions, microseconds) mixed in."""
+    import models
+    from sqlalchemy import insert
+
+    rng = random.Random(42)
+    names = ["Ana", "Zoë", "Łukasz", "O'Brien", 'Quote "q"', "tab\there", "日本"]
+    start = datetime(2024, 1, 1, 9, 30)
+
+    def name(i):
+        return f"{names[i % len(names)]} {i}"
+
+    db.execute(insert(models.Customer), [
+        {"name": name(i), "company": None if i % 5 == 0 else f"Co {i}", "email": f"c{i}@example.com",
+         "phone": None if i % 3 else f"+1-555-{i:04d}"} for i in range(n)
+    ])
+    db.execute(insert(models.Employee), [
+        {"name": name(i), "email": f"e{i}@example.com", "password_hash": f"hash{i}"} for i in range(n)
+    ])
+    db.execute(insert(models.Project), [
+        {"project_name": name(i), "customer_id": i % n + 1, "status": "In Progress",
+         "completion_percentage": round(rng.uniform(0, 100), 2), "budget_total": rng.randint(1, 10**6) / 4,
+         "budget_used": None if i % 4 == 0 else round(rng.uniform(0, 1000), 2), "budget_status": "On Budget",
+         "start_date": date(2024, 1, 1) + timedelta(days=i % 365), "launch_date": None} for i in range(n)
+    ])
+    db.execute(insert(models.Task), [
+        {"project_id": i % n + 1, "task_name": name(i), "employee_id": None if i % 7 == 0 else i % n + 1,
+         "deadline": date(2025, 1, 1) + timedelta(days=i % 90), "status": "Pending"} for i in range(n)
+    ])
+    db.execute(insert(models.Project_Phase), [
+        {"project_id": i % n + 1, "phase_name": f"Phase {i}", "status": "Waiting"} for i in range(n)
+    ])
+    db.execute(insert(models.Alert), [
+        {"alert_type": "Info", "alert_source": "System", "project_id": i % n + 1, "task_id": None,
+         "message": f"{name(i)}\nline two   {i}", "status": "Unread",
+         "created_at": start + timedelta(seconds=i, microseconds=(i * 7919) % 1_000_000 if i % 2 else 0)}
+        for i in range(n)
+    ])
+    db.execute(insert(models.Budget_History), [
+        {"project_id": i % n + 1, "month": f"2024-{i % 12 + 1:02d}", "amount_used": rng.randint(0, 10**7) / 100}
+        for i in range(n)
+    ])
+    db.execute(insert(models.Project_KPI), [
+        {"project_id": i + 1, "completion_percentage": round(rng.uniform(0, 100), 2), "overdue_tasks": i % 4,
+         "risk_flag": i % 9 == 0, "budget_spent": rng.randint(0, 10**6) / 100, "created_at": start} for i in range(n)
+    ])
+    db.commit()
+
+def median_ms(fn, repeat: int):
+    # One untimed run first: the first query of each statement pays for compiling
+    # it and for reading the table into the page cache.
+    fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, result
+
+def main():
+    args = parse_args()
+    if args.database_url is None:
+        db_file = os.path.join(tempfile.mkdtemp(prefix="pm-json-bench-"), "bench.db")
+        args.database_url = f"sqlite:///{db_file}"
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from pydantic import TypeAdapter
+    import database, models, schemas, fast_json
+    from pagination import paginate
+
+    models.Base.metadata.create_all(bind=database.engine)
+    with database.SessionLocal() as db:
+        if not db.query(models.Customer).first():
+            seed(db, args.rows)
+
+    entities = (
+        ("employees", models.Employee, schemas.Employee),
+        ("customers", models.Customer, schemas.Customer),
+        ("projects", models.Project, schemas.Project),
+        ("tasks", models.Task, schemas.Task),
+        ("project-phases", models.Project_Phase, schemas.ProjectPhase),
+        ("alerts", models.Alert, schemas.Alert),
+        ("budget-history", models.Budget_History, schemas.BudgetHistory),
+        ("project-kpis", models.Project_KPI, schemas.ProjectKpi),
+    )
+
+    print(f"Database: {database.engine.url.render_as_string(hide_password=True)}, "
+          f"{args.rows:,} rows per page, median of {args.repeat}, encoder: {'orjson' if fast_json.orjson else 'json'}")
+    print(f"{'entity':<15} {'orm+pydantic ms':>16} {'tuples+fast ms':>15} {'speedup':>8} {'identical':>10}")
+    mismatches = 0
+    for name, model, schema in entities:
+        adapter = TypeAdapter(list[schema])
+        serializer = fast_json.serializer(model, schema)
+
+        def orm_path():
+            # What FastAPI does with the returned ORM objects: validate, then dump.
+            with database.SessionLocal() as db:
+                rows = paginate(db.query(model), model, 0, args.rows).all()
+                return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+        def fast_path():
+            with database.SessionLocal() as db:
+                return serializer.dumps(paginate(db.query(*serializer.columns), model, 0, args.rows).all())
+
+        orm_ms, expected = median_ms(orm_path, args.repeat)
+        fast_ms, actual = median_ms(fast_path, args.repeat)
+        identical = expected == actual
+        mismatches += not identical
+        print(f"{name:<15} {orm_ms:>16.1f} {fast_ms:>15.1f} {orm_ms / fast_ms:>7.1f}x {'yes' if identical else 'NO':>10}")
+        sys.stdout.flush()
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# Backend/kpi_benchmark.py
+# Agreement and throughput benchmark for the KPI classifier backends.
+#
+#   python kpi_benchmark.py                 # scoring classifier only
+#   python kpi_benchmark.py --llama         # also query the local Llama3 agent
+
+import argparse
+import json
+import time
+from collections import Counter
+
+from kpi_classifier import KPI_CLASSES, get_kpi_classifier
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare KPI classifier backends on a labelled fixture set")
+    parser.add_argument("--fixtures", default="kpi_fixtures.json", help="Labelled fixture file")
+    parser.add_argument("--llama", action="store_true", help="Also run the Llama3 backend (needs Ollama running)")
+    parser.add_argument("--throughput-rows", type=int, default=100_000,
+                        help="Rows to classify when measuring scoring throughput")
+    return parser.parse_args()
+
+def evaluate(classifier, fixtures):
+    start = time.perf_counter()
+    predictions = [classifier.classify_kpi_class(**fixture["features"]) for fixture in fixtures]
+    elapsed = time.perf_counter() - start
+    return predictions, elapsed
+
+def print_report(name, fixtures, predictions, elapsed):
+    labels = [fixture["label"] for fixture in fixtures]
+    correct = sum(p == l for p, l in zip(predictions, labels))
+    print(f"\n== {name} ==")
+    print(f"accuracy: {correct}/{len(labels)} ({correct / len(labels):.1%}), "
+          f"{elapsed / len(labels) * 1000:.3f} ms per project")
+    confusion = Counter(zip(labels, predictions))
+    columns = KPI_CLASSES + ("Error",)
+    print("label \\ predicted " + "".join(f"{c:>8}" for c in columns))
+    for label in KPI_CLASSES:
+        print(f"{label:<18}" + "".join(f"{confusion[(label, c)]:>8}" for c in columns))
+    for fixture, prediction in zip(fixtures, predictions):
+        if prediction != fixture["label"]:
+            print(f"  miss: {fixture['note']!r} labelled {fixture['label']}, predicted {prediction}")
+
+def main():
+    args = parse_args()
+    with open(args.fixtures) as f:
+        fixtures = json.load(f)
+
+    scoring = get_kpi_classifier("scoring")
+    scoring_predictions, elapsed = evaluate(scoring, fixtures)
+    print_report("scoring", fixtures, scoring_predictions, elapsed)
+
+    rows = [fixtures[i % len(fixtures)]["features"] for i in range(args.throughput_rows)]
+    start = time.perf_counter()
+    scoring.classify_many(rows)
+    elapsed = time.perf_counter() - start
+    print(f"throughput: {len(rows) / elapsed:,.0f} projects/s over {len(rows):,} rows")
+
+    if args.llama:
+        llama = get_kpi_classifier("llama")
+        llama_predictions, elapsed = evaluate(llama, fixtures)
+        print_report("llama", fixtures, llama_predictions, elapsed)
+        agreement = sum(a == b for a, b in zip(scoring_predictions, llama_predictions))
+        print(f"\nscoring vs llama agreement: {agreement}/{len(fixtures)} ({agreement / len(fixtures):.1%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+# Backend/kpi_classifier.py
+
+import asyncio
+import json
+from typing import Dict, Any, List, Optional, Sequence
+
+from config import settings
+
+KPI_CLASSES = ("Low", "Medium", "High")
+
+# The 11 features built by crud.build_kpi_features, in a fixed order.
+KPI_FEATURES = (
+    "completion_percentage",
+    "milestone_completion",
+    "budget_utilization",
+    "schedule_variance",
+    "overdue_tasks",
+    "alert_count",
+    "avg_task_completion_time",
+    "employee_workload_index",
+    "customer_priority_level",
+    "reopened_tasks",
+    "risk_flag",
+)
+
+class KpiClassifier:
+    """
+    Interface for KPI classification backends. Implementations take the 11
+    features from crud.build_kpi_features and return "Low", "Medium" or "High",
+    or "Error" if classification failed.
+    """
+    name = "base"
+    # True if classify_kpi_class blocks on IO and should run off the event loop.
+    blocking = False
+
+    def classify_kpi_class(self, **features) -> str:
+        raise NotImplementedError
+
+    async def aclassify_kpi_class(self, **features) -> str:
+        if self.blocking:
+            # Remote backends (e.g. Llama3) block on IO; keep them off the event loop.
+            return await asyncio.to_thread(self.classify_kpi_class, **features)
+        return self.classify_kpi_class(**features)
+
+    def classify_many(self, rows: List[Dict[str, Any]]) -> List[str]:
+        return [self.classify_kpi_class(**row) for row in rows]
+
+    def classify_matrix(self, matrix: Sequence[Sequence[float]]) -> List[str]:
+        """Classify rows of feature values in KPI_FEATURES order. Backends override this to vectorize."""
+        return [self.classify_kpi_class(**dict(zip(KPI_FEATURES, row))) for row in matrix]
+
+    async def aclassify_matrix(self, matrix: Sequence[Sequence[float]]) -> List[str]:
+        """classify_matrix off the event loop."""
+        return await asyncio.to_thread(self.classify_matrix, matrix)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    def close(self):
+        """Release connections and threads; backends holding any override this."""
+
+    def after_fork(self):
+        """Called in a forked child: replace connections and threads inherited from the parent."""
+
+class ScoringKpiClassifier(KpiClassifier):
+    """
+    Deterministic in-process classifier. Each project gets a 0-100-ish health
+    score: a baseline adjusted by progress and schedule, minus penalties for
+    overspend, overdue/reopened tasks, alerts, slow tasks, overload and risk.
+    Scores at or above `high_threshold` are "High", below `low_threshold` "Low".
+
+    The parameters are plain JSON so a tuned model can be saved and loaded.
+    """
+    name = "scoring"
+
+    DEFAULT_PARAMS = {
+        "baseline": 50.0,
+        "completion_weight": 0.2,           # per point above/below 50%
+        "milestone_weight": 0.2,            # per point above/below 50%
+        "schedule_weight": 1.0,             # per day ahead (+) or behind (-)
+        "schedule_cap": 20.0,               # days; larger variances count as this
+        "overspend_penalty": 0.5,           # per point of budget utilization over 100%
+        "overdue_penalty": 4.0,             # per overdue task
+        "alert_penalty": 3.0,               # per alert
+        "reopened_penalty": 3.0,            # per reopened task
+        "slow_task_threshold": 10.0,        # days
+        "slow_task_penalty": 0.5,           # per day above the threshold
+        "workload_threshold": 75.0,
+        "workload_penalty": 0.3,            # per point above the threshold
+        "risk_penalty": 10.0,
+        "high_threshold": 60.0,
+        "low_threshold": 35.0,
+    }
+
+    def __init__(self, params: Optional[Dict[str, float]] = None):
+        self.params = {**self.DEFAULT_PARAMS, **(params or {})}
+
+    @classmethod
+    def load(cls, path: str) -> "ScoringKpiClassifier":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.params, f, indent=2)
+
+    def score(
+        self,
+        completion_percentage: float,
+        milestone_completion: float,
+        budget_utilization: float,
+        schedule_variance: float,
+        overdue_tasks: int,
+        alert_count: int,
+        avg_task_completion_time: float,
+        employee_workload_index: float,
+        customer_priority_level: int,
+        reopened_tasks: int,
+        risk_flag: bool
+    ) -> float:
+        p = self.params
+        cap = p["schedule_cap"]
+        return (
+            p["baseline"]
+            + p["completion_weight"] * (completion_percentage - 50.0)
+            + p["milestone_weight"] * (milestone_completion - 50.0)
+            + p["schedule_weight"] * min(max(schedule_variance, -cap), cap)
+            - p["overspend_penalty"] * max(budget_utilization - 100.0, 0.0)
+            - p["overdue_penalty"] * overdue_tasks
+            - p["alert_penalty"] * alert_count
+            - p["reopened_penalty"] * reopened_tasks
+            - p["slow_task_penalty"] * max(avg_task_completion_time - p["slow_task_threshold"], 0.0)
+            - p["workload_penalty"] * max(employee_workload_index - p["workload_threshold"], 0.0)
+            - p["risk_penalty"] * (1.0 if risk_flag else 0.0)
+        )
+
+    def label(self, score: float) -> str:
+        if score >= self.params["high_threshold"]:
+            return "High"
+        if score < self.params["low_threshold"]:
+            return "Low"
+        return "Medium"
+
+    def classify_kpi_class(self, **features) -> str:
+        return self.label(self.score(**features))
+
+    def score_matrix(self, matrix):
+        """Vectorized `score` over an (n, 11) array whose columns follow KPI_FEATURES."""
+        import numpy as np
+
+        p = self.params
+        X = np.asarray(matrix, dtype=np.float64)
+        col = {name: X[:, i] for i, name in enumerate(KPI_FEATURES)}
+        cap = p["schedule_cap"]
+        return (
+            p["baseline"]
+            + p["completion_weight"] * (col["completion_percentage"] - 50.0)
+            + p["milestone_weight"] * (col["milestone_completion"] - 50.0)
+            + p["schedule_weight"] * np.clip(col["schedule_variance"], -cap, cap)
+            - p["overspend_penalty"] * np.maximum(col["budget_utilization"] - 100.0, 0.0)
+            - p["overdue_penalty"] * col["overdue_tasks"]
+            - p["alert_penalty"] * col["alert_count"]
+            - p["reopened_penalty"] * col["reopened_tasks"]
+            - p["slow_task_penalty"] * np.maximum(col["avg_task_completion_time"] - p["slow_task_threshold"], 0.0)
+            - p["workload_penalty"] * np.maximum(col["employee_workload_index"] - p["workload_threshold"], 0.0)
+            - p["risk_penalty"] * (col["risk_flag"] != 0)
+        )
+
+    def classify_matrix(self, matrix: Sequence[Sequence[float]]) -> List[str]:
+        import numpy as np
+
+        if len(matrix) == 0:
+            return []
+        scores = self.score_matrix(matrix)
+        labels = np.where(
+            scores >= self.params["high_threshold"], "High",
+            np.where(scores < self.params["low_threshold"], "Low", "Medium")
+        )
+        return labels.tolist()
+
+def get_kpi_classifier(backend: Optional[str] = None) -> KpiClassifier:
+    """Build the classifier named by `backend` (default: settings.KPI_CLASSIFIER)."""
+    backend = backend or settings.KPI_CLASSIFIER
+    if backend == "scoring":
+        if settings.KPI_MODEL_PATH:
+            return ScoringKpiClassifier.load(settings.KPI_MODEL_PATH)
+        return ScoringKpiClassifier()
+    if backend in ("llama", "llama-async"):
+        from llama_kpi_agent import Llama3Client, AsyncLlama3Client, CircuitBreaker, ClassificationCache
+        cache = None
+        if settings.LLAMA_CACHE_SIZE > 0:
+            cache = ClassificationCache(
+                max_entries=settings.LLAMA_CACHE_SIZE,
+                ttl_seconds=settings.LLAMA_CACHE_TTL,
+                db_path=settings.LLAMA_CACHE_PATH
+            )
+        if backend == "llama":
+            return Llama3Client(api_url=settings.LLAMA_API_URL, model_name=settings.LLAMA_MODEL, cache=cache)
+        return AsyncLlama3Client(
+            api_url=settings.LLAMA_API_URL,
+            model_name=settings.LLAMA_MODEL,
+            cache=cache,
+            fallback=get_kpi_classifier("scoring"),
+            timeout=settings.LLAMA_TIMEOUT,
+            max_concurrency=settings.LLAMA_MAX_CONCURRENCY,
+            retries=settings.LLAMA_RETRIES,
+            backoff=settings.LLAMA_RETRY_BACKOFF,
+            breaker=CircuitBreaker(settings.LLAMA_BREAKER_THRESHOLD, settings.LLAMA_BREAKER_RESET)
+        )
+    raise ValueError(f"Unknown KPI classifier backend '{backend}'. Use 'scoring', 'llama' or 'llama-async'.")
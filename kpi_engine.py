@@ -0,0 +1,231 @@
+# Backend/kpi_engine.py
+# Keeps the task, alert and budget KPIs in Project_KPIs in step with the data
+# they are derived from.
+#
+# Writes through crud.py/async_crud.py apply O(1) deltas to the affected
+# project's counters in the same transaction: one UPDATE per touched project.
+# rebuild_project_kpis recomputes the same columns from scratch with set-based
+# SQL, for backfills and for verifying the incremental path (see rebuild_kpis.py).
+#
+# Derived columns:
+#   task_count, completed_tasks, overdue_tasks  <- Tasks by status
+#   completion_percentage                       <- completed_tasks / task_count
+#   alert_count                                 <- Alerts
+#   budget_spent                                <- SUM(Budget_History.amount_used)
+#   budget_utilization                          <- budget_spent / Projects.budget_total
+#   reopened_tasks                              <- Completed -> not Completed transitions
+# reopened_tasks has no source of truth to recount from, so a rebuild leaves it
+# alone. The remaining KPI columns are still entered through /api/project-kpis/.
+
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import case, exc, exists, func, insert, inspect, select, update
+from sqlalchemy.orm import Session
+
+import models, entity_cache
+
+# KPI-relevant fields per source model, captured by snapshot().
+TRACKED_FIELDS = {
+    models.Task: ("project_id", "status"),
+    models.Alert: ("project_id",),
+    models.Budget_History: ("project_id", "amount_used"),
+    models.Project: ("project_id", "budget_total"),
+}
+# Models whose rows feed the counters; bulk writes to these rebuild the affected projects.
+SOURCE_MODELS = (models.Task, models.Alert, models.Budget_History)
+
+COUNTER_COLUMNS = ("task_count", "completed_tasks", "overdue_tasks", "alert_count", "budget_spent")
+
+# Projects per statement when rebuilding a given list of projects.
+REBUILD_CHUNK_SIZE = 1000
+
+def snapshot(obj) -> Optional[tuple]:
+    """The KPI-relevant state of a tracked row as (model, *fields), or None for other models."""
+    if obj is None:
+        return None
+    fields = TRACKED_FIELDS.get(type(obj))
+    if fields is None:
+        return None
+    return (type(obj),) + tuple(getattr(obj, field) for field in fields)
+
+def _percentage(part, whole):
+    return case((whole > 0, func.round(part * 100.0 / whole, 2)), else_=0)
+
+def _utilization(spent, project_id):
+    budget = select(models.Project.budget_total).where(models.Project.project_id == project_id).scalar_subquery()
+    return case((budget > 0, func.round(spent * 100.0 / budget, 2)), else_=0)
+
+def _apply(db: Session, project_id: Optional[int], tasks: int = 0, completed: int = 0, overdue: int = 0,
+           reopened: int = 0, alerts: int = 0, spent: Decimal = Decimal(0), budget_changed: bool = False):
+    if project_id is None:
+        return
+    kpi = models.Project_KPI.__table__
+    # Derived columns go first and are computed from the old counters plus the
+    # delta: MySQL evaluates SET left to right, other databases use old values.
+    assignments = []
+    if tasks or completed:
+        assignments.append((kpi.c.completion_percentage, _percentage(kpi.c.completed_tasks + completed, kpi.c.task_count + tasks)))
+    if spent or budget_changed:
+        assignments.append((kpi.c.budget_utilization, _utilization(kpi.c.budget_spent + spent, kpi.c.project_id)))
+    for column, delta in (
+        (kpi.c.task_count, tasks),
+        (kpi.c.completed_tasks, completed),
+        (kpi.c.overdue_tasks, overdue),
+        (kpi.c.reopened_tasks, reopened),
+        (kpi.c.alert_count, alerts),
+        (kpi.c.budget_spent, spent),
+    ):
+        if delta:
+            assignments.append((column, column + delta))
+    if not assignments:
+        return
+    statement = update(kpi).where(kpi.c.project_id == project_id).ordered_values(*assignments)
+    result = db.execute(statement)
+    entity_cache.invalidate(db, "project_kpi", project_id)
+    if result.rowcount == 0 and not budget_changed:
+        # First write for this project: create its KPI row from the current data.
+        # A concurrent first write may create it first, in which case the unique
+        # index rejects ours and this delta goes onto the row it created.
+        try:
+            with db.begin_nested():
+                rebuild_project_kpis(db, [project_id])
+        except exc.IntegrityError:
+            db.execute(statement)
+
+def _task_counts(state) -> Dict[str, int]:
+    status = state[2]
+    return {"tasks": 1, "completed": int(status == "Completed"), "overdue": int(status == "Overdue")}
+
+def apply_change(db: Session, before: Optional[tuple], after: Optional[tuple]):
+    """
+    Adjust the KPI counters for one row going from `before` to `after` (both
+    from snapshot(); None for a created or deleted row). Call it after the
+    change is flushed and before the commit, so both land in one transaction.
+    """
+    state = before or after
+    if state is None or before == after:
+        return
+    model = state[0]
+
+    if model is models.Project:
+        # Only a changed budget matters; there is no KPI row to create for a new project.
+        if before is not None and after is not None:
+            _apply(db, after[1], budget_changed=True)
+        return
+
+    deltas: Dict[Optional[int], Dict[str, Any]] = {}
+    def add(project_id, sign, **values):
+        project = deltas.setdefault(project_id, {})
+        for key, value in values.items():
+            project[key] = project.get(key, 0) + sign * value
+
+    if model is models.Task:
+        if before is not None:
+            add(before[1], -1, **_task_counts(before))
+        if after is not None:
+            add(after[1], 1, **_task_counts(after))
+        if before is not None and after is not None and before[2] == "Completed" and after[2] != "Completed":
+            add(after[1], 1, reopened=1)
+    elif model is models.Alert:
+        if before is not None:
+            add(before[1], -1, alerts=1)
+        if after is not None:
+            add(after[1], 1, alerts=1)
+    elif model is models.Budget_History:
+        if before is not None:
+            add(before[1], -1, spent=Decimal(str(before[2] or 0)))
+        if after is not None:
+            add(after[1], 1, spent=Decimal(str(after[2] or 0)))
+
+    for project_id, values in deltas.items():
+        _apply(db, project_id, **values)
+
+def affected_projects(db: Session, model, ids: Iterable[int]) -> set:
+    """Projects of the `model` rows with primary keys `ids`, for bulk writes."""
+    if model not in SOURCE_MODELS:
+        return set()
+    pk = inspect(model).primary_key[0]
+    rows = db.query(model.project_id).filter(pk.in_(set(ids))).distinct().all()
+    return {project_id for (project_id,) in rows if project_id is not None}
+
+def _expected_counters(kpi) -> Dict[str, Any]:
+    """Correlated subqueries computing each counter for the Project_KPIs row in `kpi`."""
+    def count(model, *criteria):
+        return (
+            select(func.count())
+            .select_from(model)
+            .where(model.project_id == kpi.c.project_id, *criteria)
+            .scalar_subquery()
+        )
+    Task = models.Task
+    return {
+        "task_count": count(Task),
+        "completed_tasks": count(Task, Task.status == "Completed"),
+        "overdue_tasks": count(Task, Task.status == "Overdue"),
+        "alert_count": count(models.Alert),
+        "budget_spent": (
+            select(func.coalesce(func.sum(models.Budget_History.amount_used), 0))
+            .where(models.Budget_History.project_id == kpi.c.project_id)
+            .scalar_subquery()
+        ),
+    }
+
+def _rebuild(db: Session, project_ids: Optional[List[int]]) -> int:
+    kpi = models.Project_KPI.__table__
+    projects = models.Project.__table__
+
+    missing = select(projects.c.project_id).where(~exists().where(kpi.c.project_id == projects.c.project_id))
+    counters = update(kpi).values(**_expected_counters(kpi))
+    derived = update(kpi).values(
+        completion_percentage=_percentage(kpi.c.completed_tasks, kpi.c.task_count),
+        budget_utilization=_utilization(kpi.c.budget_spent, kpi.c.project_id),
+    )
+    if project_ids is not None:
+        missing = missing.where(projects.c.project_id.in_(project_ids))
+        counters = counters.where(kpi.c.project_id.in_(project_ids))
+        derived = derived.where(kpi.c.project_id.in_(project_ids))
+
+    db.execute(insert(kpi).from_select(["project_id"], missing))
+    rows = db.execute(counters).rowcount
+    db.execute(derived)
+    if project_ids is None:
+        entity_cache.invalidate(db, "project_kpi")
+    else:
+        for project_id in project_ids:
+            entity_cache.invalidate(db, "project_kpi", project_id)
+    return rows
+
+def rebuild_project_kpis(db: Session, project_ids: Optional[Iterable[int]] = None) -> int:
+    """
+    Recompute the derived KPI columns with set-based UPDATEs, for every project
+    or only `project_ids`, creating missing Project_KPIs rows. Does not commit.
+    Returns the number of KPI rows rebuilt.
+    """
+    if project_ids is None:
+        return _rebuild(db, None)
+    ids = sorted(set(project_ids))
+    return sum(_rebuild(db, ids[i:i + REBUILD_CHUNK_SIZE]) for i in range(0, len(ids), REBUILD_CHUNK_SIZE))
+
+def find_drift(db: Session) -> List[Dict[str, Any]]:
+    """Counters whose stored value differs from a fresh recount, one entry per mismatch."""
+    kpi = models.Project_KPI.__table__
+    expected = _expected_counters(kpi)
+    stmt = select(
+        kpi.c.kpi_id, kpi.c.project_id,
+        *(kpi.c[name] for name in COUNTER_COLUMNS),
+        *(expected[name].label(f"expected_{name}") for name in COUNTER_COLUMNS),
+    )
+    drift = []
+    for row in db.execute(stmt).mappings():
+        for name in COUNTER_COLUMNS:
+            stored, actual = row[name], row[f"expected_{name}"]
+            if Decimal(str(stored or 0)) != Decimal(str(actual or 0)):
+                drift.append({
+                    "kpi_id": row["kpi_id"],
+                    "project_id": row["project_id"],
+                    "field": name,
+                    "stored": stored,
+                    "expected": actual,
+                })
+    return drift
@@ -1,15 +1,180 @@
 # Backend/llama_kpi_agent.py
 
+import asyncio
+import hashlib
 import json
-from typing import Dict, Any
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence
 
-from fastapi import requests
+import requests
 
-class Llama3Client:
+from kpi_classifier import KpiClassifier, ScoringKpiClassifier, KPI_FEATURES
+
+logger = logging.getLogger("llama_kpi_agent")
+
+# Bump whenever the classification prompt changes so cached answers from the
+# old prompt are no longer used.
+PROMPT_VERSION = "1"
+
+class ClassificationCache:
+    """
+    Cache of Llama3 KPI classifications keyed by a hash of the normalized
+    features, the model name and PROMPT_VERSION.
+
+    The in-memory tier is an LRU bounded by `max_entries` with a per-entry TTL.
+    If `db_path` is set, entries are also written to a SQLite file, which is
+    consulted on memory misses so answers survive restarts.
+    """
+    def __init__(self, max_entries: int = 10000, ttl_seconds: float = 86400.0, db_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (kpi_class, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db_path = db_path
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS kpi_classifications "
+                "(cache_key TEXT PRIMARY KEY, kpi_class TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def after_fork(self):
+        if self._db is not None:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+
+    @staticmethod
+    def make_key(features: Dict[str, Any], model_name: str) -> str:
+        normalized = []
+        for name in KPI_FEATURES:
+            value = features[name]
+            # bool before float: bool is an int subclass.
+            normalized.append(int(value) if isinstance(value, bool) else round(float(value), 4))
+        raw = json.dumps([model_name, PROMPT_VERSION, normalized], separators=(",", ":"))
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                kpi_class, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return kpi_class
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT kpi_class, created_at FROM kpi_classifications WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[1] + self.ttl_seconds > now:
+                    self._store(key, row[0], row[1] + self.ttl_seconds)
+                    self.disk_hits += 1
+                    return row[0]
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, kpi_class: str):
+        now = time.time()
+        with self._lock:
+            self._store(key, kpi_class, now + self.ttl_seconds)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO kpi_classifications (cache_key, kpi_class, created_at) VALUES (?, ?, ?)",
+                    (key, kpi_class, now)
+                )
+                self._db.commit()
+
+    def _store(self, key: str, kpi_class: str, expires_at: float):
+        self._entries[key] = (kpi_class, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM kpi_classifications")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "persistent": self._db is not None,
+            }
+
+def build_kpi_prompt(
+    completion_percentage: float,
+    milestone_completion: float,
+    budget_utilization: float,
+    schedule_variance: float,
+    overdue_tasks: int,
+    alert_count: int,
+    avg_task_completion_time: float,
+    employee_workload_index: float,
+    customer_priority_level: int,
+    reopened_tasks: int,
+    risk_flag: bool
+) -> str:
+    """Prompt sent to the model for one project. Bump PROMPT_VERSION when changing it."""
+    return f"""
+        You are an expert project manager and an AI assistant designed to classify project KPI performance.
+        Given the following project parameters, classify the project's overall KPI class as 'Low', 'Medium', or 'High'.
+        Only respond with one of these three words: 'Low', 'Medium', or 'High'. Do not include any other text or explanation.
+
+        Project Parameters:
+        - Completion Percentage: {completion_percentage}%
+        - Milestone Completion: {milestone_completion}%
+        - Budget Utilization: {budget_utilization}%
+        - Schedule Variance: {schedule_variance} days (positive is ahead, negative is behind)
+        - Overdue Tasks: {overdue_tasks}
+        - Alert Count: {alert_count}
+        - Average Task Completion Time: {avg_task_completion_time} days
+        - Employee Workload Index: {employee_workload_index}
+        - Customer Priority Level: {customer_priority_level} (1=highest, 5=lowest)
+        - Reopened Tasks: {reopened_tasks}
+        - Risk Flag: {risk_flag}
+
+        Based on these parameters, what is the KPI class of this project?
+        """
+
+class Llama3Client(KpiClassifier):
     """
     A client to interact with a local Llama3 agent for KPI classification.
     """
-    def __init__(self, api_url: str = "http://localhost:11434/api/generate", model_name: str = "llama3"):
+    name = "llama"
+    blocking = True
+
+    def __init__(
+        self,
+        api_url: str = "http://localhost:11434/api/generate",
+        model_name: str = "llama3",
+        cache: Optional[ClassificationCache] = None,
+        timeout: float = 30.0
+    ):
         """
         Initializes the Llama3Client.
 
@@ -17,9 +182,32 @@ class Llama3Client:
             api_url (str): The URL of your local Llama3 API endpoint.
                            Defaults to 'http://localhost:11434/api/generate' for Ollama.
             model_name (str): The name of the Llama3 model you're using (e.g., 'llama3').
+            cache (ClassificationCache): Optional cache of previous answers. Unchanged
+                                         inputs are then answered without calling the model.
+            timeout (float): Seconds to wait for the model before giving up.
         """
         self.api_url = api_url
         self.model_name = model_name
+        self.cache = cache
+        self.timeout = timeout
+        # Reuse one keep-alive connection pool across calls.
+        self.session = requests.Session()
+
+    def close(self):
+        self.session.close()
+
+    def after_fork(self):
+        self.session = requests.Session()
+        if self.cache is not None:
+            self.cache.after_fork()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model": self.model_name,
+            "prompt_version": PROMPT_VERSION,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
 
     def classify_kpi_class(
         self,
@@ -58,27 +246,29 @@ class Llama3Client:
             str: The classified KPI class ("Low", "Medium", or "High"), or "Error" if classification fails.
         """
 
-        # Construct the prompt for the Llama3 model
-        prompt = f"""
-        You are an expert project manager and an AI assistant designed to classify project KPI performance.
-        Given the following project parameters, classify the project's overall KPI class as 'Low', 'Medium', or 'High'.
-        Only respond with one of these three words: 'Low', 'Medium', or 'High'. Do not include any other text or explanation.
+        features = {
+            "completion_percentage": completion_percentage,
+            "milestone_completion": milestone_completion,
+            "budget_utilization": budget_utilization,
+            "schedule_variance": schedule_variance,
+            "overdue_tasks": overdue_tasks,
+            "alert_count": alert_count,
+            "avg_task_completion_time": avg_task_completion_time,
+            "employee_workload_index": employee_workload_index,
+            "customer_priority_level": customer_priority_level,
+            "reopened_tasks": reopened_tasks,
+            "risk_flag": risk_flag,
+        }
 
-        Project Parameters:
-        - Completion Percentage: {completion_percentage}%
-        - Milestone Completion: {milestone_completion}%
-        - Budget Utilization: {budget_utilization}%
-        - Schedule Variance: {schedule_variance} days (positive is ahead, negative is behind)
-        - Overdue Tasks: {overdue_tasks}
-        - Alert Count: {alert_count}
-        - Average Task Completion Time: {avg_task_completion_time} days
-        - Employee Workload Index: {employee_workload_index}
-        - Customer Priority Level: {customer_priority_level} (1=highest, 5=lowest)
-        - Reopened Tasks: {reopened_tasks}
-        - Risk Flag: {risk_flag}
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(features, self.model_name)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
 
-        Based on these parameters, what is the KPI class of this project?
-        """
+        # Construct the prompt for the Llama3 model
+        prompt = build_kpi_prompt(**features)
 
         payload = {
             "model": self.model_name,
@@ -88,10 +278,11 @@ class Llama3Client:
 
         try:
             # Make the API call to your local Llama3 agent
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
                 headers={'Content-Type': 'application/json'},
-                json=payload
+                json=payload,
+                timeout=self.timeout
             )
             response.raise_for_status() # Raise an exception for HTTP errors (4xx or 5xx)
 
@@ -100,28 +291,236 @@ class Llama3Client:
             if result.get('response'):
                 text = result['response'].strip().capitalize()
                 if text in ["Low", "Medium", "High"]:
+                    if cache_key is not None:
+                        self.cache.set(cache_key, text)
                     return text
                 else:
-                    print(f"Warning: Llama3 returned an unexpected classification: '{text}'. Defaulting to 'Medium'.")
+                    logger.warning("Llama3 returned an unexpected classification %r; defaulting to 'Medium'", text)
                     return "Medium"
             else:
-                print("Error: Llama3 API response structure is unexpected or 'response' field is missing.")
-                print(f"Full Llama3 response: {result}") # Print full response for debugging
+                logger.error("Llama3 API response has no 'response' field")
+                logger.debug("Full Llama3 response: %s", result)
                 return "Error"
 
         except requests.exceptions.ConnectionError:
-            print(f"Error: Could not connect to local Llama3 agent at {self.api_url}.")
-            print("Please ensure your local Llama3 agent (e.g., Ollama) is running and accessible at this address.")
+            logger.error("Could not connect to the local Llama3 agent at %s; is it (e.g. Ollama) running?", self.api_url)
             return "Error"
         except requests.exceptions.RequestException as e:
-            print(f"Error calling local Llama3 API: {e}")
+            logger.error("Error calling the local Llama3 API: %s", e)
             return "Error"
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
+        except Exception:
+            logger.exception("Unexpected error classifying with Llama3")
             return "Error"
 
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. After that one trial call is let through
+    (half-open); its outcome closes or re-opens the circuit.
+    """
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_in_flight or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+class AsyncLlama3Client(KpiClassifier):
+    """
+    Non-blocking Llama3 client for use on the request path.
+
+    All model calls run on a private event loop thread that owns one pooled
+    keep-alive httpx.AsyncClient, so sync callers, async callers on any loop and
+    batch calls share the same connections. Concurrency is bounded by a
+    semaphore, every call has a timeout and is retried with exponential backoff,
+    and a circuit breaker stops calling a slow or failing model server. Whenever
+    the model cannot answer, the `fallback` classifier answers instead.
+    """
+    name = "llama-async"
+    blocking = False
+
+    def __init__(
+        self,
+        api_url: str = "http://localhost:11434/api/generate",
+        model_name: str = "llama3",
+        cache: Optional[ClassificationCache] = None,
+        fallback: Optional[KpiClassifier] = None,
+        timeout: float = 10.0,
+        max_concurrency: int = 8,
+        retries: int = 2,
+        backoff: float = 0.25,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        self.api_url = api_url
+        self.model_name = model_name
+        self.cache = cache
+        self.fallback = fallback or ScoringKpiClassifier()
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.breaker = breaker or CircuitBreaker()
+        self.counters = {"model_calls": 0, "retries": 0, "timeouts": 0, "errors": 0, "fallbacks": 0}
+        self._loop = None
+        self._thread = None
+        self._client = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    # --- Event loop plumbing ---
+    def _ensure_started(self):
+        with self._start_lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=loop.run_forever, name="llama3-client", daemon=True)
+            self._thread.start()
+            self._loop = loop
+            asyncio.run_coroutine_threadsafe(self._open(), loop).result()
+
+    async def _open(self):
+        import httpx
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    def _submit(self, coro):
+        self._ensure_started()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def close(self):
+        with self._start_lock:
+            if self._loop is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = self._thread = self._client = self._semaphore = None
+
+    def after_fork(self):
+        # The event loop thread did not survive the fork; start a new one on first use.
+        self._loop = self._thread = self._client = self._semaphore = None
+        self._start_lock = threading.Lock()
+        self.fallback.after_fork()
+        if self.cache is not None:
+            self.cache.after_fork()
+
+    # --- Classification ---
+    async def _call_model(self, features: Dict[str, Any]) -> Optional[str]:
+        """One model answer with retries, or None if the model could not answer."""
+        import httpx
+
+        payload = {"model": self.model_name, "prompt": build_kpi_prompt(**features), "stream": False}
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.counters["retries"] += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            try:
+                async with self._semaphore:
+                    self.counters["model_calls"] += 1
+                    response = await self._client.post(self.api_url, json=payload)
+                if response.status_code >= 500:
+                    raise httpx.HTTPStatusError("server error", request=response.request, response=response)
+                response.raise_for_status()
+                text = (response.json().get("response") or "").strip().capitalize()
+                # A well-formed reply is a success even if the answer is unusable.
+                return text if text in ("Low", "Medium", "High") else None
+            except httpx.TimeoutException:
+                self.counters["timeouts"] += 1
+            except (httpx.HTTPError, ValueError):
+                self.counters["errors"] += 1
+        raise ConnectionError(f"Llama3 agent at {self.api_url} did not answer after {self.retries + 1} attempts")
+
+    async def _classify(self, features: Dict[str, Any]) -> str:
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(features, self.model_name)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if self.breaker.allow():
+            try:
+                text = await self._call_model(features)
+                self.breaker.record_success()
+                if text is not None:
+                    if cache_key is not None:
+                        self.cache.set(cache_key, text)
+                    return text
+            except ConnectionError:
+                self.breaker.record_failure()
+
+        self.counters["fallbacks"] += 1
+        return self.fallback.classify_kpi_class(**features)
+
+    async def _classify_all(self, rows: List[Dict[str, Any]]) -> List[str]:
+        return list(await asyncio.gather(*(self._classify(row) for row in rows)))
+
+    def classify_kpi_class(self, **features) -> str:
+        return self._submit(self._classify(features)).result()
+
+    async def aclassify_kpi_class(self, **features) -> str:
+        return await asyncio.wrap_future(self._submit(self._classify(features)))
+
+    def classify_many(self, rows: List[Dict[str, Any]]) -> List[str]:
+        return self._submit(self._classify_all(rows)).result()
+
+    def classify_matrix(self, matrix: Sequence[Sequence[float]]) -> List[str]:
+        return self.classify_many([dict(zip(KPI_FEATURES, row)) for row in matrix])
+
+    async def aclassify_matrix(self, matrix: Sequence[Sequence[float]]) -> List[str]:
+        rows = [dict(zip(KPI_FEATURES, row)) for row in matrix]
+        return await asyncio.wrap_future(self._submit(self._classify_all(rows)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "model": self.model_name,
+            "prompt_version": PROMPT_VERSION,
+            "circuit": self.breaker.state,
+            "fallback": self.fallback.name,
+            **self.counters,
+            "cache": self.cache.stats() if self.cache is not None else None,
+        }
+
 # --- Example Usage (can be run directly in a Python script) ---
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     llama_client_instance = Llama3Client()
     print("--- Project KPI Classification Examples with Local Llama3 ---")
 
@@ -0,0 +1,318 @@
+# Backend/load_test.py
+# Scripted load tests that replay what the frontend does, with a compare mode
+# for before/after runs:
+#
+#   python load_test.py run --output before.json                # in-process main:app, seeded SQLite
+#   python load_test.py run --app async_main --concurrency 50 --duration 20 --output after.json
+#   python load_test.py run --base-url http://localhost:8000    # a running server
+#   python load_test.py compare before.json after.json
+#
+# Workloads (WORKLOADS) are run one after the other, each by --concurrency
+# virtual users for --duration seconds. A user is a generator that yields the
+# requests of one screen after another and receives each response, so it can
+# act on it the way the UI does (alert polling re-sends its ETag).
+#
+# Without --base-url the app is imported and driven through httpx's ASGI
+# transport, so client and server share one process and event loop: compare
+# runs made the same way. An empty database is first filled with bench_data.py
+# at --scale. Request choices are drawn from --seed, so two runs over the same
+# data replay the same sequence per user.
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Generator, List, NamedTuple, Optional
+
+from benchmark import percentile
+
+class Call(NamedTuple):
+    label: str           # endpoint template, the unit results are grouped by
+    method: str
+    path: str
+    headers: Optional[Dict[str, str]] = None
+
+class Dataset(NamedTuple):
+    customers: int
+    employees: int
+    projects: int
+    tasks: int
+
+User = Generator[Call, Any, None]
+
+# --- Workloads ---
+def list_pages(rng: random.Random, data: Dataset) -> User:
+    """The list screens: first pages, a filter, and paging on with the cursor."""
+    while True:
+        screen = rng.choice(("projects", "tasks", "customers", "employees"))
+        if screen == "projects":
+            status = rng.choice(("In Progress", "Completed", "On Hold"))
+            response = yield Call("GET /api/projects/", "GET", f"/api/projects/?limit=20&status={status}")
+            cursor = response.headers.get("x-next-cursor")
+            if cursor:
+                yield Call("GET /api/projects/?cursor", "GET", f"/api/projects/?limit=20&status={status}&cursor={cursor}")
+        elif screen == "tasks":
+            response = yield Call("GET /api/tasks/", "GET", "/api/tasks/?limit=50&sort=deadline&status=Pending")
+            cursor = response.headers.get("x-next-cursor")
+            if cursor:
+                yield Call("GET /api/tasks/?cursor", "GET", f"/api/tasks/?limit=50&sort=deadline&status=Pending&cursor={cursor}")
+        elif screen == "customers":
+            yield Call("GET /api/customers/", "GET", "/api/customers/?limit=50")
+        else:
+            yield Call("GET /api/employees/", "GET", "/api/employees/?limit=50")
+
+def project_detail(rng: random.Random, data: Dataset) -> User:
+    """The project page: the project, its KPIs, tasks, phases and budget."""
+    while True:
+        project_id = rng.randint(1, data.projects)
+        yield Call("GET /api/projects/{id}", "GET", f"/api/projects/{project_id}")
+        yield Call("GET /api/projects/{id}/kpi", "GET", f"/api/projects/{project_id}/kpi")
+        yield Call("GET /api/tasks/?project_id", "GET", f"/api/tasks/?project_id={project_id}&limit=100")
+        yield Call("GET /api/projects/{id}/phases", "GET", f"/api/projects/{project_id}/phases")
+        yield Call("GET /api/projects/{id}/budget-history", "GET", f"/api/projects/{project_id}/budget-history")
+
+def alert_polling(rng: random.Random, data: Dataset) -> User:
+    """The alert bell: newest unread alerts, re-polled with If-None-Match."""
+    etag = None
+    while True:
+        headers = {"If-None-Match": etag} if etag else None
+        response = yield Call("GET /api/alerts/?status=Unread", "GET", "/api/alerts/?status=Unread&sort=-created_at&limit=20",
+                              headers)
+        etag = response.headers.get("etag", etag)
+        if rng.random() < 0.1:
+            yield Call("GET /api/dashboard/summary", "GET", "/api/dashboard/summary")
+
+def kpi_classification(rng: random.Random, data: Dataset) -> User:
+    """The KPI panel: classify a project, then read its KPI back."""
+    while True:
+        project_id = rng.randint(1, data.projects)
+        yield Call("POST /api/projects/{id}/classify-kpi", "POST", f"/api/projects/{project_id}/classify-kpi")
+        yield Call("GET /api/projects/{id}/kpi", "GET", f"/api/projects/{project_id}/kpi")
+
+WORKLOADS = {
+    "list-pages": list_pages,
+    "project-detail": project_detail,
+    "alert-polling": alert_polling,
+    "kpi-classification": kpi_classification,
+}
+
+# --- Running ---
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, Any]:
+    if not latencies:
+        return {"requests": 0, "errors": errors, "rps": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "mean": 0.0}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50": round(percentile(latencies, 50) * 1000, 3),
+        "p95": round(percentile(latencies, 95) * 1000, 3),
+        "p99": round(percentile(latencies, 99) * 1000, 3),
+        "mean": round(statistics.fmean(latencies) * 1000, 3),
+    }
+
+async def run_workload(client, name: str, data: Dataset, concurrency: int, duration: float, seed: int) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    deadline = time.perf_counter() + duration
+
+    async def user(index: int):
+        rng = random.Random(f"{seed}:{name}:{index}")
+        script = WORKLOADS[name](rng, data)
+        call = next(script)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                response = await client.request(call.method, call.path, headers=call.headers)
+                failed = response.status_code >= 400
+            except Exception:
+                response, failed = None, True
+            latencies.setdefault(call.label, []).append(time.perf_counter() - start)
+            if failed:
+                errors[call.label] = errors.get(call.label, 0) + 1
+            if response is None:
+                # No response to act on: start over on a fresh screen.
+                script = WORKLOADS[name](rng, data)
+                call = next(script)
+            else:
+                call = script.send(response)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    every = [latency for samples in latencies.values() for latency in samples]
+    result = summarize(every, sum(errors.values()), elapsed)
+    result["endpoints"] = {
+        label: summarize(samples, errors.get(label, 0), elapsed) for label, samples in sorted(latencies.items())
+    }
+    return result
+
+def dataset(db) -> Dataset:
+    import models
+    from sqlalchemy import func
+
+    def count(column):
+        return db.query(func.max(column)).scalar() or 0
+
+    return Dataset(count(models.Customer.customer_id), count(models.Employee.employee_id),
+                   count(models.Project.project_id), count(models.Task.task_id))
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_result(name: str, result: Dict[str, Any]):
+    print(f"\n== {name}: {result['requests']:,} requests, {result['rps']:.1f} req/s, {result['errors']} errors ==")
+    print(f"{'endpoint':<42} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for label, stats in list(result["endpoints"].items()) + [("(all)", result)]:
+        print(f"{label:<42} {stats['requests']:>9} {stats['rps']:>8.1f} {stats['p50']:>8.2f} "
+              f"{stats['p95']:>8.2f} {stats['p99']:>8.2f} {stats['errors']:>7}")
+    sys.stdout.flush()
+
+async def run(args):
+    import httpx
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+        lifespan = None
+        target = args.base_url
+    else:
+        if args.database_url is None and not os.getenv("DATABASE_URL"):
+            db_file = os.path.join(tempfile.mkdtemp(prefix="pm-load-"), "bench.db")
+            args.database_url = f"sqlite:///{db_file}"
+        if args.database_url:
+            os.environ["DATABASE_URL"] = args.database_url
+        # Background sweeps would land at random points in the run.
+        os.environ.setdefault("OVERDUE_SWEEP_INTERVAL", "0")
+        import importlib
+        import database, models, bench_data
+
+        models.Base.metadata.create_all(bind=database.engine)
+        with database.SessionLocal() as db:
+            if db.query(models.Customer).first() is None:
+                print(f"Seeding {args.scale:,} tasks worth of data...", file=sys.stderr)
+                bench_data.generate(db, args.scale, args.seed)
+        app = importlib.import_module(args.app).app
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False),
+                                   base_url="http://load-test", timeout=60)
+        target = f"{args.app}:app on {database.engine.url.render_as_string(hide_password=True)}"
+
+    try:
+        if args.base_url:
+            data = Dataset(*args.ids)
+        else:
+            with database.SessionLocal() as db:
+                data = dataset(db)
+        print(f"Target: {target}, {args.concurrency} users, {args.duration:g}s per workload, "
+              f"data: {data.projects:,} projects, {data.tasks:,} tasks")
+        results = {}
+        for name in args.workloads:
+            results[name] = await run_workload(client, name, data, args.concurrency, args.duration, args.seed)
+            print_result(name, results[name])
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+    report = {
+        "meta": {
+            "target": target,
+            "app": None if args.base_url else args.app,
+            "revision": git_revision(),
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "seed": args.seed,
+            "data": data._asdict(),
+        },
+        "workloads": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nSaved to {args.output}")
+
+# --- Comparing ---
+def change(before: float, after: float) -> Optional[float]:
+    return (after - before) / before * 100 if before else None
+
+def compare(args) -> int:
+    """Print after vs before per workload and endpoint; returns the number of regressions."""
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"before: {before['meta'].get('revision')} {before['meta']['target']}")
+    print(f"after:  {after['meta'].get('revision')} {after['meta']['target']}")
+
+    def pct(value: Optional[float]) -> str:
+        return "    n/a" if value is None else f"{value:+6.1f}%"
+
+    regressions = 0
+    for name in before["workloads"]:
+        if name not in after["workloads"]:
+            print(f"\n== {name}: missing from {args.after} ==")
+            continue
+        old, new = before["workloads"][name], after["workloads"][name]
+        print(f"\n== {name} ==")
+        print(f"{'endpoint':<42} {'req/s':>17} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17}")
+        labels = [label for label in old["endpoints"] if label in new["endpoints"]] + ["(all)"]
+        for label in labels:
+            o, n = (old, new) if label == "(all)" else (old["endpoints"][label], new["endpoints"][label])
+            rps, p95 = change(o["rps"], n["rps"]), change(o["p95"], n["p95"])
+            regressed = (rps is not None and rps < -args.threshold) or (p95 is not None and p95 > args.threshold)
+            regressions += regressed
+            print(f"{label:<42} {n['rps']:>9.1f} {pct(rps)} {n['p50']:>9.2f} {pct(change(o['p50'], n['p50']))} "
+                  f"{n['p95']:>9.2f} {pct(p95)} {n['p99']:>9.2f} {pct(change(o['p99'], n['p99']))}"
+                  + ("  REGRESSION" if regressed else ""))
+    print(f"\n{regressions} regression(s) beyond {args.threshold:g}% in req/s or p95")
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Frontend-like load tests and run comparison")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the workloads and report throughput and latency percentiles")
+    run_parser.add_argument("--app", default="main", choices=("main", "async_main"), help="App module to load in-process")
+    run_parser.add_argument("--base-url", default=None, help="Load a running server instead of the in-process app")
+    run_parser.add_argument("--ids", type=int, nargs=4, metavar=("CUSTOMERS", "EMPLOYEES", "PROJECTS", "TASKS"),
+                            help="With --base-url: highest ids to draw from")
+    run_parser.add_argument("--database-url", default=None,
+                            help="Database for the in-process app (defaults to DATABASE_URL, else a temporary SQLite file)")
+    run_parser.add_argument("--scale", type=int, default=10_000, help="Tasks to seed an empty database with (see bench_data.py)")
+    run_parser.add_argument("--workloads", nargs="+", choices=list(WORKLOADS), default=list(WORKLOADS))
+    run_parser.add_argument("--concurrency", type=int, default=20, help="Virtual users per workload")
+    run_parser.add_argument("--duration", type=float, default=10, help="Seconds per workload")
+    run_parser.add_argument("--seed", type=int, default=42, help="Seed for data and request choices")
+    run_parser.add_argument("--output", default=None, help="Write the results as JSON, for compare")
+
+    compare_parser = commands.add_parser("compare", help="Diff two saved runs")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=10,
+                                help="Percent drop in req/s or rise in p95 flagged as a regression (default: %(default)s)")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    if args.command == "compare":
+        sys.exit(1 if compare(args) else 0)
+    if args.base_url and not args.ids:
+        sys.exit("--base-url needs --ids CUSTOMERS EMPLOYEES PROJECTS TASKS")
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,33 @@
-from fastapi import FastAPI, Depends, HTTPException, Response, status
-from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from fastapi.middleware.cors import CORSMiddleware
 
-import models, schemas, crud
-from database import engine, get_db
-
-models.Base.metadata.create_all(bind=engine)
+import models, schemas, crud, pagination, versioning, overdue_sweeper, alert_stream, entity_cache, export, bulk_import, fast_json, instrumentation
+import database, migrate
+from database import get_db
+from config import settings
+
+# Nothing here touches the database or opens a client at import; tables come
+# from `python migrate.py` and the classifier is built at startup.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DB_CREATE_TABLES_ON_STARTUP:
+        migrate.apply()
+    crud.kpi_classifier()
+    async with overdue_sweeper.background(settings.OVERDUE_SWEEP_INTERVAL), alert_stream.running(settings.ALERT_BROKER_URL):
+        yield
+    crud.close_kpi_classifier()
 
 app = FastAPI(
     title="Project Management System Backend",
     description="API for managing customers, projects, tasks, employees, phases, alerts, budget history, and KPIs.",
     version="1.0.0",
     docs_url="/api/docs",
-    redoc_url="/api/redoc"
+    redoc_url="/api/redoc",
+    lifespan=lifespan
 )
 
 origins = [
@@ -23,18 +36,32 @@ origins = [
     "http://127.0.0.1:8000",
 ]
 
+# Added before CORS so 304s short-circuited here still get CORS headers.
+app.add_middleware(versioning.ConditionalGetMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[pagination.NEXT_CURSOR_HEADER, *versioning.VALIDATOR_HEADERS],
 )
 
+# Added last so it times everything above, including 304s and CORS preflights.
+app.add_middleware(instrumentation.RequestMetricsMiddleware)
+
+CHUNK_SIZE_QUERY = Query(settings.BULK_CHUNK_SIZE, ge=1, le=settings.BULK_MAX_CHUNK_SIZE)
+
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Project Management Dashboard API!"}
 
+# --- Dashboard Endpoints ---
+@app.get("/api/dashboard/summary", response_model=schemas.DashboardSummary)
+def read_dashboard_summary(db: Session = Depends(get_db)):
+    return crud.get_dashboard_summary(db)
+
 # --- Employee Endpoints ---
 @app.post("/api/employees/", response_model=schemas.Employee, status_code=status.HTTP_201_CREATED)
 def create_employee(employee: schemas.EmployeeCreate, db: Session = Depends(get_db)):
@@ -44,16 +71,18 @@ def create_employee(employee: schemas.EmployeeCreate, db: Session = Depends(get_
     return crud.create_employee(db=db, employee=employee)
 
 @app.get("/api/employees/", response_model=List[schemas.Employee])
-def read_employees(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    employees = crud.get_employees(db, skip=skip, limit=limit)
-    return employees
+def read_employees(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Employee, fields)
+    employees = crud.get_rows(db, models.Employee, schemas.Employee, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Employee, schemas.Employee, employees, limit, fields=selected)
 
 @app.get("/api/employees/{employee_id}", response_model=schemas.Employee)
-def read_employee(employee_id: int, db: Session = Depends(get_db)):
+def read_employee(employee_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Employee, fields)
     employee = crud.get_employee(db, employee_id=employee_id)
     if employee is None:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return employee
+    return fast_json.object_response(schemas.Employee, employee, selected) if selected else employee
 
 @app.put("/api/employees/{employee_id}", response_model=schemas.Employee)
 def update_employee(employee_id: int, employee_update: schemas.EmployeeUpdate, db: Session = Depends(get_db)):
@@ -75,16 +104,18 @@ def create_customer(customer: schemas.CustomerCreate, db: Session = Depends(get_
     return crud.create_customer(db=db, customer=customer)
 
 @app.get("/api/customers/", response_model=List[schemas.Customer])
-def read_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    customers = crud.get_customers(db, skip=skip, limit=limit)
-    return customers
+def read_customers(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Customer, fields)
+    customers = crud.get_rows(db, models.Customer, schemas.Customer, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Customer, schemas.Customer, customers, limit, fields=selected)
 
 @app.get("/api/customers/{customer_id}", response_model=schemas.Customer)
-def read_customer(customer_id: int, db: Session = Depends(get_db)):
+def read_customer(customer_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Customer, fields)
     customer = crud.get_customer(db, customer_id=customer_id)
     if customer is None:
         raise HTTPException(status_code=404, detail="Customer not found")
-    return customer
+    return fast_json.object_response(schemas.Customer, customer, selected) if selected else customer
 
 @app.put("/api/customers/{customer_id}", response_model=schemas.Customer)
 def update_customer(customer_id: int, customer_update: schemas.CustomerUpdate, db: Session = Depends(get_db)):
@@ -105,14 +136,38 @@ def delete_customer(customer_id: int, db: Session = Depends(get_db)):
 def create_project(project: schemas.ProjectCreate, db: Session = Depends(get_db)):
     return crud.create_project(db=db, project=project)
 
-@app.get("/api/projects/", response_model=List[schemas.Project])
-def read_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    projects = crud.get_projects(db, skip=skip, limit=limit)
-    return projects
+@app.get("/api/projects/", response_model=List[schemas.ProjectDetail], response_model_exclude_unset=True)
+def read_projects(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: Optional[str] = None,
+                  expand: Optional[str] = None, filters: schemas.ProjectFilter = Depends(), fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Project, fields)
+    order = pagination.parse_sort(models.Project, sort, crud.PROJECT_SORT_FIELDS)
+    expand_fields = crud.parse_project_expand(expand)
+    if not expand_fields:
+        projects = crud.get_rows(db, models.Project, schemas.Project, skip=skip, limit=limit, cursor=cursor, order=order,
+                                 filters=filters, apply_filters=crud.filter_projects, fields=selected)
+        return fast_json.page_response(models.Project, schemas.Project, projects, limit, order, fields=selected)
+    projects = crud.get_projects(db, skip=skip, limit=limit, cursor=cursor, filters=filters, order=order,
+                                 expand=expand_fields, fields=selected)
+    if selected:
+        content = fast_json.expanded_dicts(models.Project, schemas.Project, schemas.ProjectDetail, projects,
+                                           selected, expand_fields)
+        sparse = fast_json.json_response(content)
+        pagination.set_next_cursor(sparse, projects, models.Project, limit, order)
+        return sparse
+    pagination.set_next_cursor(response, projects, models.Project, limit, order)
+    return [schemas.ProjectDetail.from_project(project, expand_fields) for project in projects]
 
 @app.get("/api/projects/{project_id}", response_model=schemas.Project)
-def read_project(project_id: int, db: Session = Depends(get_db)):
+def read_project(project_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Project, fields)
     project = crud.get_project(db, project_id=project_id)
+    if project is None:
+        raise HTTPException(status_code=404, detail="Project not found")
+    return fast_json.object_response(schemas.Project, project, selected) if selected else project
+
+@app.get("/api/projects/{project_id}/full", response_model=schemas.ProjectDetail)
+def read_project_full(project_id: int, db: Session = Depends(get_db)):
+    project = crud.get_project_full(db, project_id=project_id)
     if project is None:
         raise HTTPException(status_code=404, detail="Project not found")
     return project
@@ -129,7 +184,7 @@ def delete_project(project_id: int, db: Session = Depends(get_db)):
     success = crud.delete_project(db, project_id)
     if not success:
         raise HTTPException(status_code=404, detail="Project not found")
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # --- Task Endpoints ---
 @app.post("/api/tasks/", response_model=schemas.Task, status_code=status.HTTP_201_CREATED)
@@ -137,16 +192,38 @@ def create_task(task: schemas.TaskCreate, db: Session = Depends(get_db)):
     return crud.create_task(db=db, task=task)
 
 @app.get("/api/tasks/", response_model=List[schemas.Task])
-def read_tasks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    tasks = crud.get_tasks(db, skip=skip, limit=limit)
-    return tasks
+def read_tasks(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: Optional[str] = None,
+               filters: schemas.TaskFilter = Depends(), fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Task, fields)
+    order = pagination.parse_sort(models.Task, sort, crud.TASK_SORT_FIELDS)
+    tasks = crud.get_rows(db, models.Task, schemas.Task, skip=skip, limit=limit, cursor=cursor, order=order,
+                          filters=filters, apply_filters=crud.filter_tasks, fields=selected)
+    return fast_json.page_response(models.Task, schemas.Task, tasks, limit, order, fields=selected)
+
+# Bulk routes, here and for alerts and budget history below, are declared ahead
+# of the /{id} routes they would otherwise collide with.
+@app.post("/api/tasks/bulk", response_model=schemas.BulkResult)
+def bulk_create_tasks(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_create_tasks(db, rows, chunk_size)
+
+@app.patch("/api/tasks/bulk", response_model=schemas.BulkResult)
+def bulk_update_tasks(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_update_tasks(db, rows, chunk_size)
+
+@app.delete("/api/tasks/bulk", response_model=schemas.BulkResult)
+def bulk_delete_tasks(body: schemas.BulkDelete, chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_delete_tasks(db, body.ids, chunk_size)
 
 @app.get("/api/tasks/{task_id}", response_model=schemas.Task)
-def read_task(task_id: int, db: Session = Depends(get_db)):
-    task = crud.get_task(db, task_id=task_id)
+def read_task(task_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Task, fields)
+    if selected:
+        task = crud.get_row(db, models.Task, schemas.Task, task_id, selected)
+    else:
+        task = crud.get_task(db, task_id=task_id)
     if task is None:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    return fast_json.row_response(models.Task, schemas.Task, task, selected) if selected else task
 
 @app.put("/api/tasks/{task_id}", response_model=schemas.Task)
 def update_task(task_id: int, task_update: schemas.TaskUpdate, db: Session = Depends(get_db)):
@@ -160,7 +237,7 @@ def delete_task(task_id: int, db: Session = Depends(get_db)):
     success = crud.delete_task(db, task_id)
     if not success:
         raise HTTPException(status_code=404, detail="Task not found")
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # --- Project Phase Endpoints ---
 @app.post("/api/project-phases/", response_model=schemas.ProjectPhase, status_code=status.HTTP_201_CREATED)
@@ -168,16 +245,21 @@ def create_project_phase(phase: schemas.ProjectPhaseCreate, db: Session = Depend
     return crud.create_project_phase(db=db, phase=phase)
 
 @app.get("/api/project-phases/", response_model=List[schemas.ProjectPhase])
-def read_project_phases(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    phases = crud.get_project_phases(db, skip=skip, limit=limit)
-    return phases
+def read_project_phases(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.ProjectPhase, fields)
+    phases = crud.get_rows(db, models.Project_Phase, schemas.ProjectPhase, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Project_Phase, schemas.ProjectPhase, phases, limit, fields=selected)
 
 @app.get("/api/project-phases/{phase_id}", response_model=schemas.ProjectPhase)
-def read_project_phase(phase_id: int, db: Session = Depends(get_db)):
-    phase = crud.get_project_phase(db, phase_id=phase_id)
+def read_project_phase(phase_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.ProjectPhase, fields)
+    if selected:
+        phase = crud.get_row(db, models.Project_Phase, schemas.ProjectPhase, phase_id, selected)
+    else:
+        phase = crud.get_project_phase(db, phase_id=phase_id)
     if phase is None:
         raise HTTPException(status_code=404, detail="Project phase not found")
-    return phase
+    return fast_json.row_response(models.Project_Phase, schemas.ProjectPhase, phase, selected) if selected else phase
 
 @app.get("/api/projects/{project_id}/phases", response_model=List[schemas.ProjectPhase])
 def read_project_phases_by_project(project_id: int, db: Session = Depends(get_db)):
@@ -196,7 +278,7 @@ def delete_project_phase(phase_id: int, db: Session = Depends(get_db)):
     success = crud.delete_project_phase(db, phase_id)
     if not success:
         raise HTTPException(status_code=404, detail="Project phase not found")
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # --- Alert Endpoints ---
 @app.post("/api/alerts/", response_model=schemas.Alert, status_code=status.HTTP_201_CREATED)
@@ -204,16 +286,46 @@ def create_alert(alert: schemas.AlertCreate, db: Session = Depends(get_db)):
     return crud.create_alert(db=db, alert=alert)
 
 @app.get("/api/alerts/", response_model=List[schemas.Alert])
-def read_alerts(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    alerts = crud.get_alerts(db, skip=skip, limit=limit)
-    return alerts
+def read_alerts(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, sort: Optional[str] = None,
+                filters: schemas.AlertFilter = Depends(), fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Alert, fields)
+    order = pagination.parse_sort(models.Alert, sort, crud.ALERT_SORT_FIELDS)
+    alerts = crud.get_rows(db, models.Alert, schemas.Alert, skip=skip, limit=limit, cursor=cursor, order=order,
+                           filters=filters, apply_filters=crud.filter_alerts, fields=selected)
+    return fast_json.page_response(models.Alert, schemas.Alert, alerts, limit, order, fields=selected)
+
+@app.get("/api/alerts/stream")
+async def stream_alerts(request: Request, last_alert_id: Optional[int] = None, last_event_id: Optional[int] = Header(None)):
+    """Server-Sent Events feed of created and updated alerts; see alert_stream.py."""
+    resume_from = last_event_id if last_event_id is not None else last_alert_id
+    return StreamingResponse(
+        alert_stream.event_stream(request, resume_from, settings.ALERT_STREAM_HEARTBEAT),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/alerts/bulk", response_model=schemas.BulkResult)
+def bulk_create_alerts(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_create_alerts(db, rows, chunk_size)
+
+@app.patch("/api/alerts/bulk", response_model=schemas.BulkResult)
+def bulk_update_alerts(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_update_alerts(db, rows, chunk_size)
+
+@app.delete("/api/alerts/bulk", response_model=schemas.BulkResult)
+def bulk_delete_alerts(body: schemas.BulkDelete, chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_delete_alerts(db, body.ids, chunk_size)
 
 @app.get("/api/alerts/{alert_id}", response_model=schemas.Alert)
-def read_alert(alert_id: int, db: Session = Depends(get_db)):
-    alert = crud.get_alert(db, alert_id=alert_id)
+def read_alert(alert_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.Alert, fields)
+    if selected:
+        alert = crud.get_row(db, models.Alert, schemas.Alert, alert_id, selected)
+    else:
+        alert = crud.get_alert(db, alert_id=alert_id)
     if alert is None:
         raise HTTPException(status_code=404, detail="Alert not found")
-    return alert
+    return fast_json.row_response(models.Alert, schemas.Alert, alert, selected) if selected else alert
 
 @app.put("/api/alerts/{alert_id}", response_model=schemas.Alert)
 def update_alert(alert_id: int, alert_update: schemas.AlertUpdate, db: Session = Depends(get_db)):
@@ -227,7 +339,7 @@ def delete_alert(alert_id: int, db: Session = Depends(get_db)):
     success = crud.delete_alert(db, alert_id)
     if not success:
         raise HTTPException(status_code=404, detail="Alert not found")
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # --- Budget History Endpoints ---
 @app.post("/api/budget-history/", response_model=schemas.BudgetHistory, status_code=status.HTTP_201_CREATED)
@@ -235,16 +347,33 @@ def create_budget_history(budget_history: schemas.BudgetHistoryCreate, db: Sessi
     return crud.create_budget_history(db=db, budget_history=budget_history)
 
 @app.get("/api/budget-history/", response_model=List[schemas.BudgetHistory])
-def read_budget_history(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    history = crud.get_budget_histories(db, skip=skip, limit=limit)
-    return history
+def read_budget_history(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.BudgetHistory, fields)
+    history = crud.get_rows(db, models.Budget_History, schemas.BudgetHistory, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Budget_History, schemas.BudgetHistory, history, limit, fields=selected)
+
+@app.post("/api/budget-history/bulk", response_model=schemas.BulkResult)
+def bulk_create_budget_histories(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_create_budget_histories(db, rows, chunk_size)
+
+@app.patch("/api/budget-history/bulk", response_model=schemas.BulkResult)
+def bulk_update_budget_histories(rows: List[Dict[str, Any]], chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_update_budget_histories(db, rows, chunk_size)
+
+@app.delete("/api/budget-history/bulk", response_model=schemas.BulkResult)
+def bulk_delete_budget_histories(body: schemas.BulkDelete, chunk_size: int = CHUNK_SIZE_QUERY, db: Session = Depends(get_db)):
+    return crud.bulk_delete_budget_histories(db, body.ids, chunk_size)
 
 @app.get("/api/budget-history/{history_id}", response_model=schemas.BudgetHistory)
-def read_budget_history_item(history_id: int, db: Session = Depends(get_db)):
-    history_item = crud.get_budget_history(db, history_id=history_id)
+def read_budget_history_item(history_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.BudgetHistory, fields)
+    if selected:
+        history_item = crud.get_row(db, models.Budget_History, schemas.BudgetHistory, history_id, selected)
+    else:
+        history_item = crud.get_budget_history(db, history_id=history_id)
     if history_item is None:
         raise HTTPException(status_code=404, detail="Budget history not found")
-    return history_item
+    return fast_json.row_response(models.Budget_History, schemas.BudgetHistory, history_item, selected) if selected else history_item
 
 @app.get("/api/projects/{project_id}/budget-history", response_model=List[schemas.BudgetHistory])
 def read_budget_history_by_project(project_id: int, db: Session = Depends(get_db)):
@@ -263,7 +392,7 @@ def delete_budget_history(history_id: int, db: Session = Depends(get_db)):
     success = crud.delete_budget_history(db, history_id)
     if not success:
         raise HTTPException(status_code=404, detail="Budget history not found")
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 # --- Project KPI Endpoints ---
 @app.post("/api/project-kpis/", response_model=schemas.ProjectKpi, status_code=status.HTTP_201_CREATED)
@@ -271,23 +400,29 @@ def create_project_kpi(kpi: schemas.ProjectKpiCreate, db: Session = Depends(get_
     return crud.create_project_kpi(db=db, kpi=kpi)
 
 @app.get("/api/project-kpis/", response_model=List[schemas.ProjectKpi])
-def read_project_kpis(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    kpis = crud.get_project_kpis(db, skip=skip, limit=limit)
-    return kpis
+def read_project_kpis(skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.ProjectKpi, fields)
+    kpis = crud.get_rows(db, models.Project_KPI, schemas.ProjectKpi, skip=skip, limit=limit, cursor=cursor, fields=selected)
+    return fast_json.page_response(models.Project_KPI, schemas.ProjectKpi, kpis, limit, fields=selected)
 
 @app.get("/api/project-kpis/{kpi_id}", response_model=schemas.ProjectKpi)
-def read_project_kpi(kpi_id: int, db: Session = Depends(get_db)):
-    kpi = crud.get_project_kpi(db, kpi_id=kpi_id)
+def read_project_kpi(kpi_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.ProjectKpi, fields)
+    if selected:
+        kpi = crud.get_row(db, models.Project_KPI, schemas.ProjectKpi, kpi_id, selected)
+    else:
+        kpi = crud.get_project_kpi(db, kpi_id=kpi_id)
     if kpi is None:
         raise HTTPException(status_code=404, detail="Project KPI not found")
-    return kpi
+    return fast_json.row_response(models.Project_KPI, schemas.ProjectKpi, kpi, selected) if selected else kpi
 
 @app.get("/api/projects/{project_id}/kpi", response_model=schemas.ProjectKpi)
-def read_project_kpi_by_project(project_id: int, db: Session = Depends(get_db)):
+def read_project_kpi_by_project(project_id: int, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    selected = fast_json.parse_fields(schemas.ProjectKpi, fields)
     kpi = crud.get_project_kpi_by_project(db, project_id=project_id)
     if kpi is None:
         raise HTTPException(status_code=404, detail="Project KPI not found")
-    return kpi
+    return fast_json.object_response(schemas.ProjectKpi, kpi, selected) if selected else kpi
 
 @app.put("/api/project-kpis/{kpi_id}", response_model=schemas.ProjectKpi)
 def update_project_kpi(kpi_id: int, kpi_update: schemas.ProjectKpiUpdate, db: Session = Depends(get_db)):
@@ -301,9 +436,59 @@ def delete_project_kpi(kpi_id: int, db: Session = Depends(get_db)):
     success = crud.delete_project_kpi(db, kpi_id)
     if not success:
         raise HTTPException(status_code=404, detail="Project KPI not found")
-    return JSONResponse(status_code=status.HTTP_204_NO_CONTENT)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+# --- Export Endpoints ---
+@app.get("/api/export/{table}")
+def export_table(table: str, request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every row of `table` as NDJSON or CSV; accepts the filters of the table's list endpoint."""
+    return export.response(table, format, request.query_params)
+
+# --- Import Endpoints ---
+@app.post("/api/import/{table}", response_model=schemas.ImportResult)
+async def import_table(table: str, request: Request, format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+                       chunk_size: int = CHUNK_SIZE_QUERY):
+    """Load customers, projects or tasks from a CSV or NDJSON request body; see bulk_import.py."""
+    return await bulk_import.import_request(table, request, format, chunk_size)
+
+# --- Background Job Endpoints ---
+@app.get("/api/jobs/overdue-sweep", response_model=Dict[str, Any])
+def read_overdue_sweep_stats():
+    return overdue_sweeper.stats()
+
+@app.post("/api/jobs/overdue-sweep", response_model=schemas.SweepResult)
+def run_overdue_sweep():
+    return overdue_sweeper.run_once()
+
+# --- Metrics Endpoints ---
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def read_metrics():
+    """Request latency, per-request SQL and query timings in the Prometheus text format; see instrumentation.py."""
+    return PlainTextResponse(instrumentation.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+# --- Cache Endpoints ---
+@app.get("/api/cache/stats", response_model=Dict[str, Any])
+def read_entity_cache_stats():
+    return entity_cache.stats()
+
+# --- Connection Pool Endpoints ---
+@app.get("/api/db/pool/stats", response_model=Dict[str, Any])
+def read_pool_stats():
+    return database.pool_stats()
+
+@app.get("/api/db/replicas", response_model=Dict[str, Any])
+def read_replica_stats():
+    return database.replica_stats()
+
+# --- KPI Classification Endpoints ---
+@app.get("/api/kpi-classifier/stats", response_model=Dict[str, Any])
+def read_kpi_classifier_stats():
+    return crud.kpi_classifier().stats()
+
+@app.post("/api/project-kpis/classify", response_model=schemas.KpiBatchResult)
+def classify_all_project_kpis(chunk_size: int = Query(5000, ge=1, le=100000), db: Session = Depends(get_db)):
+    return crud.classify_all_project_kpis(db, chunk_size=chunk_size)
 
-# --- KPI Classification Endpoint ---
 @app.post("/api/projects/{project_id}/classify-kpi", response_model=schemas.ProjectKpi)
 def trigger_kpi_classification(project_id: int, db: Session = Depends(get_db)):
     db_kpi = crud.classify_and_update_project_kpi_class(db, project_id=project_id)
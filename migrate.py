@@ -0,0 +1,190 @@
+# Backend/migrate.py
+# Schema management, run once per deploy before the app starts:
+#
+#   python migrate.py            # bring DATABASE_URL up to date with models.py
+#   python migrate.py --check    # list pending changes, change nothing; exit 1 if any
+#
+# The apps do not touch the schema when imported or started, so workers boot
+# without a round of connections and reflection each. DB_CREATE_TABLES_ON_STARTUP
+# runs apply() from the app lifespans instead, for local development.
+#
+# apply() creates missing tables, adds missing columns that have a server
+# default (so existing rows get a value), creates missing indexes and drops the
+# ones listed in OBSOLETE_INDEXES. Nothing else is altered or dropped. When the
+# kpi_engine counter columns are added, the KPIs are rebuilt so the counters
+# start from the existing data (see rebuild_kpis.py). The same upgrade as plain
+# SQL is at the end of database_project.sql.
+
+import argparse
+import logging
+import sys
+import time
+from typing import List, Optional
+
+from sqlalchemy import func, inspect, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+import database, models, kpi_engine
+
+logger = logging.getLogger("migrate")
+
+LOCK_NAME = "pm-migrate"
+
+# Indexes replaced by another one in models.py, dropped once the replacement exists.
+OBSOLETE_INDEXES = {
+    # Non-unique; ux_project_kpis_project allows one KPI row per project.
+    "Project_KPIs": ("ix_project_kpis_project",),
+}
+
+def missing_tables(bind=None) -> List[str]:
+    bind = bind or database.engine
+    existing = set(inspect(bind).get_table_names())
+    return [table.name for table in models.Base.metadata.sorted_tables if table.name not in existing]
+
+def missing_columns(bind=None) -> List[tuple]:
+    """(table, column) for the columns in models.py that existing tables lack."""
+    bind = bind or database.engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend((table, column) for column in table.columns if column.name not in existing)
+    return missing
+
+def missing_indexes(bind=None) -> List:
+    """The indexes in models.py that existing tables lack."""
+    bind = bind or database.engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in models.Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        missing.extend(index for index in sorted(table.indexes, key=lambda index: index.name)
+                       if index.name not in existing)
+    return missing
+
+def obsolete_indexes(bind=None) -> List[tuple]:
+    """(table, index name) for the OBSOLETE_INDEXES that still exist."""
+    bind = bind or database.engine
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    obsolete = []
+    for table_name, names in OBSOLETE_INDEXES.items():
+        if table_name not in existing_tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table_name)}
+        obsolete.extend((table_name, name) for name in names if name in existing)
+    return obsolete
+
+def pending_changes(bind=None) -> List[str]:
+    bind = bind or database.engine
+    return ([f"create table {name}" for name in missing_tables(bind)]
+            + [f"add column {table.name}.{column.name}" for table, column in missing_columns(bind)]
+            + [f"create index {index.name} on {index.table.name}" for index in missing_indexes(bind)]
+            + [f"drop index {name} on {table}" for table, name in obsolete_indexes(bind)])
+
+def duplicate_kpi_projects(conn) -> List[int]:
+    """Projects with more than one Project_KPIs row; they block the unique index."""
+    kpi = models.Project_KPI.__table__
+    return list(conn.execute(
+        select(kpi.c.project_id).group_by(kpi.c.project_id).having(func.count() > 1).order_by(kpi.c.project_id)
+    ).scalars())
+
+def _add_column(conn, table, column):
+    preparer = conn.dialect.identifier_preparer
+    ddl = CreateColumn(column).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {ddl}"))
+
+def _drop_index(conn, table_name, name):
+    preparer = conn.dialect.identifier_preparer
+    if conn.dialect.name == "mysql":
+        conn.execute(text(f"DROP INDEX {preparer.quote(name)} ON {preparer.quote(table_name)}"))
+    else:
+        conn.execute(text(f"DROP INDEX {preparer.quote(name)}"))
+
+def apply(bind=None) -> Optional[List[str]]:
+    """
+    Bring the schema up to date and return the changes made. Runs under an
+    advisory lock, so of several processes starting at once only one does the
+    work; the others return None straight away. Raises RuntimeError, before
+    changing anything, when existing data blocks a change.
+    """
+    bind = bind or database.engine
+    with database.advisory_lock(LOCK_NAME, bind) as acquired:
+        if not acquired:
+            logger.info("another process is migrating; skipping")
+            return None
+        tables = missing_tables(bind)
+        columns = missing_columns(bind)
+        indexes = missing_indexes(bind)
+        obsolete = obsolete_indexes(bind)
+        for table, column in columns:
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(f"cannot add NOT NULL column {table.name}.{column.name} without a server default")
+        if any(index.unique and index.table is models.Project_KPI.__table__ for index in indexes):
+            with bind.connect() as conn:
+                duplicates = duplicate_kpi_projects(conn)
+            if duplicates:
+                raise RuntimeError(
+                    f"{len(duplicates)} projects have more than one Project_KPIs row (project_id "
+                    + ", ".join(map(str, duplicates[:20])) + (", ..." if len(duplicates) > 20 else "")
+                    + "); keep one row per project, then run migrate again"
+                )
+
+        if tables:
+            models.Base.metadata.create_all(bind=bind, tables=[models.Base.metadata.tables[name] for name in tables])
+        with bind.begin() as conn:
+            for table, column in columns:
+                _add_column(conn, table, column)
+            for index in indexes:
+                index.create(conn)
+            for table_name, name in obsolete:
+                _drop_index(conn, table_name, name)
+
+        counters = [column for table, column in columns
+                    if table is models.Project_KPI.__table__ and column.name in kpi_engine.COUNTER_COLUMNS]
+        if counters:
+            # Existing KPI rows got 0 for the new counters; recount them from the data.
+            with Session(bind=bind) as db:
+                kpi_engine.rebuild_project_kpis(db)
+                db.commit()
+
+        changes = ([f"created table {name}" for name in tables]
+                   + [f"added column {table.name}.{column.name}" for table, column in columns]
+                   + [f"created index {index.name} on {index.table.name}" for index in indexes]
+                   + [f"dropped index {name} on {table}" for table, name in obsolete])
+        if counters:
+            changes.append("rebuilt Project_KPIs counters")
+        return changes
+
+def main():
+    parser = argparse.ArgumentParser(description="Bring the database schema up to date")
+    parser.add_argument("--check", action="store_true", help="Only list pending changes; exit 1 if any")
+    args = parser.parse_args()
+
+    target = database.engine.url.render_as_string(hide_password=True)
+    start = time.perf_counter()
+    if args.check:
+        pending = pending_changes()
+        for change in pending:
+            print(f"pending: {change}")
+        print(f"{len(pending)} pending changes in {target}")
+        sys.exit(1 if pending else 0)
+    try:
+        changes = apply()
+    except RuntimeError as e:
+        sys.exit(f"Migration stopped: {e}")
+    if changes is None:
+        sys.exit(f"Another process holds the '{LOCK_NAME}' lock; try again when it finishes")
+    for change in changes:
+        print(change)
+    print(f"{len(changes)} changes to {target} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, DECIMAL, Enum, ForeignKey, Text, TIMESTAMP, Boolean
+from sqlalchemy import Column, Integer, String, Date, DECIMAL, Enum, ForeignKey, Text, TIMESTAMP, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -22,6 +22,10 @@ class Employee(Base):
 
 class Project(Base):
     __tablename__ = "Projects"
+    __table_args__ = (
+        Index("ix_projects_status", "status"),
+        Index("ix_projects_customer_status", "customer_id", "status"),
+    )
     project_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     project_name = Column(String(100), nullable=False)
     customer_id = Column(Integer, ForeignKey("Customers.customer_id"))
@@ -41,6 +45,11 @@ class Project(Base):
 
 class Task(Base):
     __tablename__ = "Tasks"
+    __table_args__ = (
+        Index("ix_tasks_project_status", "project_id", "status"),
+        Index("ix_tasks_employee_status", "employee_id", "status"),
+        Index("ix_tasks_status_deadline", "status", "deadline"),
+    )
     task_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     project_id = Column(Integer, ForeignKey("Projects.project_id"))
     task_name = Column(String(100), nullable=False)
@@ -61,6 +70,11 @@ class Project_Phase(Base):
 
 class Alert(Base):
     __tablename__ = "Alerts"
+    __table_args__ = (
+        Index("ix_alerts_status_created", "status", "created_at"),
+        Index("ix_alerts_type_created", "alert_type", "created_at"),
+        Index("ix_alerts_project_created", "project_id", "created_at"),
+    )
     alert_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     alert_type = Column(Enum('Urgent', 'Warning', 'Info'), nullable=False)
     alert_source = Column(Enum('Project', 'Task', 'System'), nullable=False)
@@ -82,6 +96,10 @@ class Budget_History(Base):
 
 class Project_KPI(Base):
     __tablename__ = "Project_KPIs"
+    __table_args__ = (
+        # One KPI row per project; kpi_engine relies on it when creating the row.
+        Index("ux_project_kpis_project", "project_id", unique=True),
+    )
     kpi_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     project_id = Column(Integer, ForeignKey("Projects.project_id"), nullable=False)
     completion_percentage = Column(DECIMAL(5,2), default=0.0)
@@ -96,5 +114,9 @@ class Project_KPI(Base):
     kpi_class = Column(Enum('Low', 'Medium', 'High'), default='Medium')
     reopened_tasks = Column(Integer, default=0)
     risk_flag = Column(Boolean, default=False)
+    # Running counters maintained by kpi_engine.
+    task_count = Column(Integer, nullable=False, default=0, server_default="0")
+    completed_tasks = Column(Integer, nullable=False, default=0, server_default="0")
+    budget_spent = Column(DECIMAL(12,2), nullable=False, default=0, server_default="0")
     created_at = Column(TIMESTAMP, server_default=func.now())
     project = relationship("Project", back_populates="kpis")
\ No newline at end of file
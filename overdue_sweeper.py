@@ -0,0 +1,171 @@
+# Backend/overdue_sweeper.py
+# Moves Pending / In Progress tasks whose deadline has passed to Overdue and
+# raises one Urgent alert per task. Runs standalone:
+#
+#   python overdue_sweeper.py                   # one sweep, printed as JSON
+#   python overdue_sweeper.py --interval 60     # sweep every minute until stopped, one JSON line each
+#
+# or in-process from the app lifespan every OVERDUE_SWEEP_INTERVAL seconds, when
+# that is set (it is off by default, so workers do not sweep while booting).
+
+import argparse
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager, suppress
+from datetime import date
+from typing import Any, Dict, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+import models, schemas, crud, kpi_engine, alert_stream
+import database
+from config import settings
+
+logger = logging.getLogger("overdue_sweeper")
+
+LOCK_NAME = "pm_overdue_sweeper"
+OPEN_STATUSES = ("Pending", "In Progress")
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, Any] = {"runs": 0, "skipped": 0, "overdue": 0, "alerts_created": 0, "last": None}
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def sweep_overdue_tasks(db: Session, today: Optional[date] = None, chunk_size: Optional[int] = None) -> schemas.SweepResult:
+    """
+    One sweep in one transaction. A single range query on ix_tasks_status_deadline
+    finds the open tasks due before `today`; they are flipped to Overdue with
+    chunked UPDATEs and their alerts written with chunked executemany INSERTs.
+    Tasks already Overdue no longer match, so running it again is a no-op.
+    """
+    today = today or date.today()
+    chunk_size = chunk_size or settings.BULK_CHUNK_SIZE
+    Task = models.Task
+    start = time.perf_counter()
+
+    due = db.execute(
+        select(Task.task_id, Task.project_id, Task.task_name, Task.deadline)
+        .where(Task.status.in_(OPEN_STATUSES), Task.deadline < today)
+        .with_for_update()
+    ).all()
+    queried = time.perf_counter()
+
+    for chunk in _chunks(due, chunk_size):
+        db.execute(
+            update(Task).where(Task.task_id.in_([row.task_id for row in chunk])).values(status="Overdue"),
+            execution_options={"synchronize_session": False}
+        )
+        db.execute(insert(models.Alert), [
+            {
+                "alert_type": "Urgent",
+                "alert_source": "Task",
+                "project_id": row.project_id,
+                "task_id": row.task_id,
+                "message": f"Task '{row.task_name}' is overdue (deadline {row.deadline.isoformat()})",
+                "status": "Unread",
+            }
+            for row in chunk
+        ])
+    if due:
+        kpi_engine.rebuild_project_kpis(db, {row.project_id for row in due} - {None})
+    db.commit()
+    if due:
+        crud.invalidate_dashboard_summary()
+        alert_stream.publish_resync()
+    finished = time.perf_counter()
+
+    return schemas.SweepResult(
+        ran=True,
+        overdue=len(due),
+        alerts_created=len(due),
+        query_seconds=round(queried - start, 4),
+        write_seconds=round(finished - queried, 4),
+        elapsed_seconds=round(finished - start, 4),
+    )
+
+def run_once(today: Optional[date] = None) -> schemas.SweepResult:
+    """Sweep if no other worker is sweeping right now, and record the result."""
+    with database.advisory_lock(LOCK_NAME) as acquired:
+        if acquired:
+            db = database.SessionLocal()
+            try:
+                result = sweep_overdue_tasks(db, today)
+            finally:
+                db.close()
+        else:
+            result = schemas.SweepResult(
+                ran=False, overdue=0, alerts_created=0, query_seconds=0.0, write_seconds=0.0, elapsed_seconds=0.0
+            )
+
+    with _stats_lock:
+        if result.ran:
+            _stats["runs"] += 1
+            _stats["overdue"] += result.overdue
+            _stats["alerts_created"] += result.alerts_created
+        else:
+            _stats["skipped"] += 1
+        _stats["last"] = result.model_dump()
+    if result.ran:
+        logger.info("overdue sweep: %d tasks overdue, %d alerts in %.3fs (query %.3fs, write %.3fs)",
+                    result.overdue, result.alerts_created, result.elapsed_seconds,
+                    result.query_seconds, result.write_seconds)
+    else:
+        logger.info("overdue sweep skipped: another worker holds the lock")
+    return result
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return {"interval_seconds": settings.OVERDUE_SWEEP_INTERVAL, **_stats}
+
+async def run_periodically(interval: float):
+    """Background task for the app lifespan: sweep every `interval` seconds until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(run_once)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("overdue sweep failed")
+        await asyncio.sleep(interval)
+
+@asynccontextmanager
+async def background(interval: float):
+    """Run run_periodically for the duration of an app lifespan; a no-op if `interval` is 0."""
+    task = asyncio.create_task(run_periodically(interval)) if interval > 0 else None
+    try:
+        yield
+    finally:
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+def main():
+    parser = argparse.ArgumentParser(description="Mark overdue tasks and raise their alerts")
+    parser.add_argument("--interval", type=float, default=0,
+                        help="Keep running, sweeping every INTERVAL seconds (default: sweep once)")
+    parser.add_argument("--today", type=date.fromisoformat, default=None,
+                        help="Treat this date (YYYY-MM-DD) as today")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    while True:
+        try:
+            result = run_once(args.today)
+        except Exception:
+            if not args.interval:
+                raise
+            logger.exception("overdue sweep failed")
+        else:
+            print(result.model_dump_json(), flush=True)
+        if not args.interval:
+            break
+        time.sleep(args.interval)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# Backend/pagination.py
+# Keyset (cursor) pagination shared by crud.py and async_crud.py.
+
+import base64
+import binascii
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import and_, or_, inspect
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Every table is paged on its auto-increment primary key, optionally preceded by
+# one whitelisted sort column. For Alerts the default order is also creation
+# order, since alert_id and created_at are both assigned on insert.
+def parse_sort(model, sort: Optional[str], allowed):
+    """
+    Resolve a `sort` query value ("field" or "-field" for descending) against the
+    `allowed` column names. Returns (column, descending) or None for the default order.
+    """
+    if not sort:
+        return None
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    if name not in allowed:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort by '{name}'. Allowed fields: {', '.join(allowed)}"
+        )
+    return model.__table__.c[name], descending
+
+def keyset_columns(model, order=None):
+    columns = tuple(inspect(model).primary_key)
+    if order is not None:
+        columns = (order[0],) + columns
+    return columns
+
+def encode_cursor(values) -> str:
+    def encode(value):
+        if isinstance(value, (date, datetime)):
+            return value.isoformat()
+        if isinstance(value, Decimal):
+            return str(value)
+        return value
+    raw = json.dumps([encode(v) for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the keyset")
+        decoded = []
+        for column, value in zip(columns, values):
+            python_type = column.type.python_type
+            if value is None:
+                if not column.nullable:
+                    raise ValueError("cursor value cannot be null")
+            elif python_type in (date, datetime):
+                value = python_type.fromisoformat(value)
+            elif python_type is Decimal:
+                value = Decimal(value)
+            elif not isinstance(value, python_type):
+                raise ValueError("cursor value has the wrong type")
+            decoded.append(value)
+        return decoded
+    except (ValueError, TypeError, ArithmeticError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def keyset_after(columns, values, descending: bool = False):
+    """
+    Row-value comparison `(c1, c2, ...) > (v1, v2, ...)` (or `<` when descending),
+    spelled out so any index on the columns is usable. NULLs sort first ascending
+    and last descending, as they do in MySQL and SQLite.
+    """
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [c.is_(None) if v is None else c == v for c, v in zip(columns[:i], values[:i])]
+        if value is None:
+            if descending:
+                continue
+            step = column.is_not(None)
+        else:
+            step = column < value if descending else column > value
+            if descending and column.nullable:
+                step = or_(step, column.is_(None))
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+def paginate(stmt, model, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, order=None):
+    """
+    Order `stmt` (a Query or Select) by the model's keyset and apply either the
+    cursor (keyset mode) or skip/limit (compatibility mode). `order` is the
+    result of parse_sort().
+    """
+    columns = keyset_columns(model, order)
+    descending = order is not None and order[1]
+    stmt = stmt.order_by(*(c.desc() if descending else c for c in columns))
+    if cursor:
+        stmt = stmt.where(keyset_after(columns, decode_cursor(cursor, columns), descending))
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+def next_cursor(items, model, limit: int, order=None) -> Optional[str]:
+    """Cursor for the page after `items`, or None if this was the last page."""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor([getattr(last, column.key) for column in keyset_columns(model, order)])
+
+def set_next_cursor(response: Response, items, model, limit: int, order=None):
+    cursor = next_cursor(items, model, limit, order)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
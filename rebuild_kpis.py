@@ -0,0 +1,38 @@
+# Backend/rebuild_kpis.py
+# Recompute the task, alert and budget KPIs of every project from the source
+# tables with set-based SQL (see kpi_engine.py):
+#
+#   python rebuild_kpis.py            # rebuild and commit
+#   python rebuild_kpis.py --check    # report counters that drifted, change nothing
+
+import argparse
+import sys
+import time
+
+import kpi_engine
+from database import SessionLocal
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the derived Project_KPIs columns")
+    parser.add_argument("--check", action="store_true",
+                        help="Only compare stored counters against a recount; exit 1 if any differ")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        if args.check:
+            drift = kpi_engine.find_drift(db)
+            for entry in drift:
+                print(f"project {entry['project_id']} (kpi {entry['kpi_id']}): "
+                      f"{entry['field']} stored {entry['stored']}, expected {entry['expected']}")
+            print(f"{len(drift)} drifted counters found in {time.perf_counter() - start:.2f}s")
+            sys.exit(1 if drift else 0)
+        rows = kpi_engine.rebuild_project_kpis(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Rebuilt {rows} KPI rows in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
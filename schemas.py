@@ -1,7 +1,7 @@
 # Backend/schemas.py
 from pydantic import BaseModel, EmailStr, Field, computed_field
 from datetime import date, datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Sequence
 import json
 
 class EmployeeBase(BaseModel):
@@ -79,6 +79,12 @@ class ProjectUpdate(BaseModel):
     start_date: Optional[date] = None
     launch_date: Optional[date] = None
 
+class ProjectFilter(BaseModel):
+    status: Optional[str] = None
+    customer_id: Optional[int] = None
+    budget_status: Optional[str] = None
+    name: Optional[str] = None  # case-insensitive substring of project_name
+
 class Project(ProjectBase):
     project_id: int
     
@@ -107,6 +113,13 @@ class TaskUpdate(BaseModel):
     deadline: Optional[date] = None
     status: Optional[str] = None
 
+class TaskFilter(BaseModel):
+    status: Optional[str] = None
+    project_id: Optional[int] = None
+    employee_id: Optional[int] = None
+    deadline_from: Optional[date] = None
+    deadline_to: Optional[date] = None
+
 class Task(TaskBase):
     task_id: int
     
@@ -161,6 +174,15 @@ class AlertUpdate(BaseModel):
     message: Optional[str] = None
     status: Optional[str] = None
 
+class AlertFilter(BaseModel):
+    alert_type: Optional[str] = None
+    alert_source: Optional[str] = None
+    status: Optional[str] = None
+    project_id: Optional[int] = None
+    task_id: Optional[int] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
 class Alert(AlertBase):
     alert_id: int
     created_at: datetime
@@ -231,6 +253,9 @@ class ProjectKpiUpdate(BaseModel):
 
 class ProjectKpi(ProjectKpiBase):
     kpi_id: int
+    task_count: int = 0
+    completed_tasks: int = 0
+    budget_spent: float = 0.0
     created_at: datetime
     
     @computed_field
@@ -239,4 +264,66 @@ class ProjectKpi(ProjectKpiBase):
         return self.kpi_id
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+class BulkRowError(BaseModel):
+    index: int  # position of the row in the request body
+    error: str
+
+class BulkResult(BaseModel):
+    succeeded: int
+    failed: int
+    errors: List[BulkRowError]
+
+class ImportResult(BulkResult):
+    rows: int  # data rows read from the file; error indexes count from 0 in the same order
+    elapsed_seconds: float
+    rows_per_second: float
+
+class KpiBatchResult(BaseModel):
+    processed: int
+    updated: int  # rows whose kpi_class changed
+    by_class: Dict[str, int]
+    elapsed_seconds: float
+
+class SweepResult(BaseModel):
+    ran: bool  # False if another worker held the lock
+    overdue: int  # tasks moved to Overdue
+    alerts_created: int
+    query_seconds: float
+    write_seconds: float
+    elapsed_seconds: float
+
+class DashboardSummary(BaseModel):
+    total_projects: int
+    total_tasks: int
+    total_budget: float
+    total_budget_used: float
+    total_alerts: int
+    unread_alerts: int
+    projects_by_status: Dict[str, int]
+    tasks_by_status: Dict[str, int]
+    alerts_by_status: Dict[str, int]
+    alerts_by_type: Dict[str, int]
+
+class ProjectDetail(Project):
+    customer: Optional[Customer] = None
+    tasks: Optional[List[Task]] = None
+    phases: Optional[List[ProjectPhase]] = None
+    alerts: Optional[List[Alert]] = None
+    budget_history: Optional[List[BudgetHistory]] = None
+    kpis: Optional[List[ProjectKpi]] = None
+
+    @classmethod
+    def from_project(cls, project, expand: Sequence[str]) -> "ProjectDetail":
+        """
+        Build from an ORM project reading only the `expand`ed relationships, so
+        nothing unloaded is touched. The rest stay unset and are dropped by
+        `response_model_exclude_unset`.
+        """
+        data = {field: getattr(project, field) for field in Project.model_fields}
+        data.update({field: getattr(project, field) for field in expand})
+        return cls.model_validate(data)
\ No newline at end of file
@@ -0,0 +1,298 @@
+# Backend/serve.py
+# Production entry point: a pre-forking master that imports the app once and
+# forks --workers uvicorn workers serving one shared listening socket.
+#
+#   python serve.py --workers 4                          # main:app on 0.0.0.0:8000
+#   python serve.py --app async_main --port 9000         # one worker per CPU
+#   kill -HUP  <master pid>    # restart the workers gracefully (same code)
+#   kill -USR2 <master pid>    # reload: a new master with the new code takes over the socket
+#   kill -TERM <master pid>    # stop after in-flight requests finish
+#
+# Before forking, the master imports the app and builds everything workers
+# only read: mappers and the models' enum columns, Pydantic validators, the
+# fast_json serializers, the OpenAPI schema and the KPI classifier with its
+# model. Workers share those pages copy-on-write, and gc.freeze() keeps the
+# collector from writing to (and so copying) them. The master never queries the
+# database; the fork hooks in database.py, versioning.py, entity_cache.py and
+# crud.py make each worker open its own connections.
+#
+# HUP starts a new set of workers and stops the old ones once the new ones have
+# finished their lifespan startup, so the socket is never left unserved. With
+# the app preloaded, HUP cannot pick up new code: USR2 starts a new master on
+# the same socket, which stops the old master once its workers are ready.
+#
+# Workers keep their own metrics, caches and background tasks, as with any
+# multi-process setup: scrape /metrics per worker and set VERSION_STORE_PATH,
+# ENTITY_CACHE_PATH and ALERT_BROKER_URL so workers agree with each other.
+
+import argparse
+import gc
+import importlib
+import logging
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from typing import Dict, Optional, Set
+
+logger = logging.getLogger("serve")
+
+# Set for a master started by USR2: the inherited listening socket and the master to stop.
+LISTEN_FD_ENV = "SERVE_LISTEN_FD"
+PARENT_PID_ENV = "SERVE_PARENT_PID"
+# Exit status uvicorn uses when the lifespan startup fails.
+STARTUP_FAILURE = 3
+# Seconds between respawns of a worker that dies before it is ready.
+RESPAWN_DELAY = 1.0
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the API with preloaded, pre-forked workers")
+    parser.add_argument("--app", default="main", choices=("main", "async_main"), help="App module to serve")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: CPUs)")
+    parser.add_argument("--backlog", type=int, default=2048, help="Listen backlog of the shared socket")
+    parser.add_argument("--graceful-timeout", type=float, default=30,
+                        help="Seconds a stopping worker gets to finish in-flight requests")
+    parser.add_argument("--ready-timeout", type=float, default=60,
+                        help="Seconds to wait for new workers before stopping the old ones anyway")
+    parser.add_argument("--access-log", action="store_true", help="Log every request")
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args()
+
+def listen(host: str, port: int, backlog: int) -> socket.socket:
+    """The shared listening socket: inherited from the previous master after USR2, else a new one."""
+    fd = os.environ.pop(LISTEN_FD_ENV, None)
+    if fd is not None:
+        sock = socket.socket(fileno=int(fd))
+    else:
+        sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(False)
+    return sock
+
+def preload(app_name: str):
+    """Import the app and build its read-mostly state once, for the workers to share."""
+    from sqlalchemy.orm import configure_mappers
+    app = importlib.import_module(app_name).app
+    import crud, fast_json, models, schemas
+
+    configure_mappers()
+    crud.kpi_classifier()
+    for model, schema in (
+        (models.Employee, schemas.Employee), (models.Customer, schemas.Customer), (models.Project, schemas.Project),
+        (models.Task, schemas.Task), (models.Project_Phase, schemas.ProjectPhase), (models.Alert, schemas.Alert),
+        (models.Budget_History, schemas.BudgetHistory), (models.Project_KPI, schemas.ProjectKpi),
+    ):
+        fast_json.serializer(model, schema)
+    app.openapi()
+    # Everything allocated so far lives for the life of the process: move it out
+    # of the collector's reach so collections in the workers leave its pages shared.
+    gc.collect()
+    gc.freeze()
+    return app
+
+def run_worker(app, sock: socket.socket, args, ready_fd: int):
+    """Body of a forked worker; never returns."""
+    import uvicorn
+
+    # Drop the master's handlers; uvicorn installs its own for TERM and INT.
+    for signum in (signal.SIGHUP, signal.SIGUSR2):
+        signal.signal(signum, signal.SIG_IGN)
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+        signal.signal(signum, signal.SIG_DFL)
+    master = os.getppid()
+    server = None
+
+    async def tick():
+        # Called by uvicorn once startup is done, then every timeout_notify seconds.
+        nonlocal ready_fd
+        if ready_fd is not None:
+            os.write(ready_fd, b"1")
+            os.close(ready_fd)
+            ready_fd = None
+        if os.getppid() != master:
+            logger.warning("master %d is gone, stopping", master)
+            server.should_exit = True
+
+    config = uvicorn.Config(app, lifespan="on", log_level=args.log_level, access_log=args.access_log,
+                            timeout_graceful_shutdown=args.graceful_timeout, callback_notify=tick, timeout_notify=1)
+    server = uvicorn.Server(config)
+    status = 1
+    try:
+        server.run(sockets=[sock])
+        status = 0
+    except SystemExit as e:
+        status = e.code if isinstance(e.code, int) else 1
+    except BaseException:
+        logger.exception("worker crashed")
+    finally:
+        logging.shutdown()
+        os._exit(status)
+
+class Master:
+    """Keeps --workers workers running and handles HUP, USR2, TERM and INT."""
+    def __init__(self, app, sock: socket.socket, args):
+        self.app = app
+        self.sock = sock
+        self.args = args
+        self.workers: Set[int] = set()      # the current generation
+        self.retiring: Set[int] = set()     # stopped once the current generation is ready
+        self.stopped: Set[int] = set()      # sent SIGTERM, not yet reaped
+        self.starting: Dict[int, int] = {}  # readiness pipe -> worker pid
+        self.switch_deadline: Optional[float] = None
+        self.parent = int(os.environ.pop(PARENT_PID_ENV, 0)) or None
+        self.signals = []
+        self.wake_r, self.wake_w = os.pipe()
+        os.set_blocking(self.wake_w, False)
+        self.respawn_at = 0.0
+
+    def _on_signal(self, signum, frame):
+        self.signals.append(signum)
+        try:
+            os.write(self.wake_w, b"!")
+        except BlockingIOError:
+            pass
+
+    def spawn(self):
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os.close(self.wake_r)
+            os.close(self.wake_w)
+            run_worker(self.app, self.sock, self.args, ready_w)
+        os.close(ready_w)
+        self.workers.add(pid)
+        self.starting[ready_r] = pid
+        logger.info("started worker %d", pid)
+
+    def stop(self, pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                self.stopped.add(pid)
+            except ProcessLookupError:
+                pass
+
+    def reload_workers(self):
+        """Start a new generation; the current one retires once it is ready."""
+        logger.info("restarting %d workers", self.args.workers)
+        self.retiring |= self.workers
+        self.workers = set()
+        self.switch_deadline = time.monotonic() + self.args.ready_timeout
+
+    def reexec(self):
+        """Start a new master with freshly imported code on the same socket; it stops this one when ready."""
+        import subprocess
+        fd = self.sock.fileno()
+        self.sock.set_inheritable(True)
+        env = dict(os.environ, **{LISTEN_FD_ENV: str(fd), PARENT_PID_ENV: str(os.getpid())})
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), *sys.argv[1:]], env=env, pass_fds=(fd,))
+        self.sock.set_inheritable(False)
+        logger.info("started new master %d", process.pid)
+
+    def reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            code = os.waitstatus_to_exitcode(status)
+            was_starting = pid in self.starting.values()
+            for fd in [fd for fd, worker in self.starting.items() if worker == pid]:
+                os.close(fd)
+                del self.starting[fd]
+            if pid in self.stopped:
+                self.stopped.discard(pid)
+            elif pid in self.workers:
+                logger.error("worker %d exited with status %s%s", pid, code,
+                             " during startup" if was_starting or code == STARTUP_FAILURE else "")
+                if was_starting:
+                    self.respawn_at = time.monotonic() + RESPAWN_DELAY
+            self.workers.discard(pid)
+            self.retiring.discard(pid)
+
+    def check_ready(self, readable):
+        for fd in readable:
+            if fd == self.wake_r:
+                os.read(self.wake_r, 1024)
+                continue
+            pid = self.starting.pop(fd)
+            os.read(fd, 1)
+            os.close(fd)
+            logger.info("worker %d ready", pid)
+        if any(pid in self.workers for pid in self.starting.values()) or len(self.workers) < self.args.workers:
+            timed_out = self.switch_deadline is not None and time.monotonic() >= self.switch_deadline
+            if not timed_out:
+                return
+            if self.retiring or self.parent is not None:
+                logger.warning("new workers not ready after %ss, stopping the old ones anyway", self.args.ready_timeout)
+        if self.retiring:
+            self.stop(self.retiring)
+            self.retiring = set()
+        self.switch_deadline = None
+        if self.parent is not None:
+            logger.info("workers ready, stopping previous master %d", self.parent)
+            try:
+                os.kill(self.parent, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+            self.parent = None
+
+    def shutdown(self):
+        logger.info("shutting down")
+        self.stop(self.workers | self.retiring)
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.stopped and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.stopped:
+            logger.warning("worker %d did not stop in time, killing it", pid)
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        self.reap()
+
+    def run(self):
+        for signum in (signal.SIGHUP, signal.SIGUSR2, signal.SIGTERM, signal.SIGINT, signal.SIGCHLD):
+            signal.signal(signum, self._on_signal)
+        logger.info("master %d serving %s:app on %s with %d workers", os.getpid(), self.args.app,
+                    self.sock.getsockname(), self.args.workers)
+        self.switch_deadline = time.monotonic() + self.args.ready_timeout
+        while True:
+            signals, self.signals = self.signals, []
+            if signal.SIGTERM in signals or signal.SIGINT in signals:
+                break
+            if signal.SIGHUP in signals:
+                self.reload_workers()
+            if signal.SIGUSR2 in signals:
+                self.reexec()
+            self.reap()
+            while len(self.workers) < self.args.workers and time.monotonic() >= self.respawn_at:
+                self.spawn()
+            try:
+                readable, _, _ = select.select([self.wake_r, *self.starting], [], [], 1.0)
+            except InterruptedError:
+                readable = []
+            self.check_ready(readable)
+        self.shutdown()
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s [%(process)d] %(levelname)s %(name)s: %(message)s")
+    sock = listen(args.host, args.port, args.backlog)
+    start = time.perf_counter()
+    app = preload(args.app)
+    logger.info("preloaded %s:app in %.2fs", args.app, time.perf_counter() - start)
+    Master(app, sock, args).run()
+
+if __name__ == "__main__":
+    main()
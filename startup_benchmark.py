@@ -0,0 +1,109 @@
+# Backend/startup_benchmark.py
+# How long a worker takes to boot: importing the app module, running its
+# lifespan startup, and answering its first request. Each run is a fresh
+# interpreter, so nothing is warm from the previous one.
+#
+#   python startup_benchmark.py                              # main and async_main, temporary SQLite file
+#   python startup_benchmark.py --app main --repeat 20 --path /api/projects/?limit=1
+#   python startup_benchmark.py --database-url mysql+pymysql://... --importtime
+#
+# The schema is created once up front with migrate.py, as a deploy would.
+# --importtime also prints the modules that took longest to import (from
+# python -X importtime), to see what a worker pays for before it can serve.
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+PHASES = ("import", "startup", "first_request", "total")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Worker startup benchmark")
+    parser.add_argument("--app", action="append", choices=("main", "async_main"),
+                        help="App module to boot (repeatable; default: both)")
+    parser.add_argument("--database-url", default=None,
+                        help="Database to boot against (defaults to a temporary SQLite file)")
+    parser.add_argument("--repeat", type=int, default=10, help="Boots per app; the median is reported")
+    parser.add_argument("--path", default="/api/dashboard/summary", help="First request to send")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest imports per app")
+    parser.add_argument("--top", type=int, default=15, help="Modules listed by --importtime")
+    parser.add_argument("--child", nargs=2, metavar=("APP", "PATH"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def boot(app_name: str, path: str) -> dict:
+    """Run in the child: time one cold boot and print the timings as JSON."""
+    started = time.perf_counter()
+    import importlib
+    app = importlib.import_module(app_name).app
+    imported = time.perf_counter()
+
+    async def serve():
+        import httpx
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+            async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+                response = await client.get(path)
+            return ready, time.perf_counter(), response.status_code
+
+    ready, answered, status = asyncio.run(serve())
+    return {
+        "import": imported - started,
+        "startup": ready - imported,
+        "first_request": answered - ready,
+        "total": answered - started,
+        "status": status,
+    }
+
+def run_child(app_name: str, path: str, env) -> dict:
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", app_name, path],
+                            env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+def slowest_imports(app_name: str, env, top: int):
+    """(cumulative ms, module) of the slowest top-level imports of `app_name`."""
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {app_name}"],
+                            env=env, capture_output=True, text=True, check=True).stderr
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            entries.append((int(cumulative) / 1000, name.rstrip()))
+    # Indentation gives the nesting; keep modules imported directly by the app or its own modules.
+    entries = [(ms, name) for ms, name in entries if len(name) - len(name.lstrip()) <= 3]
+    return sorted(entries, reverse=True)[:top]
+
+def main():
+    args = parse_args()
+    if args.child:
+        print(json.dumps(boot(*args.child)))
+        return
+
+    if args.database_url is None:
+        args.database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='pm-startup-'), 'startup.db')}"
+    env = dict(os.environ, DATABASE_URL=args.database_url, OVERDUE_SWEEP_INTERVAL="0")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.dirname(os.path.abspath(__file__)), env.get("PYTHONPATH")]))
+    subprocess.run([sys.executable, "migrate.py"], env=env, check=True, stdout=subprocess.DEVNULL,
+                   cwd=os.path.dirname(os.path.abspath(__file__)))
+
+    print(f"{args.repeat} cold boots per app, first request GET {args.path}, median ms")
+    print(f"{'app':<12}" + "".join(f"{phase:>15}" for phase in PHASES) + f"{'status':>8}")
+    for app_name in args.app or ["main", "async_main"]:
+        runs = [run_child(app_name, args.path, env) for _ in range(args.repeat)]
+        print(f"{app_name:<12}" + "".join(f"{statistics.median(run[phase] for run in runs) * 1000:>15.1f}"
+                                          for phase in PHASES) + f"{runs[-1]['status']:>8}")
+        if args.importtime:
+            for ms, name in slowest_imports(app_name, env, args.top):
+                print(f"  {ms:>8.1f} ms  {name}")
+        sys.stdout.flush()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Backend/tests/conftest.py
+# Every test runs against a throwaway SQLite file. The settings are read when
+# config.py is imported, so the environment is fixed here, before any app module.
+
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+_TMP = tempfile.mkdtemp(prefix="pm-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(_TMP, 'test.db')}",
+    "OVERDUE_SWEEP_INTERVAL": "0",
+    "VERSION_STORE_PATH": "",
+    "ENTITY_CACHE_PATH": "",
+    "ALERT_BROKER_URL": "",
+    "DB_REPLICA_URLS": "",
+    "DB_CREATE_TABLES_ON_STARTUP": "false",
+    "KPI_CLASSIFIER": "scoring",
+    "KPI_MODEL_PATH": "",
+    "LLAMA_CACHE_PATH": "",
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import event
+
+import crud, database, entity_cache, models
+
+@pytest.fixture
+def tmp_dir():
+    return tempfile.mkdtemp(dir=_TMP)
+
+@pytest.fixture
+def db():
+    """A session on freshly created tables, with the in-process caches emptied."""
+    models.Base.metadata.drop_all(bind=database.engine)
+    models.Base.metadata.create_all(bind=database.engine)
+    if entity_cache.cache is not None:
+        entity_cache.cache.clear()
+    crud.invalidate_dashboard_summary()
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def client(db):
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def count_queries():
+    """count_queries() -> context manager yielding the list of statements run on the primary engine."""
+    @contextmanager
+    def counting(bind=None):
+        bind = bind or database.engine
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(bind, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(bind, "before_cursor_execute", before_cursor_execute)
+    return counting
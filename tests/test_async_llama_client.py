@@ -0,0 +1,169 @@
+# Backend/tests/test_async_llama_client.py
+# AsyncLlama3Client against fake_ollama.py's server with injected latency and
+# failures: timeouts, retries with backoff, the circuit breaker, the
+# concurrency limit and the fallback to the scoring classifier. Llama3Client
+# reports bad answers and failures through logging.
+
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+import fake_ollama
+from kpi_classifier import KPI_FEATURES, ScoringKpiClassifier
+from llama_kpi_agent import AsyncLlama3Client, CircuitBreaker, ClassificationCache, Llama3Client
+
+def features(i: int = 0) -> dict:
+    row = dict.fromkeys(KPI_FEATURES, 1.0)
+    row.update(completion_percentage=float(i), customer_priority_level=2, risk_flag=False)
+    return row
+
+class FakeOllama:
+    """fake_ollama's handler on a free port, plus the first `fail_next` requests failing and peak concurrency."""
+    def __init__(self):
+        self.args = SimpleNamespace(latency=0.0, jitter=0.0, error_rate=0.0, answer="High")
+        self.fail_next = 0
+        self.in_flight = self.peak = self.requests = 0
+        self._lock = threading.Lock()
+        fake = self
+        base = fake_ollama.make_handler(self.args)
+
+        class Handler(base):
+            def do_POST(self):
+                with fake._lock:
+                    fake.requests += 1
+                    fake.in_flight += 1
+                    fake.peak = max(fake.peak, fake.in_flight)
+                    failing = fake.fail_next > 0
+                    fake.fail_next -= failing
+                try:
+                    if failing:
+                        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                        return self.reply(500, {"error": "injected failure"})
+                    return super().do_POST()
+                finally:
+                    with fake._lock:
+                        fake.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/api/generate"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def fake():
+    server = FakeOllama()
+    yield server
+    server.close()
+
+@pytest.fixture
+def make_client(fake):
+    clients = []
+
+    def make(**options):
+        options.setdefault("retries", 0)
+        options.setdefault("backoff", 0.01)
+        client = AsyncLlama3Client(api_url=fake.url, model_name="fake", **options)
+        clients.append(client)
+        return client
+    yield make
+    for client in clients:
+        client.close()
+
+def test_sync_client_logs_bad_answers_and_failures(fake, caplog, capsys):
+    client = Llama3Client(api_url=fake.url, model_name="fake", timeout=5)
+    try:
+        fake.args.answer = "Maybe"
+        with caplog.at_level("WARNING", logger="llama_kpi_agent"):
+            assert client.classify_kpi_class(**features()) == "Medium"
+            fake.fail_next = 1
+            assert client.classify_kpi_class(**features()) == "Error"
+    finally:
+        client.close()
+    assert [record.levelname for record in caplog.records] == ["WARNING", "ERROR"]
+    assert "'Maybe'" in caplog.records[0].getMessage()
+    assert capsys.readouterr().out == ""
+
+def test_answers_from_model_and_caches(fake, make_client):
+    cache = ClassificationCache(max_entries=10)
+    client = make_client(cache=cache)
+    assert client.classify_kpi_class(**features()) == "High"
+    assert client.classify_kpi_class(**features()) == "High"
+    assert fake.requests == 1
+    assert client.counters["model_calls"] == 1
+    assert cache.hits == 1
+
+def test_timeout_falls_back_to_scoring_and_is_not_cached(fake, make_client):
+    fake.args.latency = 0.5
+    cache = ClassificationCache(max_entries=10)
+    client = make_client(cache=cache, timeout=0.1)
+    started = time.perf_counter()
+    answer = client.classify_kpi_class(**features())
+    assert time.perf_counter() - started < 0.4
+    assert answer == ScoringKpiClassifier().classify_kpi_class(**features())
+    assert client.counters["timeouts"] == 1
+    assert client.counters["fallbacks"] == 1
+    assert cache.get(cache.make_key(features(), "fake")) is None
+    assert cache.stats()["entries"] == 0
+
+def test_retries_with_backoff_until_the_model_answers(fake, make_client):
+    fake.fail_next = 2
+    client = make_client(retries=2, backoff=0.1)
+    started = time.perf_counter()
+    assert client.classify_kpi_class(**features()) == "High"
+    # Backoff doubles: 0.1 s before the first retry, 0.2 s before the second.
+    assert time.perf_counter() - started >= 0.3
+    assert client.counters["retries"] == 2
+    assert client.counters["errors"] == 2
+    assert client.counters["fallbacks"] == 0
+
+def test_gives_up_after_retries_and_falls_back(fake, make_client):
+    fake.args.error_rate = 1.0
+    client = make_client(retries=2)
+    assert client.classify_kpi_class(**features()) == ScoringKpiClassifier().classify_kpi_class(**features())
+    assert fake.requests == 3
+    assert client.counters["fallbacks"] == 1
+
+def test_breaker_opens_then_resets(fake, make_client):
+    fake.args.error_rate = 1.0
+    client = make_client(breaker=CircuitBreaker(failure_threshold=2, reset_timeout=0.3))
+    client.classify_kpi_class(**features(1))
+    client.classify_kpi_class(**features(2))
+    assert client.breaker.state == "open"
+
+    # Open: the model is not called at all.
+    client.classify_kpi_class(**features(3))
+    assert fake.requests == 2
+    assert client.counters["fallbacks"] == 3
+
+    time.sleep(0.35)
+    assert client.breaker.state == "half-open"
+    fake.args.error_rate = 0.0
+    assert client.classify_kpi_class(**features(4)) == "High"
+    assert fake.requests == 3
+    assert client.breaker.state == "closed"
+
+def test_failed_trial_reopens_breaker(fake, make_client):
+    fake.args.error_rate = 1.0
+    client = make_client(breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0.2))
+    client.classify_kpi_class(**features(1))
+    time.sleep(0.25)
+    client.classify_kpi_class(**features(2))
+    assert fake.requests == 2
+    assert client.breaker.state == "open"
+
+def test_concurrency_is_bounded_by_the_semaphore(fake, make_client):
+    fake.args.latency = 0.2
+    client = make_client(max_concurrency=2)
+    started = time.perf_counter()
+    answers = client.classify_many([features(i) for i in range(6)])
+    assert answers == ["High"] * 6
+    assert fake.peak == 2
+    assert time.perf_counter() - started >= 0.6
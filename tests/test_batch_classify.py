@@ -0,0 +1,55 @@
+# Backend/tests/test_batch_classify.py
+# Batch KPI classification in the async app must not block the event loop,
+# whatever the classifier backend does while scoring.
+
+import asyncio
+import threading
+import time
+
+import httpx
+
+import crud, models
+from kpi_classifier import KpiClassifier
+
+class SlowClassifier(KpiClassifier):
+    """Blocks like a remote backend answering one HTTP call per row."""
+    name = "slow"
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.threads = set()
+
+    def classify_matrix(self, matrix):
+        self.threads.add(threading.get_ident())
+        time.sleep(self.seconds)
+        return ["High"] * len(matrix)
+
+def test_async_batch_classify_keeps_event_loop_free(db, monkeypatch):
+    import async_main
+
+    project = models.Project(project_name="P", status="In Progress")
+    db.add(project)
+    db.flush()
+    db.add(models.Project_KPI(project_id=project.project_id, kpi_class="Low"))
+    db.commit()
+    classifier = SlowClassifier(0.5)
+    monkeypatch.setattr(crud, "_kpi_classifier", classifier)
+
+    async def scenario():
+        app = async_main.app
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                batch = asyncio.create_task(client.post("/api/project-kpis/classify"))
+                await asyncio.sleep(0.1)
+                started = time.perf_counter()
+                root = await client.get("/")
+                answered_in = time.perf_counter() - started
+                return await batch, root, answered_in, threading.get_ident()
+
+    batch, root, answered_in, loop_thread = asyncio.run(scenario())
+    assert batch.status_code == 200
+    assert batch.json()["updated"] == 1
+    assert root.status_code == 200
+    assert answered_in < 0.3
+    assert loop_thread not in classifier.threads
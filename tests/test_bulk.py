@@ -0,0 +1,61 @@
+# Backend/tests/test_bulk.py
+# Bulk endpoints write whole chunks when they can and fall back to one
+# SAVEPOINT per row when a chunk fails, reporting each bad row by its index.
+
+import pytest
+from sqlalchemy import text
+
+import kpi_engine, models
+
+@pytest.fixture
+def project(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add(models.Project(project_id=1, project_name="P", customer_id=1, status="In Progress"))
+    db.commit()
+    # A database-level rejection, so the failure happens in the chunk INSERT rather than in validation.
+    db.execute(text(
+        "CREATE TRIGGER reject_boom BEFORE INSERT ON Tasks WHEN NEW.task_name = 'boom' "
+        "BEGIN SELECT RAISE(ABORT, 'boom is not a task'); END"
+    ))
+    db.commit()
+
+def task(name, status="Pending"):
+    return {"project_id": 1, "task_name": name, "status": status}
+
+def task_names(db):
+    db.expire_all()
+    return sorted(name for (name,) in db.query(models.Task.task_name).all())
+
+def test_bulk_create_reports_bad_rows_and_keeps_the_rest(client, db, project):
+    rows = [task("a"), {"project_id": 1}, task("b", "Completed"), task("boom"), task("c")]
+    response = client.post("/api/tasks/bulk", params={"chunk_size": 10}, json=rows)
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result["succeeded"], result["failed"]) == (3, 2)
+    assert [error["index"] for error in result["errors"]] == [1, 3]
+    assert "task_name" in result["errors"][0]["error"]
+    assert "boom is not a task" in result["errors"][1]["error"]
+    # The chunk holding the bad row was retried row by row; the good rows of every chunk landed.
+    assert task_names(db) == ["a", "b", "c"]
+    assert kpi_engine.find_drift(db) == []
+
+def test_bulk_update_reports_missing_and_malformed_ids(client, db, project):
+    client.post("/api/tasks/bulk", json=[task("a"), task("b")])
+    rows = [{"task_id": 1, "status": "Completed"}, {"task_id": 99, "status": "Completed"}, {"status": "Completed"}]
+    result = client.patch("/api/tasks/bulk", json=rows).json()
+
+    assert (result["succeeded"], result["failed"]) == (1, 2)
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    assert result["errors"][0]["error"] == "Task 99 not found"
+    assert db.get(models.Task, 1).status == "Completed"
+    assert kpi_engine.find_drift(db) == []
+
+def test_bulk_delete_reports_missing_ids(client, db, project):
+    client.post("/api/tasks/bulk", json=[task("a"), task("b"), task("c")])
+    result = client.request("DELETE", "/api/tasks/bulk", params={"chunk_size": 2}, json={"ids": [1, 42, 3]}).json()
+
+    assert (result["succeeded"], result["failed"]) == (2, 1)
+    assert result["errors"] == [{"index": 1, "error": "Task 42 not found"}]
+    assert task_names(db) == ["b"]
+    assert kpi_engine.find_drift(db) == []
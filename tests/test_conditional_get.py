@@ -0,0 +1,45 @@
+# Backend/tests/test_conditional_get.py
+# A write must change the ETag of every route that reads the written data, so
+# a conditional GET after it gets the new data instead of a 304.
+
+import pytest
+
+import models
+
+def seed(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add(models.Project(project_id=1, project_name="P", customer_id=1, status="In Progress", budget_total=1000))
+    db.add(models.Budget_History(project_id=1, month="2024-12", amount_used=100))
+    db.add(models.Project_KPI(project_id=1, budget_spent=100, budget_utilization=10))
+    db.commit()
+
+WRITES = {
+    "phase": ("post", "/api/project-phases/", {"project_id": 1, "phase_name": "Design"}),
+    "task": ("post", "/api/tasks/", {"project_id": 1, "task_name": "Build", "status": "Completed"}),
+    "alert": ("post", "/api/alerts/", {"project_id": 1, "alert_type": "Info", "alert_source": "Project"}),
+    "budget": ("post", "/api/budget-history/", {"project_id": 1, "month": "2025-01", "amount_used": 100}),
+    "budget_total": ("put", "/api/projects/1", {"budget_total": 2000}),
+}
+
+@pytest.mark.parametrize("path, write", [
+    ("/api/projects/1/phases", "phase"),
+    ("/api/projects/1/budget-history", "budget"),
+    ("/api/projects/1/kpi", "task"),
+    ("/api/projects/1/kpi", "alert"),
+    ("/api/projects/1/kpi", "budget"),
+    ("/api/projects/1/kpi", "budget_total"),
+])
+def test_write_invalidates_project_subroute(db, client, path, write):
+    seed(db)
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    method, write_path, body = WRITES[write]
+    assert getattr(client, method)(write_path, json=body).status_code in (200, 201)
+
+    second = client.get(path, headers={"If-None-Match": etag})
+    assert second.status_code == 200
+    assert second.headers["etag"] != etag
+    assert second.json() != first.json()
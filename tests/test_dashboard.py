@@ -0,0 +1,47 @@
+# Backend/tests/test_dashboard.py
+# /api/dashboard/summary is served from cache until a write makes it stale,
+# whether the write came through this process's crud or another worker.
+
+import pytest
+
+import models, versioning
+
+@pytest.fixture
+def project(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add(models.Project(project_id=1, project_name="P", customer_id=1, status="In Progress", budget_total=100))
+    db.add(models.Alert(alert_id=1, project_id=1, alert_type="Info", alert_source="Project", status="Unread"))
+    db.commit()
+
+def summary(client):
+    response = client.get("/api/dashboard/summary")
+    assert response.status_code == 200
+    return response.json()
+
+def test_repeat_reads_come_from_cache(client, project, count_queries):
+    assert summary(client)["total_projects"] == 1
+    with count_queries() as statements:
+        assert summary(client)["total_projects"] == 1
+    assert statements == []
+
+def test_writes_invalidate_the_cached_summary(client, project):
+    assert summary(client)["total_tasks"] == 0
+
+    assert client.post("/api/tasks/", json={"project_id": 1, "task_name": "T", "status": "Pending"}).status_code == 201
+    assert summary(client)["tasks_by_status"] == {"Pending": 1}
+
+    assert client.put("/api/alerts/1", json={"status": "Read"}).status_code == 200
+    assert summary(client)["unread_alerts"] == 0
+
+    assert client.delete("/api/tasks/1").status_code == 204
+    assert summary(client)["total_tasks"] == 0
+
+def test_another_workers_write_invalidates_through_the_versions(client, project, db):
+    assert summary(client)["total_projects"] == 1
+    # A write this process's crud never saw: only the shared table version moves.
+    with db.bind.begin() as conn:
+        conn.execute(models.Project.__table__.insert().values(project_id=2, project_name="Q", customer_id=1,
+                                                               status="On Hold"))
+    assert summary(client)["total_projects"] == 1
+    versioning.store.bump(["Projects"])
+    assert summary(client)["projects_by_status"] == {"In Progress": 1, "On Hold": 1}
@@ -0,0 +1,27 @@
+# Backend/tests/test_database.py
+# Engine setup that has to hold in a fresh interpreter, before anything else is imported.
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_python(code: str, **env) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                          env={**os.environ, **env})
+
+def test_sync_app_imports_without_an_async_driver_for_the_backend(tmp_dir):
+    # "nodriver" is SQLite under a backend name missing from ASYNC_DRIVERS.
+    result = run_python(
+        "from sqlalchemy.dialects import registry\n"
+        "registry.register('nodriver', 'sqlalchemy.dialects.sqlite.pysqlite', 'SQLiteDialect_pysqlite')\n"
+        "import main, database\n"
+        "try:\n"
+        "    database.init_async_engine()\n"
+        "except ValueError as e:\n"
+        "    print(e)\n",
+        DATABASE_URL=f"nodriver:///{os.path.join(tmp_dir, 'nodriver.db')}",
+    )
+    assert result.returncode == 0, result.stderr
+    assert "No async driver configured for database backend 'nodriver'" in result.stdout
@@ -0,0 +1,20 @@
+# Backend/tests/test_entity_cache.py
+# Writes drop the cached copy of the rows they change.
+
+import crud, entity_cache, models, schemas
+
+def test_kpi_update_refreshes_cached_lookup(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add(models.Project(project_id=1, project_name="P", customer_id=1, status="In Progress"))
+    db.add(models.Project_KPI(kpi_id=7, project_id=1, schedule_variance=1))
+    db.commit()
+    assert crud.get_project_kpi_by_project(db, 1).schedule_variance == 1
+    hits = entity_cache.cache.stats()["kinds"]["project_kpi"]["hits"]
+    assert crud.get_project_kpi_by_project(db, 1).schedule_variance == 1
+    assert entity_cache.cache.stats()["kinds"]["project_kpi"]["hits"] == hits + 1
+
+    crud.update_project_kpi(db, 7, schemas.ProjectKpiUpdate(schedule_variance=2))
+
+    assert crud.get_project_kpi_by_project(db, 1).schedule_variance == 2
+    crud.delete_project_kpi(db, 7)
+    assert crud.get_project_kpi_by_project(db, 1) is None
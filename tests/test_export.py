@@ -0,0 +1,83 @@
+# Backend/tests/test_export.py
+# /api/export/{table} streams the same fields, in the same order, as the list
+# route, with the list route's filters applied, across several batches.
+
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import models
+from config import settings
+
+STATUSES = ("Pending", "In Progress", "Completed", "Overdue")
+
+@pytest.fixture
+def tasks(db, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 3)
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add_all([models.Project(project_id=p, project_name=f"P{p}", customer_id=1, status="In Progress")
+                for p in (1, 2)])
+    db.add_all([
+        models.Task(task_id=i, project_id=i % 2 + 1, task_name=f"Task, \"{i}\"",
+                    status=STATUSES[i % 4], deadline=date(2025, 1, 1) + timedelta(days=i) if i % 5 else None)
+        for i in range(1, 11)
+    ])
+    db.commit()
+
+def listed(client, query=""):
+    response = client.get(f"/api/tasks/?limit=100{query}")
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def ndjson(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "application/x-ndjson"
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def csv_rows(response):
+    assert response.status_code == 200, response.text
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    return list(csv.reader(io.StringIO(response.text)))
+
+def test_ndjson_matches_the_list_route(client, tasks):
+    rows = ndjson(client.get("/api/export/tasks"))
+    expected = listed(client)
+    assert rows == expected
+    assert [list(row) for row in rows] == [list(row) for row in expected]
+
+def test_csv_header_and_rows_follow_the_list_route(client, tasks):
+    response = client.get("/api/export/tasks?format=csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="tasks.csv"'
+    header, *rows = csv_rows(response)
+    expected = listed(client)
+    assert header == list(expected[0])
+    assert [row[header.index("task_id")] for row in rows] == [str(task["task_id"]) for task in expected]
+    # Quoting round-trips names holding commas and quotes; None is an empty cell.
+    assert [row[header.index("task_name")] for row in rows] == [task["task_name"] for task in expected]
+    assert [row[header.index("deadline")] for row in rows] == [task["deadline"] or "" for task in expected]
+
+@pytest.mark.parametrize("query", ["&status=Completed", "&project_id=2",
+                                   "&deadline_from=2025-01-03&deadline_to=2025-01-08"])
+def test_list_filters_apply(client, tasks, query):
+    expected = listed(client, query)
+    assert 0 < len(expected) < 10
+    assert ndjson(client.get(f"/api/export/tasks?{query[1:]}")) == expected
+    header, *rows = csv_rows(client.get(f"/api/export/tasks?format=csv{query}"))
+    assert [int(row[header.index("task_id")]) for row in rows] == [task["task_id"] for task in expected]
+
+def test_bad_filter_is_rejected(client, tasks):
+    response = client.get("/api/export/tasks?deadline_from=soon")
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["loc"] == ["query", "deadline_from"]
+
+def test_unknown_table_and_format(client, tasks):
+    assert client.get("/api/export/passwords").status_code == 404
+    assert client.get("/api/export/tasks?format=xml").status_code == 422
+
+def test_empty_table(client, db):
+    assert client.get("/api/export/alerts").text == ""
+    header, = csv_rows(client.get("/api/export/alerts?format=csv"))
+    assert "alert_id" in header
@@ -0,0 +1,29 @@
+# Backend/tests/test_fast_json.py
+# The result-tuple path must render the same bytes as the ORM + Pydantic path.
+
+import pytest
+from pydantic import TypeAdapter
+
+import fast_json, json_benchmark, models, schemas
+
+ENTITIES = [
+    (models.Task, schemas.Task),
+    (models.Project, schemas.Project),
+    (models.Alert, schemas.Alert),
+    (models.Project_KPI, schemas.ProjectKpi),
+]
+
+@pytest.mark.parametrize("encoder", ["orjson", "json"])
+@pytest.mark.parametrize("model, schema", ENTITIES)
+def test_rows_match_pydantic(db, monkeypatch, model, schema, encoder):
+    if encoder == "orjson" and fast_json.orjson is None:
+        pytest.skip("orjson is not installed")
+    if encoder == "json":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    json_benchmark.seed(db, 30)
+    serializer = fast_json.RowSerializer(model, schema)
+    adapter = TypeAdapter(list[schema])
+
+    actual = serializer.dumps(db.query(*serializer.columns).order_by(*serializer.columns[-1:]).all())
+    objects = db.query(model).order_by(*serializer.columns[-1:]).all()
+    assert actual == adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
@@ -0,0 +1,96 @@
+# Backend/tests/test_import.py
+# POST /api/import/{table}: parents named by natural key are resolved to ids,
+# and bad rows are reported by their position in the file while the rest load.
+
+import json
+
+import pytest
+
+import kpi_engine, models
+
+def post(client, table, body, fmt, chunk_size=2):
+    response = client.post(f"/api/import/{table}?format={fmt}&chunk_size={chunk_size}", content=body)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def ndjson(*rows):
+    return "".join((row if isinstance(row, str) else json.dumps(row)) + "\n" for row in rows)
+
+def errors(result):
+    return {error["index"]: error["error"] for error in result["errors"]}
+
+@pytest.fixture
+def parents(db):
+    db.add_all([
+        models.Customer(customer_id=1, name="Acme", email="acme@example.com"),
+        models.Customer(customer_id=2, name="Globex", email="globex@example.com"),
+    ])
+    db.add_all([
+        models.Project(project_id=1, project_name="Apollo", customer_id=1, status="In Progress"),
+        models.Project(project_id=2, project_name="Twin", customer_id=1, status="In Progress"),
+        models.Project(project_id=3, project_name="Twin", customer_id=2, status="In Progress"),
+    ])
+    db.add(models.Employee(employee_id=7, name="Ada", email="ada@example.com", password_hash="x"))
+    db.commit()
+
+def test_csv_customers(client, db):
+    body = ("name,email,company\n"
+            "Acme,acme@example.com,Acme Inc\n"
+            "No email,,\n"
+            "Initech,initech@example.com,\n"
+            "Extra,extra@example.com,X,surplus\n")
+    result = post(client, "customers", body, "csv")
+
+    assert (result["rows"], result["succeeded"], result["failed"]) == (4, 2, 2)
+    assert errors(result)[1].startswith("email:")
+    assert errors(result)[3] == "row has more cells than the header"
+    customers = db.query(models.Customer).order_by(models.Customer.email).all()
+    assert [(c.name, c.company) for c in customers] == [("Acme", "Acme Inc"), ("Initech", None)]
+
+def test_projects_resolve_customer_email(client, db, parents):
+    body = ndjson(
+        {"project_name": "By email", "customer_email": "globex@example.com"},
+        {"project_name": "By id", "customer_id": 2},
+        {"project_name": "Unknown email", "customer_email": "nobody@example.com"},
+        {"project_name": "Unknown id", "customer_id": 99},
+        {"project_name": "Bad id", "customer_id": "two"},
+    )
+    result = post(client, "projects", body, "ndjson")
+
+    assert (result["succeeded"], result["failed"]) == (2, 3)
+    assert errors(result)[2] == "customer_email: no match for 'nobody@example.com'"
+    assert errors(result)[3] == "customer_id: 99 does not exist"
+    assert errors(result)[4].startswith("customer_id:")
+    imported = db.query(models.Project.project_name, models.Project.customer_id).filter(
+        models.Project.project_id > 3).order_by(models.Project.project_id).all()
+    assert imported == [("By email", 2), ("By id", 2)]
+
+def test_tasks_resolve_project_name_and_employee_email(client, db, parents):
+    body = ndjson(
+        {"task_name": "Named", "project_name": "Apollo", "employee_email": "ada@example.com", "status": "Completed"},
+        {"task_name": "Ambiguous", "project_name": "Twin"},
+        "not json",
+        [1, 2],
+        {"project_id": 1},
+        {"task_name": "Nobody", "project_id": 1, "employee_email": "bob@example.com"},
+        {"task_name": "By ids", "project_id": 2, "employee_id": 7},
+    )
+    result = post(client, "tasks", body, "ndjson", chunk_size=3)
+
+    assert (result["rows"], result["succeeded"], result["failed"]) == (7, 2, 5)
+    assert [error["index"] for error in result["errors"]] == [1, 2, 3, 4, 5]
+    assert errors(result)[1] == "project_name: 2 matches for 'Twin'"
+    assert errors(result)[2].startswith("invalid JSON")
+    assert errors(result)[3] == "expected a JSON object"
+    assert errors(result)[4] == "task_name: Field required"
+    assert errors(result)[5] == "employee_email: no match for 'bob@example.com'"
+    tasks = db.query(models.Task.task_name, models.Task.project_id, models.Task.employee_id).order_by(
+        models.Task.task_id).all()
+    assert tasks == [("Named", 1, 7), ("By ids", 2, 7)]
+    # The imported tasks are counted in their projects' KPIs.
+    assert kpi_engine.find_drift(db) == []
+
+def test_unknown_table_and_format(client, db):
+    assert client.post("/api/import/alerts?format=csv", content="a\n").status_code == 404
+    response = client.post("/api/import/customers", content="name\n")
+    assert response.status_code == 400
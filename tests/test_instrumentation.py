@@ -0,0 +1,55 @@
+# Backend/tests/test_instrumentation.py
+# Route labels for responses sent before routing, and streams kept out of the
+# request latency histogram and the slow-request check.
+
+import pytest
+
+import instrumentation, main, models
+from config import settings
+
+def timed(method, route, status):
+    return instrumentation.REQUEST_SECONDS.totals(method=method, route=route, status=str(status))[0]
+
+@pytest.fixture
+def customer(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.commit()
+
+def test_not_modified_is_labelled_with_its_route(client, customer):
+    etag = client.get("/api/customers/1").headers["etag"]
+    before = timed("GET", "/api/customers/{customer_id}", 304), timed("GET", instrumentation.UNMATCHED_ROUTE, 304)
+
+    assert client.get("/api/customers/1", headers={"If-None-Match": etag}).status_code == 304
+
+    after = timed("GET", "/api/customers/{customer_id}", 304), timed("GET", instrumentation.UNMATCHED_ROUTE, 304)
+    assert after == (before[0] + 1, before[1])
+
+def test_cors_preflight_is_labelled_with_its_route(client, db):
+    before = timed("OPTIONS", "/api/customers/", 200)
+    response = client.options("/api/customers/", headers={
+        "Origin": main.origins[0], "Access-Control-Request-Method": "POST",
+    })
+    assert response.status_code == 200
+    assert timed("OPTIONS", "/api/customers/", 200) == before + 1
+
+def test_unknown_path_is_unmatched(client, db):
+    before = timed("GET", instrumentation.UNMATCHED_ROUTE, 404)
+    assert client.get("/no/such/path").status_code == 404
+    assert timed("GET", instrumentation.UNMATCHED_ROUTE, 404) == before + 1
+
+def test_streams_are_counted_but_not_timed(client, customer, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 0)
+    route = "/api/export/{table}"
+    streamed = instrumentation.STREAMED_REQUESTS.value(method="GET", route=route, status="200")
+    slow = instrumentation.SLOW_REQUESTS.value(method="GET", route=route)
+    before = timed("GET", route, 200)
+
+    assert client.get("/api/export/customers").status_code == 200
+
+    assert instrumentation.STREAMED_REQUESTS.value(method="GET", route=route, status="200") == streamed + 1
+    assert timed("GET", route, 200) == before
+    assert instrumentation.SLOW_REQUESTS.value(method="GET", route=route) == slow
+    # An ordinary request still goes through the slow-request check.
+    slow_list = instrumentation.SLOW_REQUESTS.value(method="GET", route="/api/customers/")
+    client.get("/api/customers/")
+    assert instrumentation.SLOW_REQUESTS.value(method="GET", route="/api/customers/") == slow_list + 1
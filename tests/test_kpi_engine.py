@@ -0,0 +1,64 @@
+# Backend/tests/test_kpi_engine.py
+# The O(1) deltas applied on every write must leave Project_KPIs exactly where a
+# full rebuild_project_kpis would put it.
+
+import pytest
+from sqlalchemy import select
+
+import kpi_engine, models
+
+DERIVED = ("completion_percentage", "budget_utilization")
+
+@pytest.fixture
+def projects(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add_all([
+        models.Project(project_id=1, project_name="P1", customer_id=1, status="In Progress", budget_total=1000),
+        models.Project(project_id=2, project_name="P2", customer_id=1, status="In Progress", budget_total=400),
+    ])
+    db.commit()
+
+def kpi_rows(db):
+    kpi = models.Project_KPI.__table__
+    db.expire_all()
+    columns = [kpi.c.project_id, *(kpi.c[name] for name in kpi_engine.COUNTER_COLUMNS + DERIVED)]
+    return {row.project_id: tuple(float(value or 0) for value in row[1:])
+            for row in db.execute(select(*columns).order_by(kpi.c.project_id))}
+
+def assert_matches_rebuild(db):
+    assert kpi_engine.find_drift(db) == []
+    incremental = kpi_rows(db)
+    kpi_engine.rebuild_project_kpis(db)
+    assert kpi_rows(db) == incremental
+    db.rollback()
+
+def ok(response):
+    assert response.status_code in (200, 201, 204), response.text
+    return response.json() if response.status_code != 204 else None
+
+def test_deltas_match_a_rebuild_through_creates_updates_and_deletes(client, db, projects):
+    # Creates: the first write for each project also creates its KPI row.
+    tasks = [ok(client.post("/api/tasks/", json={"project_id": 1, "task_name": f"T{i}", "status": status}))
+             for i, status in enumerate(["Pending", "Completed", "Overdue", "Completed"])]
+    ok(client.post("/api/tasks/", json={"project_id": 2, "task_name": "U", "status": "In Progress"}))
+    alert = ok(client.post("/api/alerts/", json={"project_id": 1, "alert_type": "Warning", "alert_source": "Task"}))
+    budget = ok(client.post("/api/budget-history/", json={"project_id": 1, "month": "2025-01", "amount_used": 125.5}))
+    ok(client.post("/api/budget-history/", json={"project_id": 2, "month": "2025-01", "amount_used": 100}))
+    assert_matches_rebuild(db)
+    assert kpi_rows(db)[1][:2] == (4, 2)
+
+    # Updates: status changes, reopening, a task and an alert moving project, a new amount and budget.
+    ok(client.put(f"/api/tasks/{tasks[0]['task_id']}", json={"status": "Completed"}))
+    ok(client.put(f"/api/tasks/{tasks[1]['task_id']}", json={"status": "In Progress"}))
+    ok(client.put(f"/api/tasks/{tasks[2]['task_id']}", json={"project_id": 2}))
+    ok(client.put(f"/api/alerts/{alert['alert_id']}", json={"project_id": 2}))
+    ok(client.put(f"/api/budget-history/{budget['history_id']}", json={"amount_used": 300}))
+    ok(client.put("/api/projects/2", json={"budget_total": 800}))
+    assert_matches_rebuild(db)
+
+    # Deletes.
+    ok(client.delete(f"/api/tasks/{tasks[3]['task_id']}"))
+    ok(client.delete(f"/api/alerts/{alert['alert_id']}"))
+    ok(client.delete(f"/api/budget-history/{budget['history_id']}"))
+    assert_matches_rebuild(db)
+    assert kpi_rows(db)[1] == (2, 1, 0, 0, 0, 50.0, 0)
@@ -0,0 +1,67 @@
+# Backend/tests/test_list_filters.py
+# Filters and whitelisted sorts on the list routes, including keyset paging
+# through a sorted list.
+
+from datetime import date, timedelta
+
+import pytest
+
+import models
+
+STATUSES = ("Pending", "In Progress", "Completed", "Overdue")
+
+@pytest.fixture
+def tasks(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add_all([
+        models.Project(project_id=1, project_name="Apollo Launch", customer_id=1, status="In Progress"),
+        models.Project(project_id=2, project_name="Gemini", customer_id=1, status="Completed"),
+    ])
+    db.add_all([models.Employee(employee_id=e, name=f"E{e}", email=f"e{e}@example.com", password_hash="x")
+                for e in (1, 2)])
+    db.add_all([
+        models.Task(task_id=i, project_id=i % 2 + 1, employee_id=i % 2 + 1, task_name=f"Task {i:02d}",
+                    status=STATUSES[i % 4], deadline=date(2025, 1, 1) + timedelta(days=i))
+        for i in range(1, 21)
+    ])
+    db.commit()
+
+def ids(response):
+    assert response.status_code == 200, response.text
+    return [row["task_id"] for row in response.json()]
+
+def test_filters_combine(client, tasks):
+    response = client.get("/api/tasks/", params={
+        "status": "Completed", "project_id": 1, "deadline_from": "2025-01-05", "deadline_to": "2025-01-17",
+    })
+    # Completed is i % 4 == 2, project 1 is even i; deadline 2025-01-01 + i days.
+    assert ids(response) == [6, 10, 14]
+
+def test_sort_descending(client, tasks):
+    assert ids(client.get("/api/tasks/", params={"sort": "-deadline", "limit": 3})) == [20, 19, 18]
+
+def test_sorted_pages_follow_the_cursor(client, tasks):
+    seen, cursor = [], None
+    while True:
+        params = {"sort": "status", "limit": 6, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/tasks/", params=params)
+        page = response.json()
+        seen.extend((row["status"], row["task_id"]) for row in page)
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == sorted(seen)
+    assert len(seen) == 20
+
+def test_project_name_filter_is_a_case_insensitive_substring(client, tasks):
+    response = client.get("/api/projects/", params={"name": "apollo"})
+    assert [project["project_id"] for project in response.json()] == [1]
+
+def test_unknown_sort_field_is_rejected(client, tasks):
+    response = client.get("/api/tasks/", params={"sort": "-password_hash"})
+    assert response.status_code == 400
+    assert "Cannot sort by 'password_hash'" in response.json()["detail"]
+
+def test_malformed_filter_value_is_rejected(client, tasks):
+    assert client.get("/api/tasks/", params={"deadline_from": "soon"}).status_code == 422
+    assert client.get("/api/alerts/", params={"project_id": "one"}).status_code == 422
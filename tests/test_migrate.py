@@ -0,0 +1,109 @@
+# Backend/tests/test_migrate.py
+# migrate.apply() upgrades a database created before the kpi_engine counters,
+# and the unique KPI index keeps concurrent first writes to one row per project.
+
+import os
+import pytest
+from sqlalchemy import create_engine, event, exc, insert, inspect, select, text
+from sqlalchemy.schema import CreateTable
+
+import crud, database, kpi_engine, migrate, models, schemas
+
+NEW_COLUMNS = ("task_count", "completed_tasks", "budget_spent")
+
+@pytest.fixture
+def old_engine(tmp_dir):
+    """A SQLite database with the schema as it was before the counters and the unique KPI index."""
+    engine = create_engine(f"sqlite:///{os.path.join(tmp_dir, 'old.db')}")
+    kpi = models.Project_KPI.__table__
+    models.Base.metadata.create_all(bind=engine, tables=[t for t in models.Base.metadata.sorted_tables if t is not kpi])
+    ddl = str(CreateTable(kpi).compile(dialect=engine.dialect))
+    ddl = "\n".join(line for line in ddl.splitlines() if line.strip().split(" ")[0] not in NEW_COLUMNS)
+    with engine.begin() as conn:
+        conn.execute(text(ddl))
+        conn.execute(text('CREATE INDEX ix_project_kpis_project ON "Project_KPIs" (project_id)'))
+        conn.execute(insert(models.Customer.__table__).values(customer_id=1, name="Acme", email="acme@example.com"))
+        conn.execute(insert(models.Project.__table__).values(project_id=1, project_name="Old", customer_id=1,
+                                                             status="In Progress", budget_total=1000))
+        conn.execute(insert(models.Task.__table__), [
+            {"project_id": 1, "task_name": "Done", "status": "Completed"},
+            {"project_id": 1, "task_name": "Open", "status": "Pending"},
+        ])
+        conn.execute(insert(models.Budget_History.__table__).values(project_id=1, month="2025-01", amount_used=250))
+    yield engine
+    engine.dispose()
+
+def add_old_kpi_row(engine, project_id=1):
+    with engine.begin() as conn:
+        conn.execute(text('INSERT INTO "Project_KPIs" (project_id) VALUES (:project_id)'), {"project_id": project_id})
+
+def test_upgrade_adds_counters_and_unique_index(old_engine):
+    add_old_kpi_row(old_engine)
+    assert migrate.pending_changes(old_engine)
+
+    changes = migrate.apply(old_engine)
+
+    assert "rebuilt Project_KPIs counters" in changes
+    assert migrate.pending_changes(old_engine) == []
+    columns = {column["name"] for column in inspect(old_engine).get_columns("Project_KPIs")}
+    assert set(NEW_COLUMNS) <= columns
+    indexes = {index["name"]: index["unique"] for index in inspect(old_engine).get_indexes("Project_KPIs")}
+    assert indexes.get("ux_project_kpis_project") in (True, 1)
+    assert "ix_project_kpis_project" not in indexes
+    kpi = models.Project_KPI.__table__
+    with old_engine.connect() as conn:
+        row = conn.execute(select(kpi).where(kpi.c.project_id == 1)).one()
+    assert (row.task_count, row.completed_tasks, float(row.budget_spent)) == (2, 1, 250.0)
+    assert float(row.completion_percentage) == 50.0
+    assert float(row.budget_utilization) == 25.0
+
+def test_upgrade_stops_on_duplicate_kpi_rows(old_engine):
+    add_old_kpi_row(old_engine)
+    add_old_kpi_row(old_engine)
+
+    with pytest.raises(RuntimeError, match="more than one Project_KPIs row"):
+        migrate.apply(old_engine)
+
+    columns = {column["name"] for column in inspect(old_engine).get_columns("Project_KPIs")}
+    assert not set(NEW_COLUMNS) & columns
+
+def test_unique_index_rejects_second_kpi_row(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add(models.Project(project_id=1, project_name="P", customer_id=1, status="In Progress"))
+    db.add(models.Project_KPI(project_id=1))
+    db.commit()
+    db.add(models.Project_KPI(project_id=1))
+    with pytest.raises(exc.IntegrityError):
+        db.commit()
+
+def test_first_write_losing_the_race_updates_the_winners_row(db, monkeypatch):
+    """
+    Two first writes for a project: both UPDATEs match nothing, the other one
+    inserts the KPI row first, and ours is rejected by the unique index. Our
+    delta must land on the row the other write created.
+    """
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add(models.Project(project_id=1, project_name="P", customer_id=1, status="In Progress"))
+    db.commit()
+    kpi = models.Project_KPI.__table__
+    raced = []
+
+    def other_write_commits(conn, clauseelement, multiparams, params, execution_options, result):
+        # Runs after our first UPDATE matched nothing: the other write's row appears.
+        if not raced and getattr(clauseelement, "table", None) is kpi and clauseelement.is_update:
+            raced.append(result.rowcount)
+            conn.execute(insert(kpi).values(project_id=1, task_count=3))
+
+    def plain_insert(session, project_ids):
+        # What the NOT EXISTS insert amounts to when the other row is not yet visible to it.
+        session.execute(insert(kpi).values(project_id=1))
+
+    monkeypatch.setattr(kpi_engine, "rebuild_project_kpis", plain_insert)
+    event.listen(database.engine, "after_execute", other_write_commits)
+    try:
+        crud.create_task(db, schemas.TaskCreate(project_id=1, task_name="T"))
+    finally:
+        event.remove(database.engine, "after_execute", other_write_commits)
+
+    assert raced == [0]
+    assert db.execute(select(kpi.c.task_count).where(kpi.c.project_id == 1)).scalars().all() == [4]
@@ -0,0 +1,68 @@
+# Backend/tests/test_overdue_sweeper.py
+# The overdue sweep flips late open tasks once, skips while another process
+# holds its lock, and reports every sweep when run as a scheduler.
+
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import date
+
+import pytest
+
+import database, kpi_engine, models, overdue_sweeper
+
+TODAY = date(2025, 6, 1)
+
+@pytest.fixture
+def tasks(db):
+    db.add(models.Customer(customer_id=1, name="Acme", email="acme@example.com"))
+    db.add(models.Project(project_id=1, project_name="P", customer_id=1, status="In Progress"))
+    db.add_all([
+        models.Task(task_id=1, project_id=1, task_name="late", status="Pending", deadline=date(2025, 5, 1)),
+        models.Task(task_id=2, project_id=1, task_name="late too", status="In Progress", deadline=date(2025, 5, 31)),
+        models.Task(task_id=3, project_id=1, task_name="due today", status="Pending", deadline=TODAY),
+        models.Task(task_id=4, project_id=1, task_name="done late", status="Completed", deadline=date(2025, 5, 1)),
+    ])
+    db.commit()
+
+def statuses(db):
+    db.expire_all()
+    return {task.task_id: task.status for task in db.query(models.Task)}
+
+def test_second_sweep_is_a_no_op(db, tasks):
+    first = overdue_sweeper.run_once(TODAY)
+    assert (first.ran, first.overdue, first.alerts_created) == (True, 2, 2)
+    assert statuses(db) == {1: "Overdue", 2: "Overdue", 3: "Pending", 4: "Completed"}
+    assert sorted(alert.task_id for alert in db.query(models.Alert)) == [1, 2]
+    assert kpi_engine.find_drift(db) == []
+
+    second = overdue_sweeper.run_once(TODAY)
+    assert (second.ran, second.overdue, second.alerts_created) == (True, 0, 0)
+    assert db.query(models.Alert).count() == 2
+
+def test_sweep_skips_while_another_process_holds_the_lock(db, tasks):
+    skipped = overdue_sweeper.stats()["skipped"]
+    with database.advisory_lock(overdue_sweeper.LOCK_NAME) as acquired:
+        assert acquired
+        result = overdue_sweeper.run_once(TODAY)
+    assert not result.ran
+    assert overdue_sweeper.stats()["skipped"] == skipped + 1
+    assert statuses(db)[1] == "Pending"
+    assert overdue_sweeper.run_once(TODAY).ran
+
+def test_cli_reports_every_sweep_when_scheduled(db, tasks):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    process = subprocess.Popen(
+        [sys.executable, "overdue_sweeper.py", "--interval", "0.2", "--today", TODAY.isoformat()],
+        cwd=root, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    time.sleep(2)
+    process.send_signal(signal.SIGINT)
+    output, _ = process.communicate(timeout=10)
+    results = [json.loads(line) for line in output.splitlines() if line.startswith("{")]
+    assert len(results) >= 2
+    assert results[0]["overdue"] == 2
+    assert all(result["overdue"] == 0 for result in results[1:])
@@ -0,0 +1,54 @@
+# Backend/tests/test_project_queries.py
+# /api/projects/{id}/full and expand= load relationships eagerly: the number of
+# statements must not grow with the number of projects or related rows.
+
+from datetime import date
+
+import pytest
+
+import models
+
+EXPAND = "customer,tasks,phases,alerts,budget_history,kpis"
+
+def seed(db, projects: int, per_project: int):
+    customer = models.Customer(name="Acme", email="acme@example.com")
+    db.add(customer)
+    db.flush()
+    for p in range(projects):
+        project = models.Project(project_name=f"Project {p}", customer_id=customer.customer_id, status="In Progress",
+                                 start_date=date(2025, 1, 1))
+        db.add(project)
+        db.flush()
+        for i in range(per_project):
+            db.add_all([
+                models.Task(project_id=project.project_id, task_name=f"Task {i}", status="Pending"),
+                models.Project_Phase(project_id=project.project_id, phase_name=f"Phase {i}", status="Waiting"),
+                models.Alert(project_id=project.project_id, alert_type="Info", alert_source="Project",
+                             message=f"Alert {i}"),
+                models.Budget_History(project_id=project.project_id, month=f"2025-{i % 12 + 1:02d}", amount_used=10),
+            ])
+        db.add(models.Project_KPI(project_id=project.project_id))
+    db.commit()
+
+def test_project_full_query_count_is_constant(db, client, count_queries):
+    seed(db, projects=2, per_project=1)
+    with count_queries() as small:
+        assert client.get("/api/projects/1/full").status_code == 200
+    seed(db, projects=1, per_project=20)
+    with count_queries() as large:
+        response = client.get("/api/projects/3/full")
+    assert response.status_code == 200
+    assert len(response.json()["tasks"]) == 20
+    assert len(large) == len(small)
+
+@pytest.mark.parametrize("expand", ["customer", "tasks,alerts", EXPAND])
+def test_expand_query_count_does_not_depend_on_page_size(db, client, count_queries, expand):
+    seed(db, projects=30, per_project=3)
+    counts = {}
+    for limit in (1, 5, 30):
+        with count_queries() as statements:
+            response = client.get("/api/projects/", params={"expand": expand, "limit": limit})
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        counts[limit] = len(statements)
+    assert len(set(counts.values())) == 1, counts
@@ -0,0 +1,198 @@
+# Backend/tests/test_replicas.py
+# RoutingSession and replica_read against a primary and two replicas, each its
+# own SQLite file. Every database names its customer 1 after itself, so a read
+# shows where it went. Whatever was read from a replica gets no ETag and is not
+# cached.
+
+import asyncio
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+import crud, database, entity_cache, models, versioning
+
+customers = models.Customer.__table__
+
+@database.replica_read
+def customer_name(db):
+    return db.execute(select(customers.c.name).where(customers.c.customer_id == 1)).scalar_one()
+
+def make_database(path, name):
+    engine = create_engine(f"sqlite:///{path}")
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(insert(customers).values(customer_id=1, name=name, email=f"{name}@example.com"))
+    engine.dispose()
+
+@pytest.fixture
+def paths(tmp_dir):
+    paths = {name: os.path.join(tmp_dir, f"{name}.db") for name in ("primary", "replica-a", "replica-b")}
+    for name, path in paths.items():
+        make_database(path, name)
+    return paths
+
+@pytest.fixture
+def session_factory(paths):
+    """make_session(retry_seconds=30) on the primary, with both replicas opened read-only."""
+    engines = []
+
+    def make_session(retry_seconds=30.0):
+        primary = create_engine(f"sqlite:///{paths['primary']}")
+        replicas = [create_engine(f"sqlite:///file:{paths[name]}?mode=ro&uri=true", connect_args={"timeout": 0.1})
+                    for name in ("replica-a", "replica-b")]
+        engines.extend([primary, *replicas])
+        replica_set = database.ReplicaSet(replicas, "round-robin", retry_seconds)
+        factory = sessionmaker(bind=primary, class_=database.RoutingSession, replicas=replica_set)
+        return factory, replica_set
+
+    yield make_session
+    for engine in engines:
+        engine.dispose()
+
+def test_reads_alternate_between_replicas(session_factory):
+    factory, _ = session_factory()
+    with factory() as db:
+        names = [customer_name(db) for _ in range(4)]
+    assert sorted(names) == ["replica-a", "replica-a", "replica-b", "replica-b"]
+    assert names[0] != names[1] and names[1] != names[2]
+
+def test_queries_outside_replica_read_use_the_primary(session_factory):
+    factory, _ = session_factory()
+    with factory() as db:
+        assert db.execute(select(customers.c.name)).scalar_one() == "primary"
+
+def test_session_reads_its_own_writes_from_the_primary(session_factory):
+    factory, _ = session_factory()
+    with factory() as db:
+        assert customer_name(db).startswith("replica-")
+        db.execute(update(customers).where(customers.c.customer_id == 1).values(name="written"))
+        db.commit()
+        assert [customer_name(db) for _ in range(3)] == ["written"] * 3
+    with factory() as db:
+        # A new session reads from the replicas again, which have not seen the write.
+        assert customer_name(db).startswith("replica-")
+
+def test_pending_objects_keep_reads_on_the_primary(session_factory):
+    factory, _ = session_factory()
+    with factory() as db:
+        db.add(models.Employee(name="New", email="new@example.com", password_hash="x"))
+        assert customer_name(db) == "primary"
+
+def test_missing_replica_falls_back_to_the_other(paths, session_factory):
+    os.remove(paths["replica-a"])
+    factory, replica_set = session_factory()
+    with factory() as db:
+        assert [customer_name(db) for _ in range(4)] == ["replica-b"] * 4
+    assert [replica["up"] for replica in replica_set.stats()] == [False, True]
+
+def test_locked_replica_falls_back_to_the_other(paths, session_factory):
+    lock = sqlite3.connect(paths["replica-b"], isolation_level=None)
+    lock.execute("BEGIN EXCLUSIVE")
+    try:
+        factory, replica_set = session_factory()
+        with factory() as db:
+            assert [customer_name(db) for _ in range(4)] == ["replica-a"] * 4
+        assert [replica["up"] for replica in replica_set.stats()] == [True, False]
+    finally:
+        lock.rollback()
+        lock.close()
+
+def test_no_replica_left_falls_back_to_the_primary(paths, session_factory):
+    os.remove(paths["replica-a"])
+    os.remove(paths["replica-b"])
+    factory, replica_set = session_factory()
+    with factory() as db:
+        assert [customer_name(db) for _ in range(3)] == ["primary"] * 3
+    assert not any(replica["up"] for replica in replica_set.stats())
+
+def test_down_replica_is_retried_after_retry_seconds(paths, session_factory):
+    os.rename(paths["replica-a"], paths["replica-a"] + ".moved")
+    factory, _ = session_factory(retry_seconds=0)
+    with factory() as db:
+        assert customer_name(db) == "replica-b"
+        os.rename(paths["replica-a"] + ".moved", paths["replica-a"])
+        assert sorted(customer_name(db) for _ in range(4)) == ["replica-a", "replica-a", "replica-b", "replica-b"]
+
+@database.replica_read
+async def async_customer_name(db):
+    return (await db.execute(select(customers.c.name).where(customers.c.customer_id == 1))).scalar_one()
+
+def test_async_reads_fall_back_past_missing_replica(paths):
+    async def run():
+        primary = create_async_engine(f"sqlite+aiosqlite:///{paths['primary']}")
+        replicas = [create_async_engine(f"sqlite+aiosqlite:///file:{paths[name]}?mode=ro&uri=true")
+                    for name in ("replica-a", "replica-b")]
+        replica_set = database.ReplicaSet([replica.sync_engine for replica in replicas])
+        factory = async_sessionmaker(bind=primary, sync_session_class=database.RoutingSession, replicas=replica_set)
+        try:
+            async with factory() as db:
+                return [await async_customer_name(db) for _ in range(3)]
+        finally:
+            for engine in (primary, *replicas):
+                await engine.dispose()
+
+    os.remove(paths["replica-a"])
+    assert asyncio.run(run()) == ["replica-b"] * 3
+
+def test_async_replica_reads_are_reported(paths):
+    async def run():
+        primary = create_async_engine(f"sqlite+aiosqlite:///{paths['primary']}")
+        replica = create_async_engine(f"sqlite+aiosqlite:///file:{paths['replica-a']}?mode=ro&uri=true")
+        factory = async_sessionmaker(bind=primary, sync_session_class=database.RoutingSession,
+                                     replicas=database.ReplicaSet([replica.sync_engine]))
+        try:
+            async with factory() as db:
+                with versioning.watch_replica_reads() as reads:
+                    name = await async_customer_name(db)
+                return name, reads
+        finally:
+            for engine in (primary, replica):
+                await engine.dispose()
+
+    name, reads = asyncio.run(run())
+    assert name == "replica-a"
+    assert len(reads) == 1
+
+@pytest.fixture
+def app_on_replicas(db, client, session_factory):
+    """The client, with the app's sessions reading from the replicas of `paths`."""
+    import main
+
+    factory, replica_set = session_factory()
+
+    def get_db():
+        with factory() as session:
+            yield session
+
+    main.app.dependency_overrides[database.get_db] = get_db
+    yield client, replica_set
+    main.app.dependency_overrides.pop(database.get_db)
+
+def test_response_read_from_a_replica_has_no_validators(app_on_replicas):
+    client, _ = app_on_replicas
+    response = client.get("/api/customers/1")
+    assert response.json()["name"].startswith("replica-")
+    assert "etag" not in response.headers
+    assert "last-modified" not in response.headers
+    assert response.headers["cache-control"] == "no-cache"
+    # Nor was the row cached: the next lookup reads a replica again.
+    assert entity_cache.cache.get("customer:1")[0] is None
+
+def test_response_read_from_the_primary_has_validators(paths, app_on_replicas):
+    client, _ = app_on_replicas
+    os.remove(paths["replica-a"])
+    os.remove(paths["replica-b"])
+    response = client.get("/api/customers/1")
+    assert response.json()["name"] == "primary"
+    assert response.headers["etag"]
+    assert client.get("/api/customers/1", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+
+def test_dashboard_summary_read_from_a_replica_is_not_cached(db, session_factory):
+    factory, _ = session_factory()
+    with factory() as session:
+        crud.get_dashboard_summary(session)
+    assert crud._dashboard_cache["summary"] is None
@@ -0,0 +1,292 @@
+# Backend/versioning.py
+# Per-table version counters and conditional GET (ETag / Last-Modified).
+#
+# Every committed write through a Session bumps the version of each table it
+# touched. The hooks see ORM flushes as well as the bulk/Core DML used by
+# crud.py, kpi_engine.py and overdue_sweeper.py. ConditionalGetMiddleware maps a
+# GET to the tables it reads, derives an ETag from their versions and answers
+# If-None-Match / If-Modified-Since with 304 before the route runs, so unchanged
+# data costs neither a query nor serialization.
+#
+# Versions live in process memory by default. With several workers, set
+# VERSION_STORE_PATH so they share one SQLite file; otherwise a worker that did
+# not see a write could answer 304 for data another worker changed.
+#
+# The versions track the primary. A response read from a lagging replica may
+# predate them, so it gets no ETag or Last-Modified (see watch_replica_reads).
+
+import asyncio
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+
+from config import settings
+
+class VersionStore:
+    """In-process versions: resource -> (version, last modified as a unix time)."""
+    def __init__(self):
+        # Part of every ETag, so tags handed out before a restart never match.
+        self.epoch = secrets.token_hex(4)
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+
+    def after_fork(self):
+        """Called in a forked child; SqliteVersionStore reopens its connection."""
+
+    def bump(self, resources: Iterable[str]):
+        now = time.time()
+        with self._lock:
+            for resource in resources:
+                version, _ = self._versions.get(resource, (0, 0.0))
+                self._versions[resource] = (version + 1, now)
+
+    def read(self, resources: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+        with self._lock:
+            return {resource: self._versions.get(resource, (0, 0.0)) for resource in resources}
+
+    async def aread(self, resources: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+        return self.read(resources)
+
+class SqliteVersionStore(VersionStore):
+    """Versions in a SQLite file shared by every worker process on the host."""
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._db = self._connect()
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS resource_versions "
+            "(resource TEXT PRIMARY KEY, version INTEGER NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._db.execute("INSERT OR IGNORE INTO resource_versions VALUES ('__epoch__', 0, 0)")
+        self._db.execute(
+            "UPDATE resource_versions SET version = abs(random() % 2147483647) "
+            "WHERE resource = '__epoch__' AND version = 0"
+        )
+        (epoch,) = self._db.execute("SELECT version FROM resource_versions WHERE resource = '__epoch__'").fetchone()
+        self.epoch = format(epoch, "x")
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        return db
+
+    def after_fork(self):
+        # A SQLite handle must not be used by two processes; the parent keeps its own.
+        self._db = self._connect()
+
+    def bump(self, resources: Iterable[str]):
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO resource_versions VALUES (?, 1, ?) "
+                "ON CONFLICT(resource) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at",
+                [(resource, now) for resource in resources]
+            )
+
+    def read(self, resources: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+        resources = list(resources)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT resource, version, updated_at FROM resource_versions "
+                f"WHERE resource IN ({','.join('?' * len(resources))})",
+                resources
+            ).fetchall()
+        found = {resource: (version, updated_at) for resource, version, updated_at in rows}
+        return {resource: found.get(resource, (0, 0.0)) for resource in resources}
+
+    async def aread(self, resources: Iterable[str]) -> Dict[str, Tuple[int, float]]:
+        return await asyncio.to_thread(self.read, list(resources))
+
+store = SqliteVersionStore(settings.VERSION_STORE_PATH) if settings.VERSION_STORE_PATH else VersionStore()
+os.register_at_fork(after_in_child=store.after_fork)
+
+# --- Write tracking ---
+_CHANGED = "versioning_changed_tables"
+
+def _remember(session: Session, tables: Iterable[str]):
+    session.info.setdefault(_CHANGED, set()).update(tables)
+
+def _after_flush(session: Session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here.
+    _remember(session, {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__table__")
+    })
+
+def _do_orm_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None:
+            _remember(state.session, {table.name})
+
+def _after_commit(session: Session):
+    # Rolled-back changes are kept until the next commit: an extra bump only costs a 200.
+    tables = session.info.pop(_CHANGED, None)
+    if tables:
+        store.bump(tables)
+
+def track_writes(session_class=Session):
+    """Bump versions for tables written by sessions of `session_class` when they commit."""
+    if not event.contains(session_class, "after_commit", _after_commit):
+        event.listen(session_class, "after_flush", _after_flush)
+        event.listen(session_class, "do_orm_execute", _do_orm_execute)
+        event.listen(session_class, "after_commit", _after_commit)
+
+# --- Which tables a GET reads ---
+# (path prefix, tables). Project routes add the tables of expanded relationships.
+ROUTE_RESOURCES = (
+    ("/api/dashboard/summary", ("Projects", "Tasks", "Alerts")),
+    ("/api/employees", ("Employees",)),
+    ("/api/customers", ("Customers",)),
+    ("/api/projects", ("Projects",)),
+    ("/api/tasks", ("Tasks",)),
+    ("/api/project-phases", ("Project_Phases",)),
+    ("/api/alerts", ("Alerts",)),
+    ("/api/budget-history", ("Budget_History",)),
+    ("/api/project-kpis", ("Project_KPIs",)),
+)
+# /api/projects/{id}/<sub-route> -> tables, for the project routes that read
+# another table instead of Projects.
+PROJECT_SUBROUTE_RESOURCES = {
+    "phases": ("Project_Phases",),
+    "budget-history": ("Budget_History",),
+    # The KPI row, and the tables kpi_engine.py derives it from.
+    "kpi": ("Project_KPIs", "Projects", "Tasks", "Alerts", "Budget_History"),
+}
+# Streams and non-database reads carry no validators.
+UNVERSIONED_PATHS = ("/api/alerts/stream",)
+
+def _relationship_tables(names: Iterable[str]) -> Tuple[str, ...]:
+    import models
+    relationships = models.Project.__mapper__.relationships
+    return tuple(relationships[name].mapper.local_table.name for name in names if name in relationships)
+
+def resources_for(path: str, query_params) -> Tuple[str, ...]:
+    if path.startswith(UNVERSIONED_PATHS):
+        return ()
+    if path.startswith("/api/export/"):
+        # /api/export/tasks reads what /api/tasks/ reads, never expanded.
+        return resources_for("/api/" + path[len("/api/export/"):], {})
+    for prefix, tables in ROUTE_RESOURCES:
+        if path == prefix or path.startswith(prefix + "/"):
+            if prefix == "/api/projects":
+                parts = path[len(prefix):].strip("/").split("/")
+                if len(parts) == 2 and parts[1] in PROJECT_SUBROUTE_RESOURCES:
+                    return PROJECT_SUBROUTE_RESOURCES[parts[1]]
+                if path.endswith("/full"):
+                    import crud
+                    return tables + _relationship_tables(crud.PROJECT_RELATIONSHIPS)
+                expand = query_params.get("expand")
+                if expand:
+                    return tables + _relationship_tables(part.strip() for part in expand.split(","))
+            return tables
+    return ()
+
+# --- Reads served by a replica ---
+# database.RoutingSession calls note_replica_read() for each query it sends to a
+# replica. The list is shared, not copied, with the threadpool and greenlets a
+# request runs its queries in, so reads made there are seen by the watcher.
+_replica_reads: ContextVar[Optional[list]] = ContextVar("replica_reads", default=None)
+
+def note_replica_read(replica):
+    reads = _replica_reads.get()
+    if reads is not None:
+        reads.append(replica)
+
+@contextmanager
+def watch_replica_reads():
+    """
+    Yields a list of the replicas queried inside the block. When the block
+    completes they are reported to the enclosing block too; when it raises they
+    are not, since nothing it read was used (replica_read retries elsewhere).
+    """
+    outer = _replica_reads.get()
+    reads = []
+    token = _replica_reads.set(reads)
+    try:
+        yield reads
+    finally:
+        _replica_reads.reset(token)
+    if outer is not None:
+        outer.extend(reads)
+
+# --- Conditional GET ---
+# Response headers to expose to cross-origin scripts.
+VALIDATOR_HEADERS = ["ETag", "Last-Modified"]
+
+def _etag(versions: Dict[str, Tuple[int, float]]) -> str:
+    return f'W/"{store.epoch}-' + ".".join(str(versions[r][0]) for r in sorted(versions)) + '"'
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored.
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+class ConditionalGetMiddleware:
+    """ASGI middleware adding ETag, Last-Modified and Cache-Control: no-cache to versioned GETs."""
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        request_headers = Headers(scope=scope)
+        resources = resources_for(scope["path"], QueryParams(scope.get("query_string", b"")))
+        if not resources:
+            return await self.app(scope, receive, send)
+
+        versions = await store.aread(resources)
+        etag = _etag(versions)
+        modified_at = max(updated_at for _, updated_at in versions.values())
+        # Whole-second dates are only safe to hand out once that second is over;
+        # another write in the same second would otherwise be invisible to them.
+        last_modified = formatdate(modified_at, usegmt=True) if modified_at and time.time() - modified_at >= 1 else None
+
+        if _not_modified(request_headers, etag, modified_at):
+            headers = [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+            if last_modified:
+                headers.append((b"last-modified", last_modified.encode()))
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = MutableHeaders(scope=message)
+                headers["Cache-Control"] = "no-cache"
+                # A body read from a replica may be older than `versions`.
+                if not replica_reads:
+                    headers["ETag"] = etag
+                    if last_modified:
+                        headers["Last-Modified"] = last_modified
+            await send(message)
+
+        with watch_replica_reads() as replica_reads:
+            await self.app(scope, receive, send_with_validators)
+
+def _not_modified(headers: Headers, etag: str, modified_at: float) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2).
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_matches(if_none_match, etag)
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since and modified_at:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return modified_at < since + 1 and time.time() - modified_at >= 1
+    return False